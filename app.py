@@ -5,14 +5,26 @@ import logging
 import pandas as pd
 
 # Importation des modules depuis src
-from src.config import DEFAULT_SEPARATOR, DEFAULT_OUTPUT_DIR, DEFAULT_SAMPLE_NAME
-from src.data_loader import load_data, sample_data
-from src.eda import get_data_info
-from src.eda_advanced import descriptive_stats, plot_distribution, plot_correlation, plot_missing_values, plot_boxplot
+from src.config import DEFAULT_SEPARATOR, DEFAULT_OUTPUT_DIR, DEFAULT_SAMPLE_NAME, EDA_WORKERS, TRACE_ENABLED, TRACE_FILE
+from src.data_loader import load_data, normalize_separator, preview_data, sample_data
+from src.sampling import stratified_sample
+from src.cache import load_data_cached
+from src.export import write_csv
+from src.row_index import get_row_index
+from src.compaction import compact_dtypes
+from src.eda import DatasetProfile
+from src.correlation import correlation_matrix, top_correlated_pairs
+from src.eda_executor import EdaTask, get_eda_executor
+from src.render_cache import figure_to_png, get_render_cache
 from src.utils import back_to_main
-from src.treatments import rename_columns, fill_missing_values
+from src.treatments import FILL_METHODS, PIPELINE_FILL_METHODS, PIPELINE_SAMPLE_METHODS, TreatmentPipeline, rename_columns, fill_missing_values
+from src.streaming_stats import streaming_describe
+from src.tracing import SpanRecorder, activate, span, spans_to_frame
 from src.ui_upload import render_file_upload
-from src.ui_utils import get_default_output_name, select_output_dir
+from src.ui_utils import (export_with_progress, get_default_output_name, get_session_frame, release_session_frames,
+                          render_memory_usage, select_export_options, select_output_dir, set_last_file,
+                          set_session_frame)
+from src.working_copy import file_signature, load_working_copy
 from src.version import APP_NAME, NOM, VERSION, LAST_UPDATE, CONTACT, LATEST_FEATURES
 
 # Configuration des logs
@@ -23,8 +35,8 @@ logging.basicConfig(
 )
 
 # ------------------ Gestion de l'état de session ------------------
-if 'df' not in st.session_state:
-    st.session_state.df = None                   # DataFrame actuellement utilisé
+if 'frame' not in st.session_state:
+    st.session_state.frame = None                # DataFrame actuellement utilisé, confié au gouverneur mémoire
 if 'separator' not in st.session_state:
     st.session_state.separator = DEFAULT_SEPARATOR  # Séparateur par défaut pour CSV (lecture)
 if 'encoding' not in st.session_state:
@@ -47,9 +59,18 @@ if 'last_file' not in st.session_state:
     st.session_state.last_file = None            # Chemin du dernier fichier généré
 if 'original_file_name' not in st.session_state:
     st.session_state.original_file_name = None   # Nom du fichier chargé initialement
+if 'profile' not in st.session_state:
+    st.session_state.profile = DatasetProfile()  # Profil par colonne du DataFrame courant (mis en cache)
+if 'row_index' not in st.session_state:
+    st.session_state.row_index = None            # Index des lignes du fichier uploadé : ([nom, taille], RowIndex)
+if 'tracer' not in st.session_state:
+    st.session_state.tracer = SpanRecorder()     # Mesures des opérations de la session (instrumentation)
 
 # ------------------ Bouton Reset ------------------
 if st.sidebar.button("Reset App"):
+    if st.session_state.get('spooled_upload') is not None:
+        st.session_state.spooled_upload.close()
+    release_session_frames()
     st.session_state.clear()
     st.rerun()  # À partir de Streamlit 1.18, st.rerun() remplace st.experimental_rerun()
 
@@ -71,7 +92,25 @@ st.sidebar.markdown(f"""
 - {LATEST_FEATURES[3]}
 """)
 
+# Occupation du budget mémoire des DataFrames de session (affichée en fin d'exécution)
+memory_panel = st.sidebar.container()
+
+# ------------------ Instrumentation ------------------
+# Chaque exécution du script mesure ses opérations (chargement, profilage, analyses, traitements, exports)
+with st.sidebar.expander("Instrumentation (durées et mémoire)"):
+    trace_enabled = st.checkbox("Mesurer les opérations", value=TRACE_ENABLED, key="trace_enabled")
+    st.session_state.tracer.memory = st.checkbox(
+        "Mesurer le pic mémoire (ralentit les opérations)", key="trace_memory", disabled=not trace_enabled
+    )
+    trace_panel = st.container()
+if trace_enabled:
+    st.session_state.tracer.new_run()
+    activate(st.session_state.tracer)
+else:
+    activate(None)
+
 # ------------------ Chargement du fichier ------------------
+# Le fichier uploadé est recopié une fois dans un fichier local (uploaded_file.path), lu en mémoire projetée
 uploaded_file, detected_enc = render_file_upload()
 if uploaded_file is not None:
     # Sélection de l'encodage et du séparateur (pour CSV)
@@ -99,52 +138,264 @@ if uploaded_file is not None:
     # Prévisualisation du fichier
     if st.button("Prévisualiser les données"):
         try:
-            uploaded_file.seek(0)
-            df_preview = load_data(uploaded_file, separator=st.session_state.separator, encoding=st.session_state.encoding)
+            preview = preview_data(uploaded_file.path, nrows=5, separator=st.session_state.separator, encoding=st.session_state.encoding)
             st.write("**Aperçu des données (5 premières lignes) :**")
-            st.dataframe(df_preview.head(5), use_container_width=True)
+            st.dataframe(preview['data'], use_container_width=True)
+            if preview['estimated_rows'] is not None:
+                prefix = "" if preview['exact'] else "environ "
+                st.write(f"**Nombre de lignes :** {prefix}{preview['estimated_rows']}")
+            st.write("**Schéma inféré :**")
+            st.dataframe(pd.DataFrame(preview['schema'].items(), columns=['Colonne', 'Type']), use_container_width=True)
         except Exception as e:
             st.error(f"Erreur lors de la prévisualisation : {e}")
 
+    # Options de chargement : moteur de lecture, projection de colonnes et types explicites
+    with st.expander("Options de chargement avancées"):
+        read_engine = st.selectbox("Moteur de lecture CSV", ["pyarrow", "pandas"], index=0)
+        dtype_backend = "pyarrow" if st.checkbox("Utiliser des types adossés à Arrow (mémoire réduite)") else None
+        try:
+            file_columns = list(preview_data(
+                uploaded_file.path, nrows=0, separator=st.session_state.separator,
+                encoding=st.session_state.encoding, max_bytes=64 * 1024
+            )['schema'])
+        except Exception:
+            file_columns = []
+        usecols = st.multiselect("Colonnes à charger (toutes si vide)", options=file_columns) or None
+        dtype_hints = st.text_input("Types explicites (ex : colonne:int32, autre:category)", value="")
+        dtype = {
+            col.strip(): col_type.strip()
+            for col, _, col_type in (hint.rpartition(":") for hint in dtype_hints.split(",") if ":" in hint)
+        } or None
+        compact = st.checkbox("Compacter les types après chargement (réduction de la mémoire)")
+
     # Chargement complet du fichier
     if st.button("Charger le fichier complet") and not st.session_state.loaded:
         try:
-            uploaded_file.seek(0)
-            st.session_state.df = load_data(uploaded_file, separator=st.session_state.separator, encoding=st.session_state.encoding)
+            # Un fichier déjà analysé par le serveur (même contenu, mêmes options) est servi depuis le cache
+            df_loaded = load_data_cached(
+                uploaded_file.path, separator=st.session_state.separator, encoding=st.session_state.encoding,
+                engine=read_engine, usecols=usecols, dtype=dtype, dtype_backend=dtype_backend
+            )
+            if compact:
+                df_loaded, compaction_report = compact_dtypes(df_loaded)
+                st.write("**Gain mémoire par colonne après compaction :**")
+                st.dataframe(compaction_report, use_container_width=True)
+            set_session_frame(df_loaded)
+            st.session_state.profile.invalidate()
             st.session_state.loaded = True
-            st.session_state.selected_columns = {col: True for col in st.session_state.df.columns}
+            st.session_state.selected_columns = {col: True for col in df_loaded.columns}
             st.session_state.original_file_name = uploaded_file.name
             st.success("Fichier chargé avec succès !")
         except Exception as e:
             st.error(f"Erreur lors du chargement : {e}")
 
+    # Navigation par pages via l'index des débuts de lignes (sans chargement complet)
+    if uploaded_file.name.endswith('.csv'):
+        with st.expander("Parcourir le fichier (accès direct aux lignes)"):
+            upload_key = [uploaded_file.name, uploaded_file.size]
+            if st.session_state.row_index is not None and st.session_state.row_index[0] != upload_key:
+                st.session_state.row_index = None
+            if st.session_state.row_index is None and st.button("Indexer le fichier"):
+                try:
+                    # Index enregistré à côté de la copie locale de l'upload, réutilisé tant qu'elle existe
+                    st.session_state.row_index = (upload_key, get_row_index(uploaded_file.path, st.session_state.encoding))
+                except Exception as e:
+                    st.error(f"Erreur lors de l'indexation : {e}")
+            if st.session_state.row_index is not None:
+                row_index = st.session_state.row_index[1]
+                st.write(f"**Nombre exact de lignes :** {row_index.n_rows}")
+                page_size = st.selectbox("Lignes par page", [50, 100, 500, 1000], index=1, key="browse_page_size")
+                n_pages = max(-(-row_index.n_rows // page_size), 1)
+                page = st.number_input(f"Page (1 à {n_pages})", min_value=1, max_value=n_pages, value=1, key="browse_page")
+                try:
+                    st.dataframe(row_index.read_rows(
+                        uploaded_file.path, (page - 1) * page_size, page * page_size,
+                        separator=normalize_separator(st.session_state.separator or DEFAULT_SEPARATOR),
+                        encoding=st.session_state.encoding
+                    ), use_container_width=True)
+                except Exception as e:
+                    st.error(f"Erreur lors de la lecture de la page : {e}")
+
+    # Échantillonnage direct depuis le fichier (sans chargement complet, pour les fichiers CSV volumineux)
+    if uploaded_file.name.endswith('.csv'):
+        with st.expander("Échantillonner directement le fichier (sans chargement complet)"):
+            direct_method = st.selectbox(
+                "Méthode d’échantillonnage", ["random_total", "random_representatif", "first_n", "last_n"],
+                key="direct_method"
+            )
+            direct_n, direct_frac = None, None
+            if direct_method in ["random_total", "random_representatif"] and st.radio(
+                "Choisir le nombre de lignes", ["Pourcentage", "Nombre"], key="direct_choice"
+            ) == "Pourcentage":
+                direct_frac = st.slider("Pourcentage de lignes à échantillonner", 0, 100, 10, key="direct_pct") / 100
+            else:
+                direct_n = st.number_input("Nombre de lignes à échantillonner", min_value=1, value=1000, key="direct_n")
+            direct_strata = []
+            if direct_method == "random_representatif":
+                header_columns = pd.read_csv(
+                    uploaded_file.path, nrows=0, sep=normalize_separator(st.session_state.separator), encoding=st.session_state.encoding
+                ).columns.tolist()
+                direct_strata = st.multiselect("Colonnes de stratification", options=header_columns, key="direct_strata")
+                direct_allocation = st.selectbox("Allocation entre strates", ["proportional", "equal"], key="direct_allocation")
+                direct_min = st.number_input("Nombre minimum de lignes par strate", min_value=0, value=1, key="direct_min")
+            direct_seed = st.number_input("Graine aléatoire (reproductibilité)", min_value=0, value=42, key="direct_seed")
+            direct_output_dir = select_output_dir(key="direct_output_dir")
+            direct_output_name = st.text_input(
+                "Nom du fichier de sortie",
+                f"{os.path.splitext(uploaded_file.name)[0]}_echantillonnage",
+                key="direct_output_name"
+            )
+            if st.button("Échantillonner le fichier"):
+                try:
+                    direct_separator = normalize_separator(st.session_state.separator or DEFAULT_SEPARATOR)
+                    if direct_strata:
+                        df_sample, strata_report = stratified_sample(
+                            uploaded_file.path, direct_strata, n=direct_n, frac=direct_frac, allocation=direct_allocation,
+                            min_per_stratum=int(direct_min), seed=int(direct_seed),
+                            separator=direct_separator, encoding=st.session_state.encoding
+                        )
+                        st.write("**Effectifs par strate (population / échantillon) :**")
+                        st.dataframe(strata_report, use_container_width=True)
+                    elif direct_method == "random_total" and st.session_state.row_index is not None:
+                        # Fichier indexé : seules les lignes tirées sont lues
+                        df_sample = st.session_state.row_index[1].sample(
+                            uploaded_file.path, direct_n, direct_frac, seed=int(direct_seed),
+                            separator=direct_separator, encoding=st.session_state.encoding
+                        )
+                    else:
+                        df_sample = sample_data(
+                            uploaded_file.path, direct_method, direct_n, direct_frac, seed=int(direct_seed),
+                            separator=direct_separator, encoding=st.session_state.encoding
+                        )
+                    st.write(f"**Dimensions de l'échantillon :** {df_sample.shape[0]} lignes, {df_sample.shape[1]} colonnes")
+                    st.dataframe(df_sample.head(), use_container_width=True)
+                    output_path = os.path.join(direct_output_dir, f"{direct_output_name}.csv")
+                    # On réécrit avec le séparateur de lecture pour pouvoir réutiliser le fichier généré
+                    write_csv(df_sample, output_path, direct_separator, st.session_state.encoding)
+                    st.success(f"Fichier sauvegardé sous {output_path}")
+                    set_last_file(df_sample, output_path)
+                except Exception as e:
+                    st.error(f"Erreur lors de l’échantillonnage : {e}")
+
+    # Chaîne de traitements exécutée en flux, du fichier d'entrée au fichier de sortie (mémoire constante)
+    if uploaded_file.name.endswith('.csv'):
+        with st.expander("Chaîne de traitements en flux (sans chargement complet)"):
+            pipe_separator = normalize_separator(st.session_state.separator or DEFAULT_SEPARATOR)
+            pipe_columns = pd.read_csv(
+                uploaded_file.path, nrows=0, sep=pipe_separator, encoding=st.session_state.encoding
+            ).columns.tolist()
+            pipe_keep = st.multiselect("Colonnes à conserver (toutes si vide)", options=pipe_columns, key="pipe_keep")
+            pipe_available = pipe_keep or pipe_columns
+            pipe_fill_cols = st.multiselect("Colonnes dont les valeurs null sont à remplir", options=pipe_available, key="pipe_fill_cols")
+            pipe_fill_method, pipe_custom, pipe_group_by = None, None, None
+            if pipe_fill_cols:
+                pipe_fill_method = st.selectbox("Méthode de remplacement", options=PIPELINE_FILL_METHODS, key="pipe_fill_method")
+                if pipe_fill_method == "custom":
+                    pipe_custom = st.text_input("Valeur de remplacement", key="pipe_custom")
+                elif pipe_fill_method.startswith("group_"):
+                    pipe_group_by = st.multiselect(
+                        "Colonnes de regroupement", options=[c for c in pipe_available if c not in pipe_fill_cols],
+                        key="pipe_group_by"
+                    )
+            pipe_sample = st.selectbox("Échantillonnage", ["aucun"] + PIPELINE_SAMPLE_METHODS, key="pipe_sample")
+            if pipe_sample != "aucun":
+                pipe_n = st.number_input("Nombre de lignes à conserver", min_value=1, value=1000, key="pipe_n")
+                pipe_seed = st.number_input("Graine aléatoire (reproductibilité)", min_value=0, value=42, key="pipe_seed")
+            pipe_renames = st.text_input("Renommage (ex : ancien:nouveau, autre:nom)", value="", key="pipe_renames")
+            pipe_output_dir = select_output_dir(key="pipe_output_dir")
+            pipe_output_name = st.text_input(
+                "Nom du fichier de sortie", f"{os.path.splitext(uploaded_file.name)[0]}_traite", key="pipe_output_name"
+            )
+            if st.button("Exécuter la chaîne de traitements"):
+                try:
+                    pipeline = TreatmentPipeline()
+                    if pipe_keep:
+                        pipeline.select(pipe_keep)
+                    if pipe_fill_cols:
+                        pipeline.fill(pipe_fill_cols, pipe_fill_method, pipe_custom, group_by=pipe_group_by)
+                    if pipe_sample != "aucun":
+                        pipeline.sample(pipe_sample, n=int(pipe_n), seed=int(pipe_seed))
+                    new_names = {
+                        old.strip(): new.strip()
+                        for old, _, new in (item.partition(":") for item in pipe_renames.split(",") if ":" in item)
+                    }
+                    if new_names:
+                        pipeline.rename(new_names)
+                    output_path = os.path.join(pipe_output_dir, f"{pipe_output_name}.csv")
+                    report = pipeline.run(
+                        uploaded_file.path, output_path, separator=pipe_separator, encoding=st.session_state.encoding
+                    )
+                    st.success(
+                        f"Fichier sauvegardé sous {output_path} : {report['rows']} lignes, "
+                        f"{len(report['columns'])} colonnes ({report['passes']} lecture(s) du fichier)"
+                    )
+                except Exception as e:
+                    st.error(f"Erreur lors de l'exécution de la chaîne de traitements : {e}")
+
+    # Statistiques descriptives calculées en flux (sans chargement complet, pour les fichiers CSV volumineux)
+    if uploaded_file.name.endswith('.csv'):
+        with st.expander("Statistiques descriptives sans chargement complet"):
+            stats_workers = st.number_input("Nombre de threads", min_value=1, max_value=os.cpu_count() or 1, value=1)
+            if st.button("Calculer les statistiques descriptives"):
+                try:
+                    st.dataframe(streaming_describe(
+                        uploaded_file.path, separator=normalize_separator(st.session_state.separator),
+                        encoding=st.session_state.encoding, workers=int(stats_workers)
+                    ))
+                    st.caption("Quantiles estimés par t-digest ; effectif, moyenne, écart-type, min et max exacts.")
+                except Exception as e:
+                    st.error(f"Erreur lors du calcul des statistiques : {e}")
+            if st.button("Calculer les corrélations (Pearson)"):
+                try:
+                    corr = correlation_matrix(
+                        uploaded_file.path, separator=normalize_separator(st.session_state.separator),
+                        encoding=st.session_state.encoding
+                    )
+                    from src.eda_advanced import plot_correlation  # pile de tracé importée à la demande
+                    png = figure_to_png(plot_correlation(None, corr=corr))
+                    if png:
+                        st.image(png, use_container_width=True)
+                        st.write("**Paires les plus corrélées :**")
+                        st.dataframe(top_correlated_pairs(corr, k=10))
+                    else:
+                        st.write("Le fichier doit contenir au moins deux colonnes numériques.")
+                except Exception as e:
+                    st.error(f"Erreur lors du calcul des corrélations : {e}")
+
 # ------------------ Affichage et Navigation ------------------
-if st.session_state.loaded and st.session_state.df is not None:
-    df = st.session_state.df
+# Le DataFrame de la session est relu en mémoire mappée s'il a été déversé sur disque par le gouverneur mémoire
+df = get_session_frame() if st.session_state.loaded else None
+if df is not None:
 
     st.subheader("Informations de base sur le dataset")
     st.dataframe(df.head(), use_container_width=True)
-    info = get_data_info(df)
+    # Seules les colonnes nouvelles ou modifiées par un traitement sont recalculées
+    profile = st.session_state.profile.update(df)
+    info = profile.info()
     st.markdown(f"**Dimensions :** {info['dimensions'][0]} lignes, {info['dimensions'][1]} colonnes")
     st.markdown("**Noms des colonnes :** " + ", ".join(info['column_names']))
     st.markdown("**Types de données :**")
-    st.dataframe(pd.DataFrame(info['data_types'].items(), columns=['Colonne', 'Type']), use_container_width=True)
+    st.dataframe(pd.DataFrame([(col, str(t)) for col, t in info['data_types'].items()], columns=['Colonne', 'Type']), use_container_width=True)
     st.markdown("**Valeurs manquantes par colonne :**")
     st.dataframe(pd.DataFrame(info['missing_values'].items(), columns=['Colonne', 'Valeurs manquantes']), use_container_width=True)
-    original_size = df.memory_usage(deep=True).sum()
+    original_size = profile.memory_usage
     st.write(f"**Taille estimée en mémoire :** {original_size / (1024 * 1024):.2f} Mo")
 
     # Option de réutilisation du fichier traité précédemment
     if st.session_state.last_file:
         use_last = st.checkbox("Utiliser le fichier généré précédemment", value=True)
-        if use_last:
+        # On ne recharge que si le fichier généré a changé depuis le dernier chargement (chemin, taille, date)
+        last_signature = [st.session_state.last_file, file_signature(st.session_state.last_file)]
+        if use_last and st.session_state.get('last_file_signature') != last_signature:
             try:
-                df_new = load_data(
+                df_new = load_working_copy(
                     st.session_state.last_file,
                     separator=st.session_state.separator,  # Important : on relit avec le même séparateur choisi !
                     encoding=st.session_state.encoding
                 )
-                st.session_state.df = df_new
+                set_session_frame(df_new)
+                st.session_state.profile.invalidate()
+                st.session_state.last_file_signature = last_signature
                 df = df_new
                 st.info(f"Fichier {st.session_state.last_file} chargé pour le traitement.")
             except Exception as e:
@@ -176,6 +427,17 @@ if st.session_state.loaded and st.session_state.df is not None:
                     value=st.session_state.selected_analyses.get(analysis, False),
                     key=f"analysis_{analysis}"
                 )
+            corr_method = st.selectbox(
+                "Méthode de corrélation", ["pearson", "spearman"], key="corr_method"
+            )
+            exact_plots = st.checkbox(
+                "Rendu exact des graphiques (données brutes, lent sur de gros volumes)",
+                value=st.session_state.get("exact_plots", False), key="exact_plots"
+            )
+            eda_workers = st.number_input(
+                "Nombre de processus pour les analyses", min_value=1, max_value=os.cpu_count() or 1,
+                value=min(EDA_WORKERS, os.cpu_count() or 1), key="eda_workers"
+            )
             submitted = st.form_submit_button("Appliquer EDA+")
 
         if submitted:
@@ -184,36 +446,75 @@ if st.session_state.loaded and st.session_state.df is not None:
             if not selected_columns:
                 st.warning("Veuillez sélectionner au moins une colonne.")
             else:
+                # Pile de tracé (matplotlib, seaborn) importée à la première analyse et non au démarrage
+                from src.eda_advanced import numeric_columns, descriptive_stats
                 df_selected = df[selected_columns]
-                if st.session_state.selected_analyses.get("Statistiques descriptives", False):
-                    st.write("**Statistiques descriptives :**")
-                    st.dataframe(descriptive_stats(df_selected))
-                if st.session_state.selected_analyses.get("Distribution", False):
-                    numerical_cols = df_selected.select_dtypes(include=['float64', 'int64']).columns
-                    for col in numerical_cols:
-                        st.write(f"**Distribution de {col} :**")
-                        fig = plot_distribution(df_selected, col)
-                        st.pyplot(fig)
-                if st.session_state.selected_analyses.get("Corrélation", False):
-                    fig = plot_correlation(df_selected)
-                    if fig:
-                        st.write("**Matrice de corrélation :**")
-                        st.pyplot(fig)
-                    else:
-                        st.write("Veuillez sélectionner au moins deux colonnes numériques pour la corrélation.")
-                if st.session_state.selected_analyses.get("Valeurs manquantes", False):
-                    fig = plot_missing_values(df_selected)
-                    if fig:
-                        st.write("**Visualisation des valeurs manquantes :**")
-                        st.pyplot(fig)
-                    else:
-                        st.write("Aucune valeur manquante détectée.")
-                if st.session_state.selected_analyses.get("Boîtes à moustaches", False):
-                    numerical_cols = df_selected.select_dtypes(include=['float64', 'int64']).columns
-                    for col in numerical_cols:
-                        st.write(f"**Boîte à moustaches pour {col} :**")
-                        fig = plot_boxplot(df_selected, col)
-                        st.pyplot(fig)
+                profile = st.session_state.profile.update(df)
+                fingerprints = profile.fingerprints(df, selected_columns)
+                numerical_cols = list(numeric_columns(df_selected))
+                selected = st.session_state.selected_analyses
+
+                # Planification : une tâche par graphique, chacune avec son emplacement dans la page
+                tasks = []
+                if selected.get("Statistiques descriptives", False):
+                    tasks.append(EdaTask("summaries", numerical_cols, fingerprints))
+                if selected.get("Distribution", False):
+                    tasks += [EdaTask("distribution", [col], fingerprints, exact=exact_plots) for col in numerical_cols]
+                if selected.get("Corrélation", False):
+                    tasks.append(EdaTask("correlation", numerical_cols, fingerprints, method=corr_method))
+                if selected.get("Valeurs manquantes", False):
+                    tasks.append(EdaTask("missing", selected_columns, fingerprints))
+                if selected.get("Boîtes à moustaches", False):
+                    tasks.append(EdaTask("boxplots", numerical_cols, fingerprints))
+                slots = {task.key: st.container() for task in tasks}
+                for task in tasks:
+                    if task.analysis == "distribution":
+                        slots[task.key].write(f"**Distribution de {task.columns[0]} :**")
+                progress = st.progress(0.0, text="Analyses en cours...")
+
+                # Les résultats sont affichés dans leur emplacement au fur et à mesure de leur achèvement
+                executor = get_eda_executor(eda_workers)
+                results = executor.run(df_selected, tasks, fingerprints, cache=get_render_cache(),
+                                       null_mask=profile.null_mask)
+                with span("eda", rows=len(df_selected), analyses=len(tasks)):
+                    for done, (task, result, error) in enumerate(results, start=1):
+                        progress.progress(done / len(tasks), text=f"Analyses terminées : {done}/{len(tasks)}")
+                        with slots[task.key]:
+                            if error is not None:
+                                st.error(f"Erreur lors de l'analyse ({task.analysis}) : {error}")
+                            elif task.analysis == "summaries":
+                                st.write("**Statistiques descriptives :**")
+                                st.dataframe(descriptive_stats(df_selected, summaries=result))
+                            elif task.analysis == "distribution":
+                                st.image(result, use_container_width=True)
+                            elif task.analysis == "correlation":
+                                if result['png']:
+                                    st.write(f"**Matrice de corrélation ({corr_method}) :**")
+                                    st.image(result['png'], use_container_width=True)
+                                    st.write("**Paires les plus corrélées :**")
+                                    st.dataframe(top_correlated_pairs(result['corr'], k=10))
+                                else:
+                                    st.write("Veuillez sélectionner au moins deux colonnes numériques pour la corrélation.")
+                            elif task.analysis == "missing":
+                                if result:
+                                    st.write("**Visualisation des valeurs manquantes :**")
+                                    st.image(result['bar'], use_container_width=True)
+                                    st.write("**Matrice de nullité (par bandes de lignes) :**")
+                                    st.image(result['matrix'], use_container_width=True)
+                                    if result['nullity']:
+                                        st.write("**Corrélation de nullité entre colonnes :**")
+                                        st.image(result['nullity'], use_container_width=True)
+                                else:
+                                    st.write("Aucune valeur manquante détectée.")
+                            elif task.analysis == "boxplots":
+                                if result:
+                                    st.write("**Boîtes à moustaches :**")
+                                    st.image(result['png'], use_container_width=True)
+                                    if result['capped']:
+                                        st.caption("Valeurs aberrantes sous-échantillonnées pour : " + ", ".join(result['capped']))
+                                else:
+                                    st.write("Aucune colonne numérique sélectionnée.")
+                progress.empty()
         back_to_main()
 
     # ------------------ Mode Traitement ------------------
@@ -239,46 +540,40 @@ if st.session_state.loaded and st.session_state.df is not None:
             else:
                 n = st.number_input("Nombre de lignes à échantillonner", min_value=1, max_value=len(df), value=min(1000, len(df)))
                 frac = None
+            strata, allocation, min_per_stratum = [], "proportional", 1
+            if method == "random_representatif":
+                strata = st.multiselect("Colonnes de stratification", options=df.columns.tolist())
+                allocation = st.selectbox("Allocation entre strates", ["proportional", "equal"])
+                min_per_stratum = st.number_input("Nombre minimum de lignes par strate", min_value=0, value=1)
+            seed = st.number_input("Graine aléatoire (reproductibilité)", min_value=0, value=42)
             
             output_dir = select_output_dir()
             default_output_name = get_default_output_name("echantillonnage")
             output_name = st.text_input("Nom du fichier de sortie", default_output_name)
-            output_format = st.selectbox("Format de sortie", ["CSV", "Excel"])
-            
-            # Choix du séparateur spécifique pour l'export CSV
-            export_separators = [",", ";", "\t", "|"]
-            export_separator = st.selectbox(
-                "Choisir le séparateur CSV pour l'exportation (si CSV)",
-                options=export_separators,
-                index=0
-            )
-
-            # Choix de l'encodage
-            output_encoding = st.selectbox(
-                "Choisir l'encodage pour le fichier de sortie",
-                options=["utf-8", "utf-8-sig", "latin-1", "iso-8859-1", "cp1252", "ascii"],
-                index=0
-            )
+            output_format, output_encoding, export_separator = select_export_options()
 
             if st.button("Échantillonner"):
                 try:
-                    df_sample = sample_data(df, method, n, frac)
+                    if strata:
+                        df_sample, strata_report = stratified_sample(
+                            df, strata, n=n, frac=frac, allocation=allocation,
+                            min_per_stratum=int(min_per_stratum), seed=int(seed)
+                        )
+                        st.write("**Effectifs par strate (population / échantillon) :**")
+                        st.dataframe(strata_report, use_container_width=True)
+                    else:
+                        df_sample = sample_data(df, method, n, frac, seed=int(seed))
                     st.write("**Aperçu de l’échantillon :**")
                     st.dataframe(df_sample.head(), use_container_width=True)
                     st.write(f"**Dimensions de l'échantillon :** {df_sample.shape[0]} lignes, {df_sample.shape[1]} colonnes")
                     sample_size = df_sample.memory_usage(deep=True).sum()
                     st.write(f"**Taille estimée en mémoire de l'échantillon :** {sample_size / (1024 * 1024):.2f} Mo")
 
-                    if output_format == "CSV":
-                        output_path = os.path.join(output_dir, f"{output_name}.csv")
-                        # On utilise le séparateur choisi pour l'export CSV
-                        df_sample.to_csv(output_path, index=False, encoding=output_encoding, sep=export_separator)
-                    else:
-                        output_path = os.path.join(output_dir, f"{output_name}.xlsx")
-                        df_sample.to_excel(output_path, index=False)
-                    
+                    output_path = export_with_progress(
+                        df_sample, output_dir, output_name, output_format, output_encoding, export_separator
+                    )
                     st.success(f"Fichier sauvegardé sous {output_path}")
-                    st.session_state.last_file = output_path
+                    set_last_file(df_sample, output_path)
                 except Exception as e:
                     st.error(f"Erreur lors de l’échantillonnage : {e}")
         
@@ -293,35 +588,20 @@ if st.session_state.loaded and st.session_state.df is not None:
                 submit_rename = st.form_submit_button("Renommer les colonnes")
             if submit_rename:
                 try:
-                    df_renamed = rename_columns(df, new_names)
-                    st.session_state.df = df_renamed
+                    df_renamed = rename_columns(df, new_names, profile=st.session_state.profile)
+                    set_session_frame(df_renamed)
                     st.write("**Aperçu après renommage :**")
                     st.dataframe(df_renamed.head(), use_container_width=True)
                     output_dir = select_output_dir()
                     default_output_name = get_default_output_name("renommage")
                     output_name = st.text_input("Nom du fichier de sortie", default_output_name)
-                    output_format = st.selectbox("Format de sortie", ["CSV", "Excel"])
-                    output_encoding = st.selectbox(
-                        "Choisir l'encodage pour le fichier de sortie",
-                        options=["utf-8", "utf-8-sig", "latin-1", "iso-8859-1", "cp1252", "ascii"],
-                        index=0
-                    )
-                    # Optionnel : un séparateur pour l'export CSV si voulu
-                    export_separators = [",", ";", "\t", "|"]
-                    export_separator = st.selectbox(
-                        "Séparateur CSV (si CSV)",
-                        options=export_separators,
-                        index=0
-                    )
+                    output_format, output_encoding, export_separator = select_export_options()
                     if st.button("Enregistrer le fichier renommé"):
-                        if output_format == "CSV":
-                            output_path = os.path.join(output_dir, f"{output_name}.csv")
-                            df_renamed.to_csv(output_path, index=False, encoding=output_encoding, sep=export_separator)
-                        else:
-                            output_path = os.path.join(output_dir, f"{output_name}.xlsx")
-                            df_renamed.to_excel(output_path, index=False)
+                        output_path = export_with_progress(
+                            df_renamed, output_dir, output_name, output_format, output_encoding, export_separator
+                        )
                         st.success(f"Fichier sauvegardé sous {output_path}")
-                        st.session_state.last_file = output_path
+                        set_last_file(df_renamed, output_path)
                 except Exception as e:
                     st.error(f"Erreur lors du renommage : {e}")
         
@@ -329,7 +609,7 @@ if st.session_state.loaded and st.session_state.df is not None:
         elif traitement == "Remplissage des valeurs null":
             st.subheader("Remplissage des valeurs null / NaN")
             st.write("**Nombre de valeurs null par colonne :**")
-            missing_counts = df.isnull().sum()
+            missing_counts = pd.Series(st.session_state.profile.update(df).info()['missing_values'], dtype='int64')
             st.dataframe(
                 missing_counts.reset_index().rename(columns={'index': 'Colonne', 0: 'Nombre de null'}),
                 use_container_width=True
@@ -343,42 +623,57 @@ if st.session_state.loaded and st.session_state.df is not None:
             if selected_cols:
                 method_option = st.selectbox(
                     "Sélectionnez la méthode de remplacement", 
-                    options=["0", "mean", "median", "ffill", "bfill", "custom"]
+                    options=FILL_METHODS
                 )
-                custom_value = None
+                custom_value, group_by, order_by = None, None, None
                 if method_option == "custom":
                     custom_value = st.text_input("Entrez la valeur à utiliser pour le remplacement")
+                elif method_option.startswith("group_"):
+                    group_by = st.multiselect(
+                        "Colonnes de regroupement (ex : catégorie)",
+                        options=[col for col in df.columns if col not in selected_cols]
+                    )
+                elif method_option == "interpolate":
+                    order_by = st.selectbox(
+                        "Colonne d'ordre (ex : date) pour l'interpolation",
+                        options=["(ordre des lignes)"] + [col for col in df.columns if col not in selected_cols]
+                    )
+                    order_by = None if order_by == "(ordre des lignes)" else order_by
                 if st.button("Remplir les valeurs null"):
                     try:
-                        df_filled = fill_missing_values(df, selected_cols, method_option, custom_value)
-                        st.session_state.df = df_filled
+                        df_filled = fill_missing_values(
+                            df, selected_cols, method_option, custom_value, profile=st.session_state.profile,
+                            group_by=group_by, order_by=order_by
+                        )
+                        set_session_frame(df_filled)
                         st.write("**Aperçu après remplissage :**")
                         st.dataframe(df_filled.head(), use_container_width=True)
                         output_dir = select_output_dir()
                         default_output_name = get_default_output_name("remplissage")
                         output_name = st.text_input("Nom du fichier de sortie", default_output_name)
-                        output_format = st.selectbox("Format de sortie", ["CSV", "Excel"])
-                        output_encoding = st.selectbox(
-                            "Choisir l'encodage pour le fichier de sortie",
-                            options=["utf-8", "utf-8-sig", "latin-1", "iso-8859-1", "cp1252", "ascii"],
-                            index=0
-                        )
-                        # Optionnel : un séparateur pour l'export CSV
-                        export_separators = [",", ";", "\t", "|"]
-                        export_separator = st.selectbox(
-                            "Séparateur CSV (si CSV)",
-                            options=export_separators,
-                            index=0
-                        )
+                        output_format, output_encoding, export_separator = select_export_options()
                         if st.button("Enregistrer le fichier traité"):
-                            if output_format == "CSV":
-                                output_path = os.path.join(output_dir, f"{output_name}.csv")
-                                df_filled.to_csv(output_path, index=False, encoding=output_encoding, sep=export_separator)
-                            else:
-                                output_path = os.path.join(output_dir, f"{output_name}.xlsx")
-                                df_filled.to_excel(output_path, index=False)
+                            output_path = export_with_progress(
+                                df_filled, output_dir, output_name, output_format, output_encoding, export_separator
+                            )
                             st.success(f"Fichier sauvegardé sous {output_path}")
-                            st.session_state.last_file = output_path
+                            set_last_file(df_filled, output_path)
                     except Exception as e:
                         st.error(f"Erreur lors du remplissage : {e}")
         back_to_main()
+
+# ------------------ Panneau d'instrumentation ------------------
+if trace_enabled:
+    with trace_panel:
+        last_spans = st.session_state.tracer.last_run()
+        if last_spans:
+            total = sum(s['wall_s'] for s in last_spans if s['depth'] == 0)
+            st.write(f"**Dernière exécution :** {total:.3f} s mesurées")
+            st.dataframe(spans_to_frame(last_spans), use_container_width=True, hide_index=True)
+            st.caption(f"Mesures enregistrées dans {TRACE_FILE}")
+        else:
+            st.write("Aucune opération mesurée.")
+
+# ------------------ Budget mémoire des sessions ------------------
+with memory_panel:
+    render_memory_usage()
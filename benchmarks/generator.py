@@ -0,0 +1,110 @@
+# generator.py
+# Ce module génère des datasets synthétiques déterministes (même graine -> mêmes données) pour les benchmarks :
+# types mixtes, valeurs manquantes, catégories, variantes larges et schéma calqué sur data/spotify_2023.csv.
+import numpy as np
+import pandas as pd
+
+# Datasets disponibles
+DATASETS = ['mixed', 'wide', 'spotify']
+
+# Nombre de colonnes numériques de la variante large
+WIDE_COLUMNS = 100
+
+_KEYS = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'B']
+
+
+def _with_nulls(values, rng, fraction):
+    """Remplace une part des valeurs par des valeurs manquantes (NaN, ou None pour les objets)."""
+    series = pd.Series(values)
+    return series.mask(rng.random(len(series)) < fraction)
+
+
+def _labels(prefix, codes):
+    """Libellés textuels '<prefix> <code>' construits sans boucle Python."""
+    return pd.Series(codes).astype(str).radd(f"{prefix} ").to_numpy(dtype=object)
+
+
+def _mixed(n_rows, rng):
+    return pd.DataFrame({
+        'id': np.arange(n_rows, dtype=np.int64),
+        'montant': _with_nulls(rng.lognormal(3, 1, n_rows).round(2), rng, 0.05),
+        'quantite': rng.integers(0, 50, n_rows),
+        'score': _with_nulls(rng.normal(0, 1, n_rows), rng, 0.2),
+        'categorie': pd.Categorical(rng.choice(['A', 'B', 'C', 'D', 'E'], n_rows, p=[0.4, 0.3, 0.15, 0.1, 0.05])),
+        'region': _with_nulls(rng.choice(['Nord', 'Sud', 'Est', 'Ouest', 'Centre'], n_rows).astype(object), rng, 0.1),
+        'client': _labels('client', rng.integers(0, max(n_rows // 10, 1), n_rows)),
+        'date': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 5 * 365 * 24 * 3600, n_rows), unit='s'),
+        'actif': rng.random(n_rows) < 0.7,
+    })
+
+
+def _wide(n_rows, rng, n_columns=WIDE_COLUMNS):
+    data = {'groupe': rng.choice(['g1', 'g2', 'g3', 'g4'], n_rows).astype(object)}
+    base = rng.normal(0, 1, n_rows)
+    for i in range(n_columns):
+        # Colonnes partiellement corrélées entre elles, avec une part de valeurs manquantes croissante
+        values = 0.3 * base + rng.normal(0, 1, n_rows)
+        data[f"x{i:03d}"] = _with_nulls(values, rng, 0.3 * i / n_columns)
+    return pd.DataFrame(data)
+
+
+def _thousands(values):
+    """Nombres écrits avec un séparateur de milliers ('1,234'), comme certaines colonnes du fichier Spotify."""
+    return pd.Series(values).map('{:,}'.format).to_numpy(dtype=object)
+
+
+def _spotify(n_rows, rng):
+    n_artists = max(n_rows // 5, 1)
+    streams = rng.lognormal(19, 1.2, n_rows).astype(np.int64).astype(str).astype(object)
+    streams[rng.random(n_rows) < 0.001] = 'BPM110KeyAModeMajorDanceability53'  # ligne corrompue du fichier d'origine
+    deezer = rng.lognormal(3.5, 1.5, n_rows).astype(np.int64)
+    shazam = _with_nulls(_thousands(rng.lognormal(3, 2, n_rows).astype(np.int64)), rng, 0.05)
+    return pd.DataFrame({
+        'track_name': _labels('Track', rng.integers(0, n_rows, n_rows)),
+        'artist(s)_name': _labels('Artist', rng.zipf(1.5, n_rows) % n_artists),
+        'artist_count': np.minimum(rng.geometric(0.7, n_rows), 8),
+        'released_year': np.clip(2023 - rng.exponential(6, n_rows).astype(np.int64), 1930, 2023),
+        'released_month': rng.integers(1, 13, n_rows),
+        'released_day': rng.integers(1, 32, n_rows),
+        'in_spotify_playlists': rng.lognormal(7.5, 1.2, n_rows).astype(np.int64),
+        'in_spotify_charts': np.where(rng.random(n_rows) < 0.4, 0, rng.integers(1, 150, n_rows)),
+        'streams': streams,
+        'in_apple_playlists': rng.lognormal(3.5, 1.1, n_rows).astype(np.int64),
+        'in_apple_charts': rng.integers(0, 275, n_rows),
+        'in_deezer_playlists': np.where(deezer >= 1000, _thousands(deezer), deezer.astype(str)).astype(object),
+        'in_deezer_charts': np.where(rng.random(n_rows) < 0.6, 0, rng.integers(1, 60, n_rows)),
+        'in_shazam_charts': shazam,
+        'bpm': rng.integers(65, 207, n_rows),
+        'key': _with_nulls(rng.choice(_KEYS, n_rows).astype(object), rng, 0.1),
+        'mode': rng.choice(['Major', 'Minor'], n_rows, p=[0.58, 0.42]).astype(object),
+        'danceability_%': np.clip(rng.normal(67, 15, n_rows), 23, 96).astype(np.int64),
+        'valence_%': rng.integers(4, 98, n_rows),
+        'energy_%': np.clip(rng.normal(64, 17, n_rows), 9, 97).astype(np.int64),
+        'acousticness_%': np.minimum(rng.exponential(27, n_rows), 97).astype(np.int64),
+        'instrumentalness_%': np.where(rng.random(n_rows) < 0.9, 0, rng.integers(1, 91, n_rows)),
+        'liveness_%': np.clip(rng.lognormal(2.8, 0.6, n_rows), 3, 97).astype(np.int64),
+        'speechiness_%': np.clip(rng.lognormal(2.1, 0.7, n_rows), 2, 64).astype(np.int64),
+    })
+
+
+def make_dataset(kind, n_rows, seed=0):
+    """
+    Génère un dataset synthétique déterministe.
+
+    :param kind: 'mixed' (types mixtes, catégories, dates, valeurs manquantes), 'wide' (WIDE_COLUMNS colonnes
+                 numériques corrélées) ou 'spotify' (schéma de data/spotify_2023.csv)
+    :param n_rows: Nombre de lignes
+    :param seed: Graine aléatoire
+    :return: DataFrame pandas
+    """
+    if kind not in DATASETS:
+        raise ValueError(f"Dataset inconnu : {kind} (datasets : {DATASETS})")
+    rng = np.random.default_rng(seed)
+    builder = {'mixed': _mixed, 'wide': _wide, 'spotify': _spotify}[kind]
+    return builder(int(n_rows), rng)
+
+
+def write_dataset(df, path, encoding='utf-8'):
+    """Écrit un dataset généré au format CSV (séparateur ',')."""
+    df.to_csv(path, index=False, encoding=encoding)
+    return path
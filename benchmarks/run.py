@@ -0,0 +1,387 @@
+# run.py
+# Ce module mesure la durée et le pic mémoire des fonctions coûteuses de Data Toolkit (chargement,
+# échantillonnage, infos, remplissage des valeurs nulles, graphiques EDA+, export) sur des datasets
+# synthétiques déterministes, ainsi que le démarrage de l'application (import des modules de app.py),
+# enregistre les résultats en JSON et peut les comparer à une référence.
+#
+# Utilisation :
+#     python -m benchmarks.run [--rows 1e5 1e6] [--datasets mixed spotify] [--cases load eda.]
+#                              [--output resultats.json] [--compare reference.json --threshold 0.25]
+#     python -m benchmarks.run --compare reference.json --input resultats.json   (comparaison seule)
+import argparse
+import ast
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generator import DATASETS, make_dataset, write_dataset
+from src.data_loader import load_data, sample_data
+from src.eda import get_data_info
+from src import eda_advanced
+from src.export import write_csv, write_excel
+from src.null_mask import NullMask
+from src.render_cache import figure_to_png
+from src.treatments import fill_missing_values
+from src.version import VERSION
+
+# Tailles par défaut (les tailles jusqu'à 1e7 lignes se demandent avec --rows)
+BENCH_ROWS = [100_000, 1_000_000]
+# Au-delà de ce nombre de cellules (lignes x colonnes), un dataset est ignoré (mémoire de la machine)
+MAX_CELLS = 200_000_000
+# L'export Excel (lent, limité à 1 048 576 lignes) est mesuré sur les premières lignes seulement
+EXCEL_BENCH_MAX_ROWS = 50_000
+# Nombre de lignes des échantillons de taille fixe
+SAMPLE_ROWS = 1000
+# Hausse relative au-delà de laquelle une mesure est signalée comme une régression
+DEFAULT_THRESHOLD = 0.25
+# En dessous de ces valeurs, les écarts relèvent du bruit de mesure et ne sont pas signalés
+MIN_COMPARED_SECONDS = 0.05
+MIN_COMPARED_PEAK_MB = 5.0
+# Répertoire par défaut des résultats
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+# Application dont le démarrage est mesuré
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT_DIR, 'app.py')
+STARTUP_CASE = 'startup.import_app'
+# Modules lourds importés à la demande (graphiques EDA+, Excel) : ils ne doivent pas être chargés au démarrage
+DEFERRED_MODULES = ('matplotlib', 'seaborn', 'openpyxl')
+
+
+class SkipCase(Exception):
+    """Cas non applicable au dataset (ex : aucune colonne de regroupement)."""
+
+
+class BenchContext:
+    """Dataset en mémoire, son fichier CSV et les éléments dérivés partagés par les cas."""
+
+    def __init__(self, kind, n_rows, seed, tmp_dir):
+        self.kind = kind
+        self.n_rows = n_rows
+        self.tmp_dir = tmp_dir
+        self.df = make_dataset(kind, n_rows, seed)
+        self.csv_path = write_dataset(self.df, os.path.join(tmp_dir, f"{kind}_{n_rows}.csv"))
+        self.numeric = list(eda_advanced.numeric_columns(self.df))
+        self.fill_columns = [col for col in self.numeric if self.df[col].isna().any()] or self.numeric[:1]
+        self.group_by = next((col for col in self.df.columns
+                              if not pd.api.types.is_numeric_dtype(self.df[col])
+                              and not pd.api.types.is_datetime64_any_dtype(self.df[col])
+                              and self.df[col].nunique() <= 50), None)
+        self.mask = NullMask.from_frame(self.df)
+
+    def output(self, name):
+        return os.path.join(self.tmp_dir, name)
+
+    def group_column(self):
+        if self.group_by is None:
+            raise SkipCase("aucune colonne de regroupement")
+        return self.group_by
+
+
+def _plot(plot_func, *args, **kwargs):
+    """Trace puis rastérise la figure, comme l'application (le rendu PNG fait partie du coût)."""
+    figure_to_png(plot_func(*args, **kwargs))
+
+
+def _excel(ctx):
+    write_excel(ctx.df.head(EXCEL_BENCH_MAX_ROWS), ctx.output('export.xlsx'))
+
+
+# Cas mesurés : nom -> fonction(ctx)
+CASES = {
+    'load_data[pandas]': lambda ctx: load_data(ctx.csv_path),
+    'load_data[pyarrow]': lambda ctx: load_data(ctx.csv_path, engine='pyarrow'),
+    'sample_data[random_total]': lambda ctx: sample_data(ctx.df, 'random_total', frac=0.1, seed=0),
+    'sample_data[random_representatif]': lambda ctx: sample_data(ctx.df, 'random_representatif', frac=0.1, seed=0,
+                                                                 strata=ctx.group_column()),
+    'sample_data[fichier,random_total]': lambda ctx: sample_data(ctx.csv_path, 'random_total', n=SAMPLE_ROWS, seed=0),
+    'sample_data[fichier,last_n]': lambda ctx: sample_data(ctx.csv_path, 'last_n', n=SAMPLE_ROWS),
+    'get_data_info': lambda ctx: get_data_info(ctx.df),
+    'fill_missing_values[mean]': lambda ctx: fill_missing_values(ctx.df, ctx.fill_columns, 'mean'),
+    'fill_missing_values[ffill]': lambda ctx: fill_missing_values(ctx.df, ctx.fill_columns, 'ffill'),
+    'fill_missing_values[group_mean]': lambda ctx: fill_missing_values(ctx.df, ctx.fill_columns, 'group_mean',
+                                                                       group_by=ctx.group_column()),
+    'eda.plot_distribution': lambda ctx: _plot(eda_advanced.plot_distribution, ctx.df, ctx.fill_columns[0]),
+    'eda.plot_correlation': lambda ctx: _plot(eda_advanced.plot_correlation, ctx.df),
+    'eda.plot_missing_values': lambda ctx: _plot(eda_advanced.plot_missing_values, ctx.df, ctx.mask),
+    'eda.plot_missing_matrix': lambda ctx: _plot(eda_advanced.plot_missing_matrix, ctx.mask),
+    'eda.plot_nullity_correlation': lambda ctx: _plot(eda_advanced.plot_nullity_correlation, ctx.mask),
+    'eda.plot_boxplot': lambda ctx: _plot(eda_advanced.plot_boxplot, ctx.df, ctx.fill_columns[0]),
+    'eda.plot_boxplots': lambda ctx: _plot(eda_advanced.plot_boxplots, eda_advanced.box_summaries(ctx.df)),
+    'export.write_csv': lambda ctx: write_csv(ctx.df, ctx.output('export.csv')),
+    'export.write_csv[gzip]': lambda ctx: write_csv(ctx.df, ctx.output('export.csv.gz'), compress='gzip'),
+    f'export.write_excel[{EXCEL_BENCH_MAX_ROWS} lignes]': _excel,
+}
+
+
+def measure(func, repeat=3):
+    """
+    Mesure une fonction : durée minimale sur `repeat` exécutions, puis pic mémoire sur une exécution
+    supplémentaire sous tracemalloc (qui ralentit le code et n'intervient donc pas dans les durées).
+
+    Le pic couvre les allocations Python et numpy/pandas ; la mémoire allouée par Arrow (moteur pyarrow)
+    n'est pas suivie par tracemalloc.
+
+    :return: Dictionnaire {'seconds', 'seconds_all', 'peak_mb'}
+    """
+    timings = []
+    for _ in range(max(repeat, 1)):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'seconds': round(min(timings), 4),
+        'seconds_all': [round(t, 4) for t in timings],
+        'peak_mb': round(peak / 1024 ** 2, 2),
+    }
+
+
+def select_cases(patterns=None):
+    """Cas dont le nom contient l'un des motifs (tous les cas par défaut)."""
+    if not patterns:
+        return dict(CASES)
+    return {name: func for name, func in CASES.items() if any(p in name for p in patterns)}
+
+
+def app_imports(app_path=APP_PATH):
+    """Modules importés au niveau supérieur de app.py (lus sans exécuter le script Streamlit)."""
+    with open(app_path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=app_path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+# Exécuté dans un interpréteur neuf : durée d'import, mémoire résidente maximale et modules différés chargés
+_STARTUP_SCRIPT = """
+import importlib, json, sys, time
+modules, deferred = sys.argv[1].split(','), sys.argv[2].split(',')
+start = time.perf_counter()
+for module in modules:
+    importlib.import_module(module)
+seconds = time.perf_counter() - start
+try:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = rss / 1024 ** 2 if sys.platform == 'darwin' else rss / 1024
+except ImportError:
+    peak_mb = None
+print(json.dumps({'seconds': seconds, 'peak_mb': peak_mb,
+                  'deferred_loaded': [m for m in deferred if m in sys.modules]}))
+"""
+
+
+def measure_startup(repeat=3, app_path=APP_PATH):
+    """
+    Mesure le démarrage de l'application : import des modules de app.py dans un interpréteur neuf
+    (caches de bytecode déjà compilés), durée minimale sur `repeat` exécutions.
+
+    Le pic mémoire est la mémoire résidente maximale du processus (interpréteur compris), indisponible
+    sous Windows.
+
+    :return: Dictionnaire {'seconds', 'seconds_all', 'peak_mb', 'modules', 'deferred_loaded'}
+    """
+    modules = app_imports(app_path)
+    command = [sys.executable, '-c', _STARTUP_SCRIPT, ','.join(modules), ','.join(DEFERRED_MODULES)]
+    runs = []
+    for _ in range(max(repeat, 1)):
+        output = subprocess.run(command, cwd=os.path.dirname(os.path.abspath(app_path)), capture_output=True,
+                                text=True, check=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    peaks = [run['peak_mb'] for run in runs if run['peak_mb'] is not None]
+    return {
+        'seconds': round(min(run['seconds'] for run in runs), 4),
+        'seconds_all': [round(run['seconds'], 4) for run in runs],
+        'peak_mb': round(min(peaks), 3) if peaks else None,
+        'modules': len(modules),
+        'deferred_loaded': sorted({m for run in runs for m in run['deferred_loaded']}),
+    }
+
+
+def run_benchmarks(rows=BENCH_ROWS, datasets=DATASETS, cases=None, repeat=3, seed=0, max_cells=MAX_CELLS,
+                   log=print, startup=False):
+    """
+    Exécute les cas sélectionnés sur chaque dataset et chaque taille.
+
+    :param rows: Tailles des datasets (nombres de lignes)
+    :param datasets: Datasets du générateur
+    :param cases: Dictionnaire nom -> fonction(ctx) (par défaut tous les cas de CASES)
+    :param repeat: Nombre d'exécutions chronométrées par cas
+    :param seed: Graine du générateur
+    :param max_cells: Taille maximale (lignes x colonnes) d'un dataset ; les plus grands sont ignorés
+    :param log: Fonction d'affichage de la progression (None pour aucun affichage)
+    :param startup: True pour mesurer aussi le démarrage de l'application (cas STARTUP_CASE)
+    :return: Dictionnaire {'meta': ..., 'results': [...]} sérialisable en JSON
+    """
+    log = log or (lambda *args: None)
+    cases = CASES if cases is None else cases
+    results = []
+    if startup:
+        entry = {'dataset': 'startup', 'rows': 0, 'columns': 0, 'case': STARTUP_CASE, **measure_startup(repeat)}
+        peak = '-' if entry['peak_mb'] is None else f"{entry['peak_mb']:.1f}"
+        log(f"{'startup':8} {0:>10} {STARTUP_CASE:45} {entry['seconds']:>9.3f} s {peak:>9} Mo")
+        if entry['deferred_loaded']:
+            log(f"Modules chargés au démarrage au lieu d'être importés à la demande : {entry['deferred_loaded']}")
+        results.append(entry)
+    tmp_dir = tempfile.mkdtemp(prefix='bench_')
+    try:
+        for kind in (datasets if cases else []):
+            for n_rows in rows:
+                n_rows = int(n_rows)
+                n_columns = make_dataset(kind, 1, seed).shape[1]
+                if n_rows * n_columns > max_cells:
+                    log(f"{kind} {n_rows} lignes : ignoré ({n_rows * n_columns} cellules > {max_cells})")
+                    continue
+                ctx = BenchContext(kind, n_rows, seed, tmp_dir)
+                for name, func in cases.items():
+                    entry = {'dataset': kind, 'rows': n_rows, 'columns': n_columns, 'case': name}
+                    try:
+                        entry.update(measure(lambda: func(ctx), repeat))
+                        log(f"{kind:8} {n_rows:>10} {name:45} {entry['seconds']:>9.3f} s {entry['peak_mb']:>9.1f} Mo")
+                    except SkipCase as e:
+                        entry['skipped'] = str(e)
+                    results.append(entry)
+                del ctx
+                gc.collect()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return {'meta': environment(repeat, seed), 'results': results}
+
+
+def environment(repeat, seed):
+    """Description de l'environnement de mesure (à prendre en compte avant de comparer deux fichiers)."""
+    versions = {'pandas': pd.__version__, 'numpy': np.__version__, 'matplotlib': matplotlib.__version__}
+    try:
+        import pyarrow
+        versions['pyarrow'] = pyarrow.__version__
+    except ImportError:
+        versions['pyarrow'] = None
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'toolkit_version': VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'versions': versions,
+        'repeat': repeat,
+        'seed': seed,
+    }
+
+
+def _key(entry):
+    return entry['dataset'], entry['rows'], entry['case']
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD, min_seconds=MIN_COMPARED_SECONDS,
+            min_peak_mb=MIN_COMPARED_PEAK_MB):
+    """
+    Compare des résultats à une référence et renvoie les régressions.
+
+    Une mesure régresse si elle dépasse la référence de plus de `threshold` (en relatif) ; les mesures
+    dont la référence et la valeur sont toutes deux sous les seuils de bruit sont ignorées, de même que
+    les cas absents de l'un des deux fichiers.
+
+    :param results: Résultats de run_benchmarks() (ou leur fichier JSON relu)
+    :param baseline: Résultats de référence
+    :return: Liste de dictionnaires {'dataset', 'rows', 'case', 'metric', 'baseline', 'current', 'ratio'}
+    """
+    reference = {_key(entry): entry for entry in baseline['results'] if 'skipped' not in entry}
+    regressions = []
+    for entry in results['results']:
+        base = reference.get(_key(entry))
+        if base is None or 'skipped' in entry:
+            continue
+        for metric, floor in (('seconds', min_seconds), ('peak_mb', min_peak_mb)):
+            old, new = base.get(metric), entry.get(metric)
+            if old is None or new is None or max(old, new) < floor:
+                continue
+            ratio = new / old if old else float('inf')
+            if ratio > 1 + threshold:
+                regressions.append({'dataset': entry['dataset'], 'rows': entry['rows'], 'case': entry['case'],
+                                    'metric': metric, 'baseline': old, 'current': new, 'ratio': round(ratio, 2)})
+    return regressions
+
+
+def _read_json(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    """Point d'entrée en ligne de commande ; renvoie 1 si des régressions sont détectées, 0 sinon."""
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run',
+                                     description="Benchmarks de performance de Data Toolkit.")
+    parser.add_argument('--rows', nargs='+', type=float, default=BENCH_ROWS,
+                        help="Nombres de lignes (ex : 1e5 1e6 1e7)")
+    parser.add_argument('--datasets', nargs='+', choices=DATASETS, default=DATASETS)
+    parser.add_argument('--cases', nargs='+', help="Motifs des cas à exécuter (ex : load_data eda.)")
+    parser.add_argument('--repeat', type=int, default=3, help="Exécutions chronométrées par cas")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-cells', type=float, default=MAX_CELLS,
+                        help="Taille maximale d'un dataset (lignes x colonnes)")
+    parser.add_argument('--output', help="Fichier JSON des résultats (par défaut : benchmarks/results/<date>.json)")
+    parser.add_argument('--input', help="Résultats existants à comparer (aucune mesure n'est exécutée)")
+    parser.add_argument('--compare', help="Fichier JSON de référence")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Hausse relative signalée comme régression (0.25 = +25 %%)")
+    parser.add_argument('--list', action='store_true', help="Affiche les cas disponibles")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        print("\n".join([STARTUP_CASE, *CASES]))
+        return 0
+    if args.input:
+        if not args.compare:
+            parser.error("--input s'utilise avec --compare")
+        results = _read_json(args.input)
+    else:
+        cases = select_cases(args.cases)
+        startup = not args.cases or any(p in STARTUP_CASE for p in args.cases)
+        if not cases and not startup:
+            parser.error(f"Aucun cas ne correspond à {args.cases} (voir --list)")
+        results = run_benchmarks(args.rows, args.datasets, cases, args.repeat, args.seed, args.max_cells,
+                                 startup=startup)
+        output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime('%Y%m%d_%H%M%S') + '.json')
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"{len(results['results'])} mesure(s) enregistrée(s) : {output}")
+
+    if not args.compare:
+        return 0
+    regressions = compare(results, _read_json(args.compare), args.threshold)
+    for r in regressions:
+        unit = 's' if r['metric'] == 'seconds' else 'Mo'
+        print(f"RÉGRESSION {r['dataset']} {r['rows']} {r['case']} : {r['metric']} "
+              f"{r['baseline']} -> {r['current']} {unit} (x{r['ratio']})")
+    print(f"{len(regressions)} régression(s) par rapport à {args.compare} (seuil +{args.threshold:.0%}).")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,227 @@
+# cache.py
+# Ce module contient le cache des fichiers analysés, adressé par le contenu des fichiers.
+# Il est partagé entre les reruns et les sessions Streamlit d'un même processus serveur.
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from src.config import PARSE_CACHE_DIR, PARSE_CACHE_MAX_BYTES, PARSE_CACHE_MAX_DISK_BYTES
+from src.data_loader import load_data
+from src.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+# Taille des blocs lus pour calculer l'empreinte d'un fichier
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+
+def file_fingerprint(file_path):
+    """
+    Calcule une empreinte rapide (BLAKE2b) du contenu d'un fichier.
+
+    :param file_path: Chemin du fichier (str) ou objet fichier (ex: UploadedFile)
+    :return: Empreinte hexadécimale
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(file_path, str):
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+    elif hasattr(file_path, 'getbuffer'):
+        # Objet en mémoire (BytesIO, UploadedFile) : on hache le tampon sans le copier
+        digest.update(file_path.getbuffer())
+    else:
+        file_path.seek(0)
+        for block in iter(lambda: file_path.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+        file_path.seek(0)
+    return digest.hexdigest()
+
+
+def column_fingerprint(series):
+    """
+    Calcule une empreinte (BLAKE2b) du contenu et du type d'une colonne.
+
+    :param series: Série pandas
+    :return: Empreinte hexadécimale, ou None si le contenu n'est pas hachable (ex : listes)
+    """
+    try:
+        hashed = pd.util.hash_pandas_object(series, index=False).to_numpy()
+    except TypeError:
+        return None
+    digest = hashlib.blake2b(str(series.dtype).encode('utf-8'), digest_size=16)
+    digest.update(hashed.tobytes())
+    return digest.hexdigest()
+
+
+def cache_key(fingerprint, separator, encoding, **options):
+    """Construit la clé de cache à partir de l'empreinte du fichier et des options de lecture."""
+    parts = [fingerprint, repr(separator), repr(encoding)]
+    parts += [f"{name}={options[name]!r}" for name in sorted(options)]
+    return hashlib.blake2b('|'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ParseCache:
+    """
+    Cache LRU de DataFrames analysés, borné par un budget mémoire.
+
+    Les entrées évincées de la mémoire sont déversées sur disque au format Arrow IPC (Feather)
+    puis relues en mémoire mappée si elles sont de nouveau demandées.
+    Les DataFrames renvoyés sont partagés : ils doivent être traités en lecture seule.
+    """
+
+    def __init__(self, max_bytes=PARSE_CACHE_MAX_BYTES, spill_dir=PARSE_CACHE_DIR,
+                 max_disk_bytes=PARSE_CACHE_MAX_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()  # clé -> (DataFrame, taille en octets)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, f"{key}.feather")
+
+    def __contains__(self, key):
+        return key in self._entries or os.path.exists(self._spill_path(key))
+
+    @property
+    def memory_bytes(self):
+        """Mémoire occupée par les entrées conservées en mémoire (octets)."""
+        return self._bytes
+
+    def get(self, key):
+        """
+        Renvoie le DataFrame associé à la clé, depuis la mémoire ou le disque.
+
+        :return: DataFrame, ou None si la clé est inconnue
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key][0]
+        path = self._spill_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            import pyarrow.feather as feather
+            df = feather.read_table(path, memory_map=True).to_pandas()
+        except Exception as e:
+            logger.warning("Lecture de l'entrée de cache %s impossible : %s", key, e)
+            return None
+        os.utime(path)  # l'entrée disque redevient la plus récente
+        self.put(key, df)
+        return df
+
+    def put(self, key, df):
+        """Ajoute un DataFrame au cache, en évinçant les entrées les moins récemment utilisées."""
+        nbytes = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (df, nbytes)
+            self._bytes += nbytes
+            evicted = []
+            while self._bytes > self.max_bytes and self._entries:
+                old_key, (old_df, old_bytes) = self._entries.popitem(last=False)
+                self._bytes -= old_bytes
+                evicted.append((old_key, old_df))
+        for old_key, old_df in evicted:
+            self._spill(old_key, old_df)
+
+    def resident_frames(self):
+        """Entrées conservées en mémoire, de la moins à la plus récemment utilisée : liste de (DataFrame, taille)."""
+        with self._lock:
+            return list(self._entries.values())
+
+    def demote(self, df):
+        """
+        Retire de la mémoire les entrées portant le DataFrame `df` (même objet) ; elles restent disponibles
+        sur disque. Utilisé par le gouverneur mémoire, qui inclut le cache dans le budget global.
+
+        :return: Nombre d'entrées retirées
+        """
+        with self._lock:
+            removed = [(key, self._entries.pop(key)) for key, (entry, _) in list(self._entries.items())
+                       if entry is df]
+            for _, (_, nbytes) in removed:
+                self._bytes -= nbytes
+        for key, (entry, _) in removed:
+            self._spill(key, entry)
+        return len(removed)
+
+    def _spill(self, key, df):
+        """Écrit une entrée évincée sur disque (si elle n'y est pas déjà)."""
+        path = self._spill_path(key)
+        if os.path.exists(path):
+            return
+        try:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            df.reset_index(drop=True).to_feather(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            # Noms de colonnes non textuels, types non supportés par Arrow... : l'entrée est simplement oubliée
+            logger.warning("Déversement de l'entrée de cache %s impossible : %s", key, e)
+            return
+        self._trim_disk()
+
+    def _trim_disk(self):
+        """Supprime les fichiers déversés les plus anciens au-delà du budget disque."""
+        files = [os.path.join(self.spill_dir, name) for name in os.listdir(self.spill_dir)
+                 if name.endswith('.feather')]
+        files.sort(key=os.path.getmtime)
+        total = sum(os.path.getsize(path) for path in files)
+        for path in files:
+            if total <= self.max_disk_bytes:
+                break
+            total -= os.path.getsize(path)
+            os.remove(path)
+
+    def clear(self, disk=False):
+        """Vide le cache mémoire (et le répertoire de déversement si `disk` vaut True)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if disk and os.path.isdir(self.spill_dir):
+            for name in os.listdir(self.spill_dir):
+                if name.endswith('.feather'):
+                    os.remove(os.path.join(self.spill_dir, name))
+
+
+_parse_cache = None
+
+
+def get_parse_cache():
+    """Renvoie le cache partagé par toutes les sessions du processus."""
+    global _parse_cache
+    if _parse_cache is None:
+        _parse_cache = ParseCache()
+    return _parse_cache
+
+
+@traced('load_data_cached')
+def load_data_cached(file_path, separator=',', encoding='utf-8', cache=None, **options):
+    """
+    Charge un fichier via `load_data` en réutilisant le résultat d'une lecture précédente du même contenu.
+
+    :param file_path: Chemin du fichier (str) ou objet fichier (ex: UploadedFile)
+    :param separator: Séparateur pour les fichiers CSV
+    :param encoding: Encodage du fichier
+    :param cache: Instance de ParseCache (cache partagé du processus par défaut)
+    :param options: Options supplémentaires transmises à `load_data` (engine, usecols, dtype, dtype_backend)
+    :return: DataFrame pandas (partagé, à traiter en lecture seule)
+    """
+    cache = cache if cache is not None else get_parse_cache()
+    key = cache_key(file_fingerprint(file_path), separator, encoding, **options)
+    df = cache.get(key)
+    if df is None:
+        if not isinstance(file_path, str):
+            file_path.seek(0)
+        df = load_data(file_path, separator=separator, encoding=encoding, **options)
+        cache.put(key, df)
+    return df
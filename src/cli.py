@@ -0,0 +1,350 @@
+# cli.py
+# Ce module fournit une exécution en lot, sans interface (ni Streamlit), des traitements de Data Toolkit :
+# un fichier de travail JSON décrit les fichiers, les opérations et le format de sortie, et les fichiers
+# sont traités en parallèle dans un pool de processus. Un rapport JSON (durées, nombres de lignes) est écrit.
+#
+# Utilisation :
+#     python -m src.cli travail.json [--workers 4] [--report rapport.json]
+import argparse
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from src.config import DEFAULT_CHUNKSIZE, DEFAULT_OUTPUT_DIR
+from src.data_loader import load_data, normalize_separator
+from src.eda import get_data_info
+from src.streaming_stats import StreamingDescriber
+from src.treatments import TreatmentPipeline
+
+logger = logging.getLogger(__name__)
+
+# Extensions des fichiers retenus lorsqu'une entrée du travail est un répertoire
+INPUT_EXTENSIONS = ('.csv', '.xlsx')
+
+# Formats de sortie disponibles (l'écriture se fait bloc par bloc)
+OUTPUT_FORMATS = ['csv']
+
+# Valeurs par défaut d'un fichier de travail
+JOB_DEFAULTS = {
+    'inputs': [],
+    'separator': ',',
+    'encoding': 'utf-8',
+    'operations': [],
+    'output_dir': os.path.join(DEFAULT_OUTPUT_DIR, 'batch'),
+    'output_format': 'csv',
+    'output_separator': None,
+    'output_encoding': None,
+    'suffix': 'traite',
+    'profile': False,
+    'workers': min(4, os.cpu_count() or 1),
+    'chunksize': DEFAULT_CHUNKSIZE,
+    'max_memory_mb': None,
+    'report': None,
+}
+
+
+def load_job(path):
+    """
+    Lit un fichier de travail JSON et le complète avec les valeurs par défaut.
+
+    Exemple de fichier de travail :
+        {
+          "inputs": ["data/*.csv"],
+          "separator": ",", "encoding": "latin-1",
+          "operations": [
+            {"op": "select", "columns": ["track_name", "streams", "bpm"]},
+            {"op": "fill", "columns": ["bpm"], "method": "median"},
+            {"op": "sample", "method": "random_total", "n": 1000, "seed": 42},
+            {"op": "rename", "columns": {"bpm": "tempo"}}
+          ],
+          "output_dir": "output/batch", "profile": true, "workers": 4, "max_memory_mb": 2048
+        }
+
+    Les chemins relatifs sont résolus par rapport au répertoire du fichier de travail.
+
+    :param path: Chemin du fichier de travail
+    :return: Dictionnaire du travail
+    """
+    with open(path, encoding='utf-8') as f:
+        job = json.load(f)
+    unknown = set(job) - set(JOB_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Clés inconnues dans le fichier de travail : {sorted(unknown)}")
+    job = {**JOB_DEFAULTS, **job}
+    base_dir = os.path.dirname(os.path.abspath(path))
+    job['inputs'] = [os.path.join(base_dir, pattern) for pattern in job['inputs']]
+    job['output_dir'] = os.path.join(base_dir, job['output_dir'])
+    if job['report']:
+        job['report'] = os.path.join(base_dir, job['report'])
+    return job
+
+
+def expand_inputs(patterns):
+    """
+    Liste les fichiers à traiter : motifs glob, chemins de fichiers ou répertoires (CSV et Excel qu'ils contiennent).
+
+    :param patterns: Liste de motifs / chemins
+    :return: Liste triée et sans doublon des chemins de fichiers
+    """
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            matches = glob.glob(pattern)
+        files += [path for path in matches if os.path.isfile(path) and path.lower().endswith(INPUT_EXTENSIONS)]
+    return sorted(set(os.path.abspath(path) for path in files))
+
+
+def build_pipeline(operations):
+    """
+    Construit la chaîne de traitements décrite par la liste d'opérations du travail.
+
+    Opérations reconnues (exécutées dans l'ordre de la liste) :
+        {"op": "select", "columns": [...]}
+        {"op": "rename", "columns": {"ancien": "nouveau"}}
+        {"op": "fill", "columns": [...], "method": "mean", "value": ..., "group_by": [...]}
+        {"op": "sample", "method": "first_n", "n": ..., "frac": ..., "seed": ...}
+
+    :param operations: Liste de dictionnaires
+    :return: TreatmentPipeline
+    """
+    pipeline = TreatmentPipeline()
+    for operation in operations:
+        op = operation.get('op')
+        if op == 'select':
+            pipeline.select(operation['columns'])
+        elif op == 'rename':
+            pipeline.rename(operation['columns'])
+        elif op == 'fill':
+            pipeline.fill(operation['columns'], operation['method'], operation.get('value'),
+                          operation.get('group_by'))
+        elif op == 'sample':
+            pipeline.sample(operation['method'], operation.get('n'), operation.get('frac'), operation.get('seed'))
+        else:
+            raise ValueError(f"Opération inconnue : {op}")
+    return pipeline
+
+
+def output_path(input_path, job, subdir='', with_extension=False):
+    """
+    Chemin du fichier de sortie associé à un fichier d'entrée.
+
+    :param subdir: Sous-répertoire de output_dir (répertoire de l'entrée relatif aux autres entrées)
+    :param with_extension: Ajoute l'extension d'origine au nom (ex : x_xlsx_traite.csv)
+    """
+    stem, extension = os.path.splitext(os.path.basename(input_path))
+    if with_extension:
+        stem = f"{stem}_{extension.lstrip('.').lower()}"
+    suffix = f"_{job['suffix']}" if job['suffix'] else ''
+    return os.path.join(job['output_dir'], subdir, f"{stem}{suffix}.{job['output_format']}")
+
+
+def output_paths(files, job):
+    """
+    Chemins de sortie distincts des fichiers d'un travail.
+
+    Les entrées de répertoires différents sont écrites dans des sous-répertoires reprenant leur chemin
+    relatif au répertoire commun (data/a/x.csv et data/b/x.csv -> a/x_traite.csv et b/x_traite.csv) ;
+    les entrées d'un même répertoire ne différant que par l'extension gardent celle-ci dans leur nom
+    (x_csv_traite.csv et x_xlsx_traite.csv).
+
+    :param files: Chemins absolus des fichiers d'entrée
+    :param job: Dictionnaire du travail
+    :return: Dictionnaire {entrée: sortie}
+    :raises ValueError: Si deux entrées conduisent malgré tout au même fichier de sortie
+    """
+    if not files:
+        return {}
+    common = os.path.commonpath([os.path.dirname(path) for path in files])
+    stems = {}
+    for path in files:
+        stem = os.path.normcase(os.path.splitext(path)[0])
+        stems[stem] = stems.get(stem, 0) + 1
+    paths = {}
+    for path in files:
+        subdir = os.path.relpath(os.path.dirname(path), common)
+        with_extension = stems[os.path.normcase(os.path.splitext(path)[0])] > 1
+        paths[path] = output_path(path, job, '' if subdir == os.curdir else subdir, with_extension)
+    seen = {}
+    for path, output in paths.items():
+        other = seen.setdefault(os.path.normcase(output), path)
+        if other != path:
+            raise ValueError(f"{other} et {path} seraient écrits dans le même fichier de sortie {output}")
+    return paths
+
+
+class _OutputProfile:
+    """Profil de la sortie calculé bloc par bloc pendant l'écriture (valeurs manquantes, describe())."""
+
+    def __init__(self):
+        self.missing = {}
+        self.describer = StreamingDescriber()
+
+    def __call__(self, chunk):
+        for col, count in get_data_info(chunk)['missing_values'].items():
+            self.missing[col] = self.missing.get(col, 0) + int(count)
+        self.describer.update(chunk)
+
+    def to_frame(self):
+        stats = self.describer.result().T
+        stats.insert(0, 'missing', [self.missing.get(col, 0) for col in stats.index])
+        return stats
+
+
+def _peak_memory_mb():
+    """Pic de mémoire résidente du processus courant (Mo), ou None si indisponible."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def _init_worker(max_memory_mb):
+    """Initialisation des processus du pool : plafond de mémoire virtuelle (Unix), si demandé."""
+    if not max_memory_mb:
+        return
+    try:
+        import resource
+    except ImportError:
+        logger.warning("Plafond mémoire non disponible sur cette plate-forme.")
+        return
+    limit = int(max_memory_mb) * 1024 ** 2
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def process_file(input_path, job, path=None):
+    """
+    Traite un fichier : exécution de la chaîne de traitements et écriture de la sortie, bloc par bloc.
+
+    Les CSV sont lus par blocs de `chunksize` lignes (mémoire bornée) ; les fichiers Excel sont chargés
+    en entier par data_loader avant d'être traités.
+
+    :param input_path: Chemin du fichier d'entrée
+    :param job: Dictionnaire du travail
+    :param path: Chemin de sortie (voir output_paths ; output_path(input_path, job) par défaut)
+    :return: Dictionnaire du rapport pour ce fichier (les erreurs sont rapportées, pas levées)
+    """
+    start, cpu_start = time.perf_counter(), time.process_time()
+    entry = {'file': input_path, 'output': None, 'status': 'ok', 'rows_in': None, 'rows_out': None,
+             'columns': None, 'passes': None, 'profile': None, 'error': None}
+    path = path or output_path(input_path, job)
+    started_writing = False
+    try:
+        separator = normalize_separator(job['separator'])
+        source = input_path
+        if input_path.lower().endswith('.xlsx'):
+            source = load_data(input_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        started_writing = True
+        profile = _OutputProfile() if job['profile'] else None
+        report = build_pipeline(job['operations']).run(
+            source, path, separator=separator, encoding=job['encoding'],
+            output_separator=normalize_separator(job['output_separator'] or separator),
+            output_encoding=job['output_encoding'], chunksize=int(job['chunksize']), on_chunk=profile
+        )
+        entry.update(output=path, rows_in=report['rows_read'], rows_out=report['rows'],
+                     columns=report['columns'], passes=report['passes'])
+        if profile is not None:
+            entry['profile'] = f"{os.path.splitext(path)[0]}_profil.csv"
+            profile.to_frame().to_csv(entry['profile'])
+    except MemoryError:
+        entry.update(status='error', error="Mémoire insuffisante (plafond max_memory_mb atteint).")
+    except Exception as e:
+        entry.update(status='error', error=f"{type(e).__name__}: {e}")
+    if entry['status'] != 'ok' and started_writing and os.path.exists(path):
+        os.remove(path)  # sortie partielle
+        entry['output'] = None
+    entry['seconds'] = round(time.perf_counter() - start, 3)
+    entry['cpu_seconds'] = round(time.process_time() - cpu_start, 3)
+    entry['peak_memory_mb'] = _peak_memory_mb()
+    return entry
+
+
+def run_job(job, workers=None):
+    """
+    Traite tous les fichiers du travail, en parallèle dans un pool de processus.
+
+    :param job: Dictionnaire du travail (voir load_job)
+    :param workers: Nombre de processus (celui du travail par défaut) ; 1 = traitement dans le processus courant,
+                    sauf si max_memory_mb est fixé : le plafond ne s'applique qu'à des processus dédiés
+    :return: Dictionnaire du rapport (un élément par fichier, dans l'ordre des fichiers, et un résumé)
+    """
+    if job['output_format'] not in OUTPUT_FORMATS:
+        raise ValueError(f"Format de sortie non supporté : {job['output_format']} (formats : {OUTPUT_FORMATS})")
+    build_pipeline(job['operations'])  # validation des opérations avant le lancement des processus
+    files = expand_inputs(job['inputs'])
+    outputs = output_paths(files, job)
+    workers = max(int(workers or job['workers']), 1)
+    started = datetime.now()
+    start = time.perf_counter()
+
+    entries = {}
+    if (workers == 1 or len(files) <= 1) and not job['max_memory_mb']:
+        for path in files:
+            entries[path] = process_file(path, job, outputs[path])
+            logger.info("%s : %s", path, entries[path]['status'])
+    elif files:
+        # Le plafond mémoire (setrlimit, irréversible) n'est appliqué qu'aux processus du pool
+        with ProcessPoolExecutor(max_workers=min(workers, len(files)), mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(job['max_memory_mb'],)) as pool:
+            futures = {pool.submit(process_file, path, job, outputs[path]): path for path in files}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    entries[path] = future.result()
+                except Exception as e:
+                    # Processus tué (ex : par le système, faute de mémoire)
+                    entries[path] = {'file': path, 'status': 'error', 'error': f"{type(e).__name__}: {e}"}
+                logger.info("%s : %s", path, entries[path]['status'])
+
+    results = [entries[path] for path in files]
+    ok = [entry for entry in results if entry['status'] == 'ok']
+    return {
+        'started': started.isoformat(timespec='seconds'),
+        'seconds': round(time.perf_counter() - start, 3),
+        'workers': workers,
+        'files': results,
+        'summary': {
+            'files': len(results),
+            'ok': len(ok),
+            'errors': len(results) - len(ok),
+            'rows_in': sum(entry['rows_in'] for entry in ok),
+            'rows_out': sum(entry['rows_out'] for entry in ok),
+        },
+    }
+
+
+def main(argv=None):
+    """Point d'entrée en ligne de commande ; renvoie 0 si tous les fichiers ont été traités, 1 sinon."""
+    parser = argparse.ArgumentParser(prog='python -m src.cli',
+                                     description="Traitement en lot de fichiers CSV/Excel (sans interface).")
+    parser.add_argument('job', help="Fichier de travail JSON")
+    parser.add_argument('--workers', type=int, help="Nombre de processus (remplace celui du fichier de travail)")
+    parser.add_argument('--report', help="Chemin du rapport JSON (par défaut : rapport.json dans output_dir)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+
+    job = load_job(args.job)
+    report = run_job(job, workers=args.workers)
+    report_path = args.report or job['report'] or os.path.join(job['output_dir'], 'rapport.json')
+    os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    summary = report['summary']
+    print(f"{summary['ok']}/{summary['files']} fichier(s) traité(s) en {report['seconds']} s, "
+          f"{summary['rows_out']} ligne(s) écrite(s). Rapport : {report_path}")
+    return 0 if summary['errors'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# compaction.py
+# Ce module réduit l'empreinte mémoire d'un DataFrame après chargement (compaction des types).
+import numpy as np
+import pandas as pd
+
+from src.tracing import traced
+
+# Motifs reconnus comme des dates : AAAA-MM-JJ (ISO 8601, heure optionnelle) et JJ/MM/AAAA
+ISO_DATE_PATTERN = r'^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$'
+FR_DATE_PATTERN = r'^\d{2}/\d{2}/\d{4}$'
+
+
+def _downcast_integer(series):
+    """Réduit un entier à la plus petite largeur signée contenant toutes ses valeurs."""
+    return pd.to_numeric(series, downcast='integer')
+
+
+def _downcast_float(series):
+    """Passe un float64 en float32 uniquement si toutes les valeurs sont représentées exactement."""
+    candidate = series.astype(np.float32)
+    if np.array_equal(candidate.to_numpy(dtype=np.float64), series.to_numpy(), equal_nan=True):
+        return candidate
+    return series
+
+
+def _parse_dates(series, sample_size=1000):
+    """
+    Convertit une colonne texte en datetime si toutes ses valeurs non nulles ressemblent à des dates.
+
+    :return: Série convertie, ou None si la colonne n'est pas une colonne de dates
+    """
+    values = series.dropna()
+    if values.empty or not isinstance(values.iloc[0], str):
+        return None
+    sample = values.iloc[:sample_size].astype(str)
+    if sample.str.match(ISO_DATE_PATTERN).all():
+        parsed = pd.to_datetime(series, format='ISO8601', errors='coerce')
+    elif sample.str.match(FR_DATE_PATTERN).all():
+        parsed = pd.to_datetime(series, format='%d/%m/%Y', errors='coerce')
+    else:
+        return None
+    # On refuse la conversion si elle fait apparaître de nouvelles valeurs manquantes
+    if parsed.isna().sum() != series.isna().sum():
+        return None
+    return parsed
+
+
+@traced('compact_dtypes')
+def compact_dtypes(df, category_threshold=0.5, parse_dates=True):
+    """
+    Réduit la mémoire occupée par un DataFrame en choisissant des types plus compacts.
+
+    - entiers réduits à la plus petite largeur sûre (int8, int16, int32) ;
+    - flottants passés en float32 lorsque la conversion est exacte ;
+    - colonnes texte ressemblant à des dates converties en datetime ;
+    - colonnes texte de faible cardinalité converties en 'category'.
+
+    Les colonnes déjà adossées à Arrow ou de type extension sont laissées telles quelles.
+
+    :param df: DataFrame à compacter
+    :param category_threshold: Ratio maximal (valeurs distinctes / lignes) pour convertir en 'category'
+    :param parse_dates: Détecter et convertir les colonnes de dates
+    :return: Tuple (DataFrame compacté, DataFrame du gain mémoire par colonne)
+    """
+    before = df.memory_usage(deep=True, index=False)
+    compacted = {}
+    for col in df.columns:
+        series = df[col]
+        dtype = series.dtype
+        if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.api.extensions.ExtensionDtype):
+            continue
+        if pd.api.types.is_integer_dtype(dtype):
+            compacted[col] = _downcast_integer(series)
+        elif pd.api.types.is_float_dtype(dtype):
+            compacted[col] = _downcast_float(series)
+        elif pd.api.types.is_object_dtype(dtype):
+            parsed = _parse_dates(series) if parse_dates else None
+            if parsed is not None:
+                compacted[col] = parsed
+            elif len(series) and series.nunique(dropna=True) / len(series) <= category_threshold:
+                compacted[col] = series.astype('category')
+
+    result = df.assign(**compacted) if compacted else df.copy()
+    # Seules les colonnes converties sont re-mesurées : les autres n'ont pas changé
+    after = before.copy()
+    for col, series in compacted.items():
+        after[col] = series.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        'Colonne': df.columns,
+        'Type avant': [str(t) for t in df.dtypes],
+        'Type après': [str(t) for t in result.dtypes],
+        'Mémoire avant (Mo)': before.to_numpy() / (1024 * 1024),
+        'Mémoire après (Mo)': after.to_numpy() / (1024 * 1024),
+    })
+    report['Gain (%)'] = np.where(
+        before.to_numpy() > 0, 100 * (1 - after.to_numpy() / np.maximum(before.to_numpy(), 1)), 0.0
+    )
+    return result, report
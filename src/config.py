@@ -1,5 +1,7 @@
 # config.py
 # Ce fichier contient les paramètres de configuration par défaut pour Data Toolkit.
+import os
+import tempfile
 
 # Séparateur par défaut utilisé pour lire/écrire des fichiers CSV
 DEFAULT_SEPARATOR = ','
@@ -10,3 +12,64 @@ DEFAULT_OUTPUT_DIR = 'output'
 
 # Nom de fichier par défaut pour les échantillons générés
 DEFAULT_SAMPLE_NAME = 'echantillon'
+
+# Nombre de lignes lues par bloc lors des traitements en flux (fichiers volumineux)
+DEFAULT_CHUNKSIZE = 100_000
+
+# Volume maximal lu au début d'un fichier pour la prévisualisation (octets)
+PREVIEW_MAX_BYTES = 1024 * 1024
+
+# Budget mémoire du cache de fichiers analysés, partagé entre les sessions (octets)
+PARSE_CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+# Répertoire où sont déversées (format Arrow IPC) les entrées évincées du cache, et budget disque associé
+PARSE_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'data_toolkit_cache')
+PARSE_CACHE_MAX_DISK_BYTES = 20 * 1024 ** 3
+
+# Répertoire des copies de travail binaires (Arrow IPC) des fichiers générés par les traitements, et budget
+# disque associé
+WORKING_COPY_DIR = os.path.join(tempfile.gettempdir(), 'data_toolkit_work')
+WORKING_COPY_MAX_DISK_BYTES = 10 * 1024 ** 3
+
+# Au-delà de ce nombre de valeurs, les graphiques EDA+ sont tracés à partir de résumés (histogrammes
+# pré-calculés, KDE sur grille) plutôt qu'à partir des données brutes
+EXACT_PLOT_MAX_ROWS = 50_000
+
+# Budget mémoire du cache des rendus EDA+ (PNG et résultats intermédiaires), partagé entre les sessions (octets)
+RENDER_CACHE_MAX_BYTES = 256 * 1024 ** 2
+
+# Résolution des graphiques rastérisés (identique à celle de st.pyplot)
+RENDER_DPI = 200
+
+# Nombre de processus utilisés par défaut pour exécuter les analyses de l'EDA+
+EDA_WORKERS = min(4, os.cpu_count() or 1)
+
+# Répertoire des fichiers Arrow IPC partagés avec les processus de l'EDA+, et budget disque associé
+EDA_SHARED_DIR = os.path.join(tempfile.gettempdir(), 'data_toolkit_eda')
+EDA_SHARED_MAX_DISK_BYTES = 10 * 1024 ** 3
+
+# Nombre de threads sérialisant (et compressant) les blocs lors de l'export CSV
+EXPORT_WORKERS = min(4, os.cpu_count() or 1)
+
+# Taille des blocs parcourus lors de la construction de l'index des lignes d'un CSV (octets)
+ROW_INDEX_BLOCK_BYTES = 64 * 1024 ** 2
+
+# Répertoire des index de lignes lorsque le répertoire du fichier n'est pas accessible en écriture
+ROW_INDEX_DIR = os.path.join(tempfile.gettempdir(), 'data_toolkit_index')
+
+# Répertoire des copies locales des fichiers uploadés (projetées en mémoire, supprimées en fin de session)
+UPLOAD_SPOOL_DIR = os.path.join(tempfile.gettempdir(), 'data_toolkit_uploads')
+
+# Instrumentation des opérations (durée, temps CPU, lignes, octets, pic mémoire) : état initial de la case
+# de la barre latérale, fichier JSON Lines des mesures (dans le dossier de sortie par défaut de l'application),
+# taille au-delà de laquelle il est renommé en « .1 » (la version précédente étant supprimée) et nombre de
+# mesures conservées en mémoire par session
+TRACE_ENABLED = False
+TRACE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), DEFAULT_OUTPUT_DIR, 'traces.jsonl')
+TRACE_MAX_BYTES = 50 * 1024 ** 2
+TRACE_MAX_SPANS = 1000
+
+# Budget mémoire global des DataFrames conservés par les sessions (octets) ; au-delà, les moins récemment
+# utilisés sont déversés (format Arrow IPC) dans le répertoire suivant
+SESSION_MEMORY_MAX_BYTES = 4 * 1024 ** 3
+SESSION_SPILL_DIR = os.path.join(tempfile.gettempdir(), 'data_toolkit_sessions')
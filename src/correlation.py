@@ -0,0 +1,181 @@
+# correlation.py
+# Ce module calcule les matrices de corrélation par blocs, sans charger tout le dataset en mémoire.
+# Pearson est obtenu à partir de statistiques suffisantes (sommes et produits croisés) accumulées par
+# produits matriciels ; Spearman est calculé sur les rangs d'un échantillon borné.
+import numpy as np
+import pandas as pd
+
+from src.config import DEFAULT_CHUNKSIZE
+from src.sampling import reservoir_sample_n
+from src.tracing import traced
+
+# Nombre maximal de lignes utilisées pour la corrélation de Spearman
+SPEARMAN_SAMPLE_ROWS = 100_000
+
+
+class PearsonAccumulator:
+    """
+    Statistiques suffisantes de la corrélation de Pearson, accumulées bloc par bloc.
+
+    Les valeurs manquantes sont traitées comme DataFrame.corr() (observations complètes par paire) :
+    pour chaque paire (i, j), les sommes ne portent que sur les lignes où les deux colonnes sont renseignées.
+    Chaque colonne est décalée par la moyenne de son premier bloc pour limiter les erreurs d'arrondi.
+    Les accumulateurs sont fusionnables (traitement parallèle possible).
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.shift = None
+        self.n = np.zeros((k, k))
+        self.sx = np.zeros((k, k))    # sx[i, j] = somme des x_i sur les lignes où i et j sont renseignés
+        self.sxx = np.zeros((k, k))   # sxx[i, j] = somme des x_i² sur ces mêmes lignes
+        self.sxy = np.zeros((k, k))   # sxy[i, j] = somme des x_i * x_j
+
+    def update(self, chunk):
+        """
+        Ajoute un bloc de lignes (DataFrame contenant au moins les colonnes suivies).
+
+        Les valeurs non numériques d'un bloc (ex : texte isolé dans une colonne numérique d'un CSV)
+        sont traitées comme manquantes.
+        """
+        block = chunk[self.columns]
+        invalid = [col for col in block.columns if not pd.api.types.is_numeric_dtype(block[col])]
+        if invalid:
+            block = block.copy()
+            block[invalid] = block[invalid].apply(pd.to_numeric, errors='coerce')
+        values = block.to_numpy(dtype=np.float64, na_value=np.nan)
+        if self.shift is None:
+            with np.errstate(invalid='ignore'):
+                self.shift = np.nan_to_num(np.nanmean(values, axis=0)) if len(values) else np.zeros(len(self.columns))
+        values = values - self.shift
+        present = ~np.isnan(values)
+        filled = np.where(present, values, 0.0)
+        mask = present.astype(np.float64)
+        self.n += mask.T @ mask
+        self.sx += filled.T @ mask
+        self.sxx += (filled * filled).T @ mask
+        self.sxy += filled.T @ filled
+        return self
+
+    def merge(self, other):
+        """Fusionne un autre accumulateur (mêmes colonnes) dans celui-ci."""
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift.copy()
+        # Ramène les sommes de l'autre accumulateur au décalage de celui-ci
+        delta = other.shift - self.shift
+        d_i, d_j = delta[:, None], delta[None, :]
+        sx = other.sx + d_i * other.n
+        self.sxx += other.sxx + 2 * d_i * other.sx + d_i ** 2 * other.n
+        self.sxy += other.sxy + d_j * other.sx + d_i * other.sx.T + d_i * d_j * other.n
+        self.sx += sx
+        self.n += other.n
+        return self
+
+    def result(self):
+        """Renvoie la matrice de corrélation de Pearson (DataFrame)."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            n = np.where(self.n > 1, self.n, np.nan)
+            mean_i = self.sx / n
+            mean_j = self.sx.T / n
+            cov = self.sxy / n - mean_i * mean_j
+            var_i = self.sxx / n - mean_i ** 2
+            var_j = self.sxx.T / n - mean_j ** 2
+            corr = np.clip(cov / np.sqrt(var_i * var_j), -1, 1)
+        np.fill_diagonal(corr, np.where(np.diag(var_i) > 0, 1.0, np.nan))
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+
+def _iter_source(source, columns, separator, encoding, chunksize):
+    """Itère sur un DataFrame ou un fichier CSV par blocs de lignes."""
+    if isinstance(source, pd.DataFrame):
+        frame = source if columns is None else source[columns]
+        for start in range(0, len(frame), chunksize):
+            yield frame.iloc[start:start + chunksize]
+    else:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        with pd.read_csv(source, sep=separator, encoding=encoding, usecols=columns, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield chunk
+
+
+@traced('correlation_matrix', result_rows=False)
+def correlation_matrix(source, method='pearson', columns=None, separator=',', encoding='utf-8',
+                       chunksize=DEFAULT_CHUNKSIZE, sample_size=SPEARMAN_SAMPLE_ROWS, seed=None):
+    """
+    Calcule la matrice de corrélation des colonnes numériques d'un DataFrame ou d'un fichier CSV.
+
+    - 'pearson' : exact, en une passe par blocs (coût proportionnel à lignes × colonnes²) ;
+    - 'spearman' : corrélation des rangs sur un échantillon aléatoire d'au plus `sample_size` lignes.
+
+    :param source: DataFrame, ou chemin/objet fichier CSV
+    :param method: 'pearson' ou 'spearman'
+    :param columns: Colonnes à corréler (colonnes numériques du premier bloc par défaut)
+    :param separator: Séparateur CSV
+    :param encoding: Encodage du fichier
+    :param chunksize: Nombre de lignes par bloc
+    :param sample_size: Taille maximale de l'échantillon pour Spearman
+    :param seed: Graine aléatoire de l'échantillonnage (Spearman)
+    :return: DataFrame carré de corrélations
+    """
+    chunks = _iter_source(source, columns, separator, encoding, chunksize)
+    first = next(chunks, None)
+    if first is None:
+        return pd.DataFrame()
+    numeric = first.select_dtypes(include='number').columns.tolist() if columns is None else list(columns)
+
+    if method == 'pearson':
+        accumulator = PearsonAccumulator(numeric).update(first)
+        for chunk in chunks:
+            accumulator.update(chunk)
+        return accumulator.result()
+    elif method == 'spearman':
+        def numeric_chunks():
+            yield first[numeric]
+            for chunk in chunks:
+                yield chunk[numeric]
+        sample = reservoir_sample_n(numeric_chunks(), sample_size, np.random.default_rng(seed))
+        sample = sample.apply(pd.to_numeric, errors='coerce')
+        return sample.corr(method='spearman')
+    else:
+        raise ValueError("Méthode de corrélation non supportée. Utilisez 'pearson' ou 'spearman'.")
+
+
+def top_correlated_pairs(corr, k=10):
+    """
+    Renvoie les `k` paires de colonnes les plus corrélées (en valeur absolue).
+
+    :param corr: Matrice de corrélation (DataFrame carré)
+    :param k: Nombre de paires
+    :return: DataFrame ('Colonne 1', 'Colonne 2', 'Corrélation')
+    """
+    values = corr.to_numpy()
+    i, j = np.triu_indices(len(corr), k=1)
+    pairs = pd.DataFrame({
+        'Colonne 1': corr.index[i],
+        'Colonne 2': corr.columns[j],
+        'Corrélation': values[i, j]
+    }).dropna()
+    order = pairs['Corrélation'].abs().sort_values(ascending=False).index
+    return pairs.loc[order].head(k).reset_index(drop=True)
+
+
+def cluster_order(corr):
+    """
+    Ordonne les colonnes pour regrouper les variables corrélées (ordonnancement spectral).
+
+    Les colonnes sont triées selon l'angle de leur projection sur les deux premiers vecteurs propres
+    de la matrice des corrélations absolues.
+
+    :param corr: Matrice de corrélation (DataFrame carré)
+    :return: Liste des colonnes réordonnées
+    """
+    if len(corr) < 3:
+        return list(corr.columns)
+    similarity = np.abs(np.nan_to_num(corr.to_numpy()))
+    _, vectors = np.linalg.eigh(similarity)
+    angles = np.arctan2(vectors[:, -2], vectors[:, -1])
+    return list(corr.columns[np.argsort(angles, kind='stable')])
@@ -1,43 +1,284 @@
 # data_loader.py
+import io
+import logging
+import os
 import pandas as pd
 
-def load_data(file_path, separator=',', encoding='utf-8'):
+from src.config import DEFAULT_CHUNKSIZE, PREVIEW_MAX_BYTES
+from src.sampling import sample_csv, stratified_sample
+from src.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+def _get_file_name(file_path):
+    """Renvoie le nom d'un chemin (str) ou d'un objet fichier possédant un attribut 'name'."""
+    return file_path if isinstance(file_path, str) else file_path.name
+
+def normalize_separator(separator):
+    """Convertit le séparateur saisi dans l'interface (ex: '\\t') en caractère réel."""
+    return '\t' if separator == '\\t' else separator
+
+def _arrow_column_types(dtype):
+    """
+    Traduit les indications de types (style pandas) en types Arrow pour le lecteur CSV de pyarrow.
+
+    :return: Tuple (types Arrow utilisables à la lecture, types restants à appliquer après conversion)
+    """
+    import numpy as np
+    import pyarrow as pa
+
+    arrow_types, remaining = {}, {}
+    for col, col_type in (dtype or {}).items():
+        if col_type in (str, 'str', 'string'):
+            arrow_types[col] = pa.string()
+            continue
+        try:
+            arrow_types[col] = pa.from_numpy_dtype(np.dtype(col_type))
+        except (TypeError, pa.ArrowNotImplementedError):
+            remaining[col] = col_type
+    return arrow_types, remaining
+
+def _pandas_null_values():
+    """Valeurs lues comme manquantes par pandas (liste par défaut de read_csv)."""
+    try:
+        from pandas._libs.parsers import STR_NA_VALUES
+        return sorted(STR_NA_VALUES)
+    except ImportError:
+        return ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null']
+
+def _read_csv_arrow(file_path, separator, encoding, usecols, dtype, dtype_backend):
     """
-    Charge un fichier CSV ou Excel dans un DataFrame pandas.
+    Lit un CSV avec le lecteur multithreadé de pyarrow, avec les règles de pandas : mêmes valeurs
+    manquantes (y compris dans les colonnes texte) et dates laissées sous forme de texte.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    column_types, remaining = _arrow_column_types(dtype)
+
+    def read(reader, types):
+        source = file_path
+        if isinstance(file_path, str):
+            # Fichier projeté en mémoire : le lecteur lit les pages du fichier sans tampon intermédiaire
+            source = pa.memory_map(file_path)
+        else:
+            file_path.seek(0)
+        try:
+            return reader(
+                source,
+                read_options=pa_csv.ReadOptions(use_threads=True, encoding=encoding),
+                parse_options=pa_csv.ParseOptions(delimiter=separator),
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=list(usecols) if usecols else None,
+                    column_types=types,
+                    null_values=_pandas_null_values(),
+                    strings_can_be_null=True,
+                    quoted_strings_can_be_null=True
+                )
+            )
+        finally:
+            if source is not file_path:
+                source.close()
+
+    def temporal_columns(schema, types):
+        return {field.name: pa.string() for field in schema
+                if pa.types.is_temporal(field.type) and field.name not in types}
+
+    # Arrow infère les dates et heures (pandas non) : ces colonnes sont lues comme texte. Elles sont repérées
+    # sur le premier bloc du fichier (lecture en flux, qui n'infère le schéma que sur ce bloc), pour que le
+    # fichier complet ne soit analysé qu'une fois.
+    def first_block_schema(source, **options):
+        with pa_csv.open_csv(source, **options) as stream:
+            return stream.schema
+
+    column_types = {**column_types, **temporal_columns(read(first_block_schema, column_types), column_types)}
+    table = read(pa_csv.read_csv, column_types)
+    # Colonne vide dans le premier bloc mais datée plus loin : relecture complète (cas rare)
+    temporal = temporal_columns(table.schema, column_types)
+    if temporal:
+        table = read(pa_csv.read_csv, {**column_types, **temporal})
+    if dtype_backend == 'pyarrow':
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
+    else:
+        df = table.to_pandas()
+    return df.astype(remaining) if remaining else df
+
+@traced('load_data')
+def load_data(file_path, separator=',', encoding='utf-8', engine='pandas', usecols=None, dtype=None,
+              dtype_backend=None):
+    """
+    Charge un fichier CSV ou Excel (ou un fichier exporté en CSV gzip, Parquet ou Feather) dans un DataFrame pandas.
+    
+    Le moteur 'pyarrow' lit les CSV avec le lecteur multithreadé d'Arrow ; s'il ne peut pas traiter le
+    fichier (séparateur multi-caractères, contenu invalide, pyarrow absent...), on revient au moteur pandas.
     
     :param file_path: Chemin du fichier (str) ou objet fichier (ex: UploadedFile)
     :param separator: Séparateur pour les fichiers CSV (par défaut ',')
     :param encoding: Encodage du fichier (par défaut 'utf-8')
+    :param engine: Moteur de lecture CSV ('pandas' ou 'pyarrow')
+    :param usecols: Liste des colonnes à charger (toutes par défaut)
+    :param dtype: Dictionnaire {colonne: type} d'indications de types
+    :param dtype_backend: 'pyarrow' pour obtenir des types adossés à Arrow, None pour les types NumPy
     :return: DataFrame pandas
     """
-    # Vérifier si file_path est une chaîne ou un objet fichier
+    file_name = _get_file_name(file_path)
+    separator = normalize_separator(separator)
+    
+    if file_name.endswith('.csv'):
+        if engine == 'pyarrow' and separator is not None and len(separator) == 1:
+            try:
+                return _read_csv_arrow(file_path, separator, encoding, usecols, dtype, dtype_backend)
+            except Exception as e:
+                logger.warning("Lecture pyarrow impossible (%s), repli sur le moteur pandas.", e)
+                if not isinstance(file_path, str):
+                    file_path.seek(0)
+        options = {'dtype_backend': dtype_backend} if dtype_backend else {}
+        return pd.read_csv(file_path, sep=separator, encoding=encoding, usecols=usecols, dtype=dtype, **options)
+    elif file_name.endswith('.csv.gz'):
+        # Fichiers exportés compressés (voir src/export.py)
+        options = {'dtype_backend': dtype_backend} if dtype_backend else {}
+        return pd.read_csv(file_path, sep=separator, encoding=encoding, usecols=usecols, dtype=dtype,
+                           compression='gzip', **options)
+    elif file_name.endswith('.xlsx'):
+        options = {'dtype_backend': dtype_backend} if dtype_backend else {}
+        return pd.read_excel(file_path, usecols=usecols, dtype=dtype, **options)
+    elif file_name.endswith(('.parquet', '.feather')):
+        reader = pd.read_parquet if file_name.endswith('.parquet') else pd.read_feather
+        options = {'dtype_backend': dtype_backend} if dtype_backend else {}
+        df = reader(file_path, columns=usecols, **options)
+        return df.astype(dtype) if dtype else df
+    else:
+        raise ValueError("Format de fichier non supporté. Veuillez utiliser CSV ou Excel.")
+
+def _file_size(file_path):
+    """Renvoie la taille en octets d'un chemin ou d'un objet fichier positionnable."""
+    if isinstance(file_path, str):
+        return os.path.getsize(file_path)
+    position = file_path.tell()
+    file_path.seek(0, io.SEEK_END)
+    size = file_path.tell()
+    file_path.seek(position)
+    return size
+
+def _preview_csv(file_path, nrows, max_bytes, separator, encoding):
+    """Lit au plus `max_bytes` octets en tête de CSV et estime le nombre total de lignes."""
     if isinstance(file_path, str):
-        file_name = file_path
+        with open(file_path, 'rb') as f:
+            head = f.read(max_bytes)
     else:
-        file_name = file_path.name  # On suppose que l'objet possède un attribut 'name'
+        file_path.seek(0)
+        head = file_path.read(max_bytes)
+    total_size = _file_size(file_path)
+    exact = len(head) >= total_size
+    if not exact:
+        # On s'arrête à la dernière ligne complète lue
+        head = head[:head.rfind(b'\n') + 1]
+    sample = pd.read_csv(io.BytesIO(head), sep=separator, encoding=encoding)
+    if exact or len(sample) == 0:
+        estimated_rows = len(sample)
+    else:
+        header_size = head.find(b'\n') + 1
+        bytes_per_row = (len(head) - header_size) / len(sample)
+        estimated_rows = int(round((total_size - header_size) / bytes_per_row))
+    return sample, estimated_rows, exact
+
+def _preview_xlsx(file_path, nrows):
+    """Lit les premières lignes de la feuille active en mode lecture seule (flux) avec openpyxl."""
+    from openpyxl import load_workbook
+
+    if not isinstance(file_path, str):
+        file_path.seek(0)
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        rows = list(sheet.iter_rows(max_row=nrows + 1, values_only=True))
+        # max_row provient de la dimension déclarée dans la feuille (peut être absente)
+        estimated_rows = sheet.max_row - 1 if sheet.max_row else None
+    finally:
+        workbook.close()
+    if not rows:
+        return pd.DataFrame(), 0, True
+    sample = pd.DataFrame(rows[1:], columns=rows[0]).infer_objects()
+    exact = estimated_rows is not None and estimated_rows <= nrows
+    return sample, estimated_rows, exact
+
+@traced('preview_data')
+def preview_data(file_path, nrows=5, separator=',', encoding='utf-8', max_bytes=PREVIEW_MAX_BYTES):
+    """
+    Prévisualise un fichier CSV ou Excel à coût borné, quelle que soit sa taille.
     
+    Pour un CSV, seuls les `max_bytes` premiers octets sont lus ; pour un fichier Excel, seules les
+    `nrows` premières lignes de la feuille active sont lues en mode lecture seule.
+    
+    :param file_path: Chemin du fichier (str) ou objet fichier (ex: UploadedFile)
+    :param nrows: Nombre de lignes à renvoyer
+    :param separator: Séparateur pour les fichiers CSV
+    :param encoding: Encodage du fichier
+    :param max_bytes: Volume maximal lu en tête de fichier CSV (octets)
+    :return: Dictionnaire avec les lignes ('data'), le schéma inféré ('schema'),
+             le nombre de lignes estimé ('estimated_rows') et si ce nombre est exact ('exact')
+    """
+    file_name = _get_file_name(file_path)
+
     if file_name.endswith('.csv'):
-        return pd.read_csv(file_path, sep=separator, encoding=encoding)
+        sample, estimated_rows, exact = _preview_csv(file_path, nrows, max_bytes, normalize_separator(separator),
+                                                     encoding)
     elif file_name.endswith('.xlsx'):
-        return pd.read_excel(file_path)
+        sample, estimated_rows, exact = _preview_xlsx(file_path, nrows)
     else:
         raise ValueError("Format de fichier non supporté. Veuillez utiliser CSV ou Excel.")
+    return {
+        'data': sample.head(nrows),
+        'schema': {col: str(dtype) for col, dtype in sample.dtypes.items()},
+        'estimated_rows': estimated_rows,
+        'exact': exact
+    }
 
-def sample_data(df, method, n=None, frac=None):
+@traced('sample_data')
+def sample_data(df, method, n=None, frac=None, seed=None, strata=None, allocation='proportional',
+                min_per_stratum=1, separator=',', encoding='utf-8', chunksize=DEFAULT_CHUNKSIZE):
     """
     Échantillonne le DataFrame selon la méthode spécifiée.
     
-    :param df: DataFrame à échantillonner
+    Si `df` est un chemin de fichier (str) ou un objet fichier, l'échantillonnage est réalisé en flux
+    sans charger le fichier entier : la mémoire utilisée reste proche de la taille de l'échantillon.
+    
+    :param df: DataFrame à échantillonner, ou chemin/objet fichier CSV/Excel
     :param method: Méthode d'échantillonnage ('random_total', 'random_representatif', 'first_n', 'last_n')
     :param n: Nombre de lignes à échantillonner (si applicable)
     :param frac: Fraction de lignes à échantillonner (si applicable)
+    :param seed: Graine aléatoire pour des résultats reproductibles
+    :param strata: Colonne(s) de stratification pour 'random_representatif'
+    :param allocation: Allocation entre strates ('proportional' ou 'equal')
+    :param min_per_stratum: Nombre minimum de lignes par strate
+    :param separator: Séparateur CSV (mode fichier uniquement)
+    :param encoding: Encodage du fichier (mode fichier uniquement)
+    :param chunksize: Nombre de lignes lues par bloc (mode fichier uniquement)
     :return: DataFrame échantillonné
     """
+    separator = normalize_separator(separator)
+    if method == 'random_representatif' and strata:
+        # Le tableau des effectifs par strate est disponible via src.sampling.stratified_sample
+        sample, _ = stratified_sample(df, strata, n=n, frac=frac, allocation=allocation,
+                                      min_per_stratum=min_per_stratum, seed=seed, separator=separator,
+                                      encoding=encoding, chunksize=chunksize)
+        return sample
+
+    if not isinstance(df, pd.DataFrame):
+        if _get_file_name(df).endswith('.csv'):
+            if method == 'random_representatif':
+                method = 'random_total'
+            return sample_csv(df, method, n=n, frac=frac, separator=separator, encoding=encoding,
+                              seed=seed, chunksize=chunksize)
+        # Les fichiers Excel ne se lisent pas par blocs : on les charge puis on échantillonne en mémoire
+        df = load_data(df, separator=separator, encoding=encoding)
+
     if method == 'random_total':
-        return df.sample(n=n) if n else df.sample(frac=frac)
+        return df.sample(n=n, random_state=seed) if n else df.sample(frac=frac, random_state=seed)
     elif method == 'random_representatif':
-        # Échantillonnage aléatoire simple (à améliorer si une stratification est nécessaire)
-        return df.sample(n=n) if n else df.sample(frac=frac)
+        # Sans colonne de stratification, on revient à un échantillonnage aléatoire simple
+        return df.sample(n=n, random_state=seed) if n else df.sample(frac=frac, random_state=seed)
     elif method == 'first_n':
         return df.head(n)
     elif method == 'last_n':
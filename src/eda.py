@@ -1,6 +1,13 @@
 # eda.py
+import uuid
+
 import pandas as pd
 
+from src.cache import column_fingerprint
+
+from src.null_mask import NullMask
+from src.tracing import span
+
 def get_data_info(df):
     """
     Génère un dictionnaire avec les informations de base sur le DataFrame.
@@ -15,3 +22,129 @@ def get_data_info(df):
         'missing_values': df.isnull().sum().to_dict()
     }
     return info
+
+class DatasetProfile:
+    """
+    Profil du dataset calculé colonne par colonne (type, valeurs manquantes, mémoire, cardinalité, min/max).
+
+    Les statistiques sont mises en cache par colonne : seules les colonnes nouvelles ou marquées comme
+    modifiées (via `mark_dirty`) sont recalculées par `update`. Un changement du nombre de lignes invalide
+    tout le profil ; un remplacement complet des données doit être signalé par `invalidate`.
+
+    La nullité des cellules est conservée dans un masque compacté (`null_mask`, un bit par cellule),
+    dont sont dérivés les comptages de valeurs manquantes et les analyses de l'EDA+.
+    """
+
+    def __init__(self):
+        self._stats = {}          # colonne -> dictionnaire de statistiques
+        self._dirty = set()
+        self._n_rows = None
+        self._columns = []
+        self.last_computed = []   # colonnes recalculées lors du dernier appel à update
+        self.null_mask = NullMask()
+        self._fingerprints = {}   # colonne -> empreinte du contenu (calculée à la demande)
+
+    def mark_dirty(self, columns):
+        """Signale que les colonnes indiquées ont été modifiées et doivent être recalculées."""
+        self._dirty.update(columns)
+
+    def rename(self, new_names):
+        """Reporte les statistiques sur les nouveaux noms de colonnes (sans recalcul)."""
+        renamed = {}
+        for col, stats in self._stats.items():
+            renamed[new_names.get(col, col)] = stats
+        self._stats = renamed
+        self._dirty = {new_names.get(col, col) for col in self._dirty}
+        self.null_mask.rename(new_names)
+        self._fingerprints = {new_names.get(col, col): fp for col, fp in self._fingerprints.items()}
+
+    def invalidate(self):
+        """Oublie toutes les statistiques (ex : nouveau fichier chargé)."""
+        self._stats.clear()
+        self._dirty.clear()
+        self._n_rows = None
+        self.null_mask.clear()
+        self._fingerprints.clear()
+
+    def update(self, df):
+        """
+        Met à jour le profil pour le DataFrame fourni, en ne recalculant que les colonnes nécessaires.
+
+        :param df: DataFrame courant
+        :return: Le profil lui-même
+        """
+        with span('profile.update', rows=len(df)) as current:
+            if len(df) != self._n_rows:
+                self.invalidate()
+                self._n_rows = len(df)
+            columns = df.columns.tolist()
+            self._stats = {col: self._stats[col] for col in columns if col in self._stats}
+            stale = [col for col in columns if col not in self._stats or col in self._dirty]
+            self.last_computed = stale
+            self._dirty.clear()
+            self.null_mask.update(df, stale)
+            self._fingerprints = {col: fp for col, fp in self._fingerprints.items()
+                                  if col in self._stats and col not in stale}
+            if stale:
+                self._stats.update(self._compute(df[stale], self.null_mask.subset(stale).counts()))
+            self._columns = columns
+            current.set(computed_columns=len(stale))
+        return self
+
+    @staticmethod
+    def _compute(block, missing):
+        """
+        Calcule les statistiques d'un bloc de colonnes en une passe vectorisée par statistique.
+
+        :param missing: Nombre de valeurs manquantes par colonne (issu du masque de nullité)
+        """
+        memory = block.memory_usage(deep=True, index=False)
+        cardinality = block.nunique(dropna=True)
+        ordered = block.select_dtypes(include=['number', 'datetime', 'datetimetz'])
+        minimum = ordered.min() if not ordered.empty else pd.Series(dtype=object)
+        maximum = ordered.max() if not ordered.empty else pd.Series(dtype=object)
+        return {
+            col: {
+                'dtype': block[col].dtype,
+                'missing': int(missing[col]),
+                'memory': int(memory[col]),
+                'cardinality': int(cardinality[col]),
+                'min': minimum.get(col),
+                'max': maximum.get(col),
+            }
+            for col in block.columns
+        }
+
+    def fingerprints(self, df, columns):
+        """
+        Renvoie les empreintes du contenu des colonnes indiquées (clés du cache de rendus).
+
+        Les empreintes sont calculées à la demande et conservées jusqu'à la modification de la colonne.
+        Une colonne non hachable reçoit un identifiant unique, valable jusqu'à sa prochaine modification.
+
+        :param df: DataFrame courant (déjà passé à `update`)
+        :param columns: Colonnes concernées
+        :return: Dictionnaire colonne -> empreinte
+        """
+        for col in columns:
+            if col not in self._fingerprints:
+                self._fingerprints[col] = column_fingerprint(df[col]) or uuid.uuid4().hex
+        return {col: self._fingerprints[col] for col in columns}
+
+    @property
+    def memory_usage(self):
+        """Mémoire totale estimée des colonnes profilées (octets)."""
+        return sum(stats['memory'] for stats in self._stats.values())
+
+    def info(self):
+        """Renvoie les informations de base au même format que `get_data_info`."""
+        return {
+            'dimensions': (self._n_rows, len(self._columns)),
+            'column_names': list(self._columns),
+            'data_types': {col: self._stats[col]['dtype'] for col in self._columns},
+            'missing_values': {col: self._stats[col]['missing'] for col in self._columns}
+        }
+
+    def to_frame(self):
+        """Renvoie le profil sous forme de DataFrame (une ligne par colonne)."""
+        return pd.DataFrame.from_dict({col: self._stats[col] for col in self._columns}, orient='index')
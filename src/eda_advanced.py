@@ -1,36 +1,273 @@
 # eda_advanced.py
+
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 
-def descriptive_stats(df):
-    """Renvoie les statistiques descriptives pour le DataFrame."""
+from src.config import EXACT_PLOT_MAX_ROWS
+from src.correlation import correlation_matrix, cluster_order
+from src.null_mask import NullMask
+
+# Nombre de points de la grille utilisée pour la KDE approchée
+KDE_GRID_SIZE = 512
+# Nombre maximal de classes des histogrammes pré-calculés
+MAX_HISTOGRAM_BINS = 200
+# Au-delà de ce nombre de colonnes, la matrice de corrélation n'est plus annotée
+ANNOTATED_CORRELATION_MAX_COLUMNS = 15
+# Nombre maximal de valeurs aberrantes tracées par boîte à moustaches
+MAX_BOXPLOT_FLIERS = 1000
+
+def numeric_columns(df):
+    """
+    Renvoie les colonnes numériques du DataFrame, quelle que soit leur largeur
+    (int8..int64, float32/64, entiers nullables, types Arrow).
+
+    La sélection porte sur un DataFrame vide de mêmes types : select_dtypes() copierait sinon les données.
+    """
+    return df.iloc[:0].select_dtypes(include='number').columns
+
+def box_summaries(df, columns=None, whis=1.5, max_fliers=MAX_BOXPLOT_FLIERS, quantiles=None):
+    """
+    Calcule les statistiques des boîtes à moustaches des colonnes numériques, colonne par colonne.
+
+    Une seule colonne est convertie en float64 à la fois : la mémoire de travail reste de l'ordre
+    de la taille d'une colonne, quel que soit le nombre de colonnes.
+    Les quartiles sont exacts (np.quantile, interpolation linéaire comme describe()) ou repris
+    d'un tableau déjà calculé, par exemple les quantiles t-digest de streaming_describe().
+    Les valeurs aberrantes conservées sont plafonnées à `max_fliers` par colonne (réparties sur
+    toute l'étendue, extrêmes inclus) ; leur nombre réel est indiqué dans 'n_fliers'.
+
+    :param df: DataFrame source
+    :param columns: Colonnes à résumer (colonnes numériques par défaut)
+    :param whis: Longueur des moustaches en multiple de l'écart interquartile
+    :param max_fliers: Nombre maximal de valeurs aberrantes conservées par colonne
+    :param quantiles: DataFrame au format describe() fournissant '25%', '50%' et '75%'
+    :return: Liste de dictionnaires au format attendu par Axes.bxp (plus count, std, min, max)
+    """
+    columns = list(numeric_columns(df) if columns is None else columns)
+    summaries = []
+    for col in columns:
+        values = _numeric_values(df[col])
+        count = len(values)
+        if not count:
+            summaries.append({
+                'label': col, 'count': 0, 'mean': np.nan, 'std': np.nan, 'min': np.nan, 'q1': np.nan,
+                'med': np.nan, 'q3': np.nan, 'max': np.nan, 'whislo': np.nan, 'whishi': np.nan,
+                'fliers': np.array([]), 'n_fliers': 0
+            })
+            continue
+        if quantiles is None:
+            q1, med, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+        else:
+            q1, med, q3 = (float(quantiles.loc[key, col]) for key in ('25%', '50%', '75%'))
+        std = values.std(ddof=1) if count > 1 else np.nan
+        iqr = q3 - q1
+        lower_fence, upper_fence = q1 - whis * iqr, q3 + whis * iqr
+        # Moustaches : valeurs extrêmes restant à l'intérieur des bornes (min/max masqués, sans copie)
+        inside = (values >= lower_fence) & (values <= upper_fence)
+        whislo = values.min(where=inside, initial=np.inf)
+        whishi = values.max(where=inside, initial=-np.inf)
+        fliers = np.sort(values[~inside])
+        n_fliers = len(fliers)
+        if n_fliers > max_fliers:
+            fliers = fliers[np.linspace(0, n_fliers - 1, max_fliers).round().astype(np.int64)]
+        summaries.append({
+            'label': col, 'count': count, 'mean': values.mean(), 'std': std,
+            'min': values.min(), 'q1': q1, 'med': med, 'q3': q3, 'max': values.max(),
+            'whislo': whislo, 'whishi': whishi, 'fliers': fliers, 'n_fliers': n_fliers
+        })
+    return summaries
+
+def summaries_to_frame(summaries):
+    """Met en forme des résumés de box_summaries() comme le tableau de DataFrame.describe()."""
+    rows = {'count': 'count', 'mean': 'mean', 'std': 'std', 'min': 'min',
+            '25%': 'q1', '50%': 'med', '75%': 'q3', 'max': 'max'}
+    return pd.DataFrame({s['label']: [float(s[key]) for key in rows.values()] for s in summaries},
+                        index=list(rows))
+
+def descriptive_stats(df, summaries=None):
+    """
+    Renvoie les statistiques descriptives pour le DataFrame.
+
+    :param summaries: Résumés déjà calculés par box_summaries() (évite une seconde passe)
+    """
+    if summaries:
+        return summaries_to_frame(summaries)
     return df.describe()
 
-def plot_distribution(df, col):
-    """Génère un histogramme avec courbe de densité pour la colonne spécifiée."""
+def _numeric_values(series):
+    """Renvoie les valeurs non nulles d'une colonne numérique sous forme d'array float64."""
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    return values[~np.isnan(values)]
+
+def histogram_bin_count(values, bins='auto'):
+    """
+    Nombre de classes d'un histogramme, plafonné à MAX_HISTOGRAM_BINS.
+
+    Les règles NumPy sont évaluées ici (largeur de classe rapportée à l'étendue) sans construire les bornes :
+    une seule valeur extrême dans des données resserrées demanderait sinon des milliards de classes à NumPy.
+
+    :param values: Array de valeurs numériques (sans NaN)
+    :param bins: Nombre de classes ou règle NumPy ('auto', 'fd', 'sturges', 'scott', 'rice', 'sqrt')
+    :return: Nombre de classes
+    """
+    if not isinstance(bins, str):
+        return max(1, min(int(bins), MAX_HISTOGRAM_BINS))
+    n = len(values)
+    span = float(np.ptp(values)) if n else 0.0
+    if n < 2 or not span:
+        return 1
+    sturges = span / (np.log2(n) + 1)
+    if bins in ('auto', 'fd'):
+        q1, q3 = np.percentile(values, [25, 75])
+        fd = 2 * (q3 - q1) * n ** (-1 / 3)
+        width = (min(fd, sturges) if fd else sturges) if bins == 'auto' else fd
+    elif bins == 'sturges':
+        width = sturges
+    elif bins == 'scott':
+        width = (24 * np.sqrt(np.pi) / n) ** (1 / 3) * np.std(values)
+    elif bins == 'rice':
+        width = span / (2 * n ** (1 / 3))
+    elif bins == 'sqrt':
+        width = span / np.sqrt(n)
+    else:
+        raise ValueError(f"Règle de calcul des classes non prise en charge : {bins}")
+    if not width:
+        return 1
+    return int(min(np.ceil(span / width), MAX_HISTOGRAM_BINS))
+
+def histogram_counts(values, bins='auto'):
+    """
+    Calcule un histogramme vectorisé (NumPy), le nombre de classes étant plafonné.
+
+    :param values: Array de valeurs numériques (sans NaN)
+    :param bins: Nombre de classes ou règle NumPy (voir histogram_bin_count)
+    :return: Tuple (effectifs, bornes des classes)
+    """
+    return np.histogram(values, bins=histogram_bin_count(values, bins))
+
+def binned_kde(values, grid_size=KDE_GRID_SIZE, bandwidth=None):
+    """
+    Estimation de densité par noyau gaussien sur grille (binning linéaire + convolution FFT).
+
+    Le coût est linéaire pour le binning puis indépendant du nombre de lignes.
+
+    :param values: Array de valeurs numériques (sans NaN)
+    :param grid_size: Nombre de points de la grille
+    :param bandwidth: Largeur de bande (règle de Scott par défaut, comme seaborn)
+    :return: Tuple (grille, densité)
+    """
+    n = len(values)
+    if bandwidth is None:
+        bandwidth = values.std(ddof=1) * n ** (-1 / 5) if n > 1 else 0.0
+    if not bandwidth or not np.isfinite(bandwidth):
+        bandwidth = 1.0
+    low, high = values.min() - 3 * bandwidth, values.max() + 3 * bandwidth
+    grid = np.linspace(low, high, grid_size)
+    step = grid[1] - grid[0]
+
+    # Binning linéaire : chaque valeur est répartie entre ses deux points de grille voisins
+    position = (values - low) / step
+    index = np.clip(np.floor(position).astype(np.int64), 0, grid_size - 2)
+    weight = position - index
+    counts = (np.bincount(index, weights=1 - weight, minlength=grid_size)
+              + np.bincount(index + 1, weights=weight, minlength=grid_size))
+
+    # Convolution par le noyau gaussien via FFT
+    half_width = min(int(np.ceil(4 * bandwidth / step)), grid_size - 1)
+    offsets = np.arange(-half_width, half_width + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (bandwidth * np.sqrt(2 * np.pi))
+    size = grid_size + len(kernel) - 1
+    smoothed = np.fft.irfft(np.fft.rfft(counts, size) * np.fft.rfft(kernel, size), size)
+    density = smoothed[half_width:half_width + grid_size] / n
+    return grid, np.clip(density, 0, None)
+
+def plot_distribution(df, col, exact=None, bins='auto'):
+    """
+    Génère un histogramme avec courbe de densité pour la colonne spécifiée.
+
+    Au-delà de EXACT_PLOT_MAX_ROWS valeurs (ou si `exact` vaut False), l'histogramme est tracé à partir
+    des effectifs pré-calculés et la densité est estimée sur grille : le coût du tracé ne dépend plus
+    du nombre de lignes.
+
+    :param df: DataFrame source
+    :param col: Colonne à représenter
+    :param exact: Forcer le rendu exact (True) ou rapide (False) ; automatique si None
+    :param bins: Nombre de classes ou règle NumPy (voir histogram_bin_count)
+    :return: Figure matplotlib
+    """
+    if exact is None:
+        exact = len(df) <= EXACT_PLOT_MAX_ROWS
     fig, ax = plt.subplots()
-    sns.histplot(df[col], kde=True, ax=ax)
+    if exact:
+        sns.histplot(df[col], bins=histogram_bin_count(_numeric_values(df[col]), bins), kde=True, ax=ax)
+        return fig
+
+    values = _numeric_values(df[col])
+    if len(values) == 0:
+        return fig
+    counts, edges = histogram_counts(values, bins=bins)
+    color = sns.color_palette()[0]
+    ax.stairs(counts, edges, fill=True, alpha=0.5, color=color)
+    ax.stairs(counts, edges, color=color)
+    grid, density = binned_kde(values)
+    # Mise à l'échelle des effectifs, comme seaborn le fait pour histplot(kde=True)
+    ax.plot(grid, density * len(values) * np.diff(edges).mean(), color=color)
+    ax.set_xlabel(col)
+    ax.set_ylabel('Count')
     return fig
 
-def plot_correlation(df):
+def plot_correlation(df, method='pearson', max_annotated=ANNOTATED_CORRELATION_MAX_COLUMNS, corr=None):
     """
     Génère une matrice de corrélation pour les colonnes numériques 
     si au moins deux sont présentes.
+
+    La matrice est calculée par blocs (voir src.correlation). Au-delà de `max_annotated` colonnes,
+    la heatmap n'est plus annotée et les colonnes sont réordonnées pour regrouper les variables corrélées.
+
+    :param df: DataFrame à analyser
+    :param method: 'pearson' ou 'spearman'
+    :param max_annotated: Nombre maximal de colonnes pour afficher les valeurs dans les cases
+    :param corr: Matrice de corrélation déjà calculée (évite un second calcul)
     """
-    numerical_cols = df.select_dtypes(include=['float64', 'int64']).columns
-    if len(numerical_cols) > 1:
-        corr = df[numerical_cols].corr()
+    if corr is None:
+        numerical_cols = numeric_columns(df)
+        if len(numerical_cols) < 2:
+            return None
+        corr = correlation_matrix(df, method=method, columns=list(numerical_cols))
+    if len(corr.columns) < 2:
+        return None
+    if len(corr.columns) <= max_annotated:
         fig, ax = plt.subplots()
         sns.heatmap(corr, annot=True, cmap='coolwarm', ax=ax)
         return fig
-    return None
+    order = cluster_order(corr)
+    corr = corr.loc[order, order]
+    size = min(6 + len(order) * 0.08, 20)
+    fig, ax = plt.subplots(figsize=(size, size))
+    image = ax.imshow(corr.to_numpy(), cmap='coolwarm', vmin=-1, vmax=1, interpolation='nearest')
+    fig.colorbar(image, ax=ax, fraction=0.046)
+    # Les étiquettes ne sont affichées que si elles restent lisibles
+    if len(order) <= 100:
+        ax.set_xticks(range(len(order)))
+        ax.set_xticklabels(order, rotation=90, fontsize=6)
+        ax.set_yticks(range(len(order)))
+        ax.set_yticklabels(order, fontsize=6)
+    else:
+        ax.set_xticks([])
+        ax.set_yticks([])
+    return fig
 
-def plot_missing_values(df):
+def plot_missing_values(df, mask=None):
     """
     Visualise les valeurs manquantes sous forme de barres.
+
+    :param mask: Masque de nullité déjà calculé (NullMask) ; construit à partir de df sinon
     """
-    missing_values = df.isnull().sum()
+    if mask is None:
+        mask = NullMask.from_frame(df)
+    missing_values = mask.counts()
     if missing_values.sum() > 0:
         fig, ax = plt.subplots()
         sns.barplot(x=missing_values.index, y=missing_values.values, ax=ax)
@@ -39,8 +276,79 @@ def plot_missing_values(df):
         return fig
     return None
 
-def plot_boxplot(df, col):
-    """Génère une boîte à moustaches pour la colonne spécifiée."""
+def plot_missing_matrix(mask, bands=500):
+    """
+    Matrice de nullité sous-échantillonnée : chaque ligne de l'image est une bande de lignes
+    consécutives, dont la teinte indique la part de valeurs manquantes par colonne.
+
+    :param mask: Masque de nullité (NullMask)
+    :param bands: Nombre maximal de bandes de lignes
+    :return: Figure matplotlib, ou None si le masque est vide
+    """
+    fractions, band_rows = mask.row_bands(bands)
+    if fractions.size == 0:
+        return None
+    columns = mask.columns
+    fig, ax = plt.subplots(figsize=(max(6, 0.4 * len(columns)), 6))
+    image = ax.imshow(fractions, aspect='auto', cmap='Greys', vmin=0, vmax=1, interpolation='nearest',
+                      extent=(-0.5, len(columns) - 0.5, mask.n_rows, 0))
+    fig.colorbar(image, ax=ax, label='Part de valeurs manquantes')
+    ax.set_xticks(range(len(columns)))
+    ax.set_xticklabels(columns, rotation=90)
+    ax.set_ylabel(f'Lignes (bandes de {band_rows})')
+    return fig
+
+def plot_nullity_correlation(mask):
+    """
+    Heatmap des corrélations entre les indicateurs de nullité des colonnes.
+
+    Les colonnes jamais ou toujours manquantes sont écartées (corrélation non définie).
+
+    :param mask: Masque de nullité (NullMask)
+    :return: Figure matplotlib, ou None si moins de deux colonnes sont concernées
+    """
+    corr = mask.nullity_correlation()
+    defined = corr.columns[np.isfinite(np.diag(corr.to_numpy()))]
+    return plot_correlation(None, corr=corr.loc[defined, defined])
+
+def _draw_box(ax, summary):
+    """Trace une boîte à moustaches à partir d'un résumé pré-calculé."""
+    color = sns.color_palette()[0]
+    ax.bxp([summary], showfliers=True, patch_artist=True,
+           boxprops={'facecolor': color, 'alpha': 0.6}, medianprops={'color': 'black'})
+    ax.set_xticks([])
+    ax.set_title(summary['label'], fontsize=9)
+
+def plot_boxplot(df, col, summary=None):
+    """
+    Génère une boîte à moustaches pour la colonne spécifiée.
+
+    Le tracé utilise les statistiques résumées (Axes.bxp) : son coût ne dépend pas du nombre de lignes.
+    """
+    if summary is None:
+        summary = box_summaries(df, [col])[0]
     fig, ax = plt.subplots()
-    sns.boxplot(x=df[col], ax=ax, orient='v')
+    if summary['count']:
+        _draw_box(ax, summary)
+    return fig
+
+def plot_boxplots(summaries, ncols=4):
+    """
+    Trace toutes les boîtes à moustaches sur une seule figure (un panneau et une échelle par colonne).
+
+    :param summaries: Résumés calculés par box_summaries()
+    :param ncols: Nombre de panneaux par ligne
+    :return: Figure matplotlib, ou None s'il n'y a aucune colonne à représenter
+    """
+    summaries = [s for s in summaries if s['count']]
+    if not summaries:
+        return None
+    ncols = min(ncols, len(summaries))
+    nrows = -(-len(summaries) // ncols)
+    fig, axes = plt.subplots(nrows, ncols, figsize=(3 * ncols, 3.5 * nrows), squeeze=False)
+    for ax, summary in zip(axes.flat, summaries):
+        _draw_box(ax, summary)
+    for ax in axes.flat[len(summaries):]:
+        ax.set_visible(False)
+    fig.tight_layout()
     return fig
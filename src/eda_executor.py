@@ -0,0 +1,298 @@
+# eda_executor.py
+# Ce module exécute les analyses de l'EDA+ dans un pool de processus (backend matplotlib Agg).
+# Les données sont partagées par un fichier Arrow IPC (Feather) relu en mémoire mappée par les processus,
+# et les résultats sont renvoyés au fur et à mesure de leur achèvement. La pile de tracé (matplotlib, seaborn)
+# n'est importée qu'à l'exécution des analyses, pour ne pas ralentir le démarrage de l'application.
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from src.config import EDA_SHARED_DIR, EDA_SHARED_MAX_DISK_BYTES, EDA_WORKERS
+from src.correlation import correlation_matrix
+from src.null_mask import NullMask
+from src.render_cache import figure_to_png, render_key
+from src.tracing import SpanRecorder, activate, active_recorder, adopt_spans, span
+
+logger = logging.getLogger(__name__)
+
+
+class EdaTask:
+    """
+    Analyse élémentaire de l'EDA+ : nom de l'analyse, colonnes utilisées et paramètres.
+
+    La clé (`key`) dépend de l'empreinte du contenu des colonnes : elle sert de clé au cache de rendus.
+    """
+
+    def __init__(self, analysis, columns, fingerprints, **params):
+        if analysis not in _TASKS:
+            raise ValueError(f"Analyse inconnue : {analysis}")
+        self.analysis = analysis
+        self.columns = list(columns)
+        self.params = params
+        self.key = render_key(analysis, self.columns, fingerprints, **params)
+
+
+def _task_summaries(df, columns):
+    from src.eda_advanced import box_summaries
+    return box_summaries(df, columns)
+
+
+def _task_distribution(df, columns, exact=False):
+    from src.eda_advanced import plot_distribution
+    return figure_to_png(plot_distribution(df, columns[0], exact=True if exact else None))
+
+
+def _task_correlation(df, columns, method='pearson'):
+    from src.eda_advanced import plot_correlation
+    corr = correlation_matrix(df, method=method, columns=columns)
+    png = figure_to_png(plot_correlation(df, corr=corr)) if len(columns) > 1 else None
+    return {'corr': corr, 'png': png}
+
+
+def _task_missing(df, columns, null_mask=None):
+    from src.eda_advanced import plot_missing_matrix, plot_missing_values, plot_nullity_correlation
+    mask = null_mask if null_mask is not None else NullMask.from_frame(df[columns])
+    bar = figure_to_png(plot_missing_values(df, mask=mask))
+    if bar is None:
+        return None
+    return {
+        'bar': bar,
+        'matrix': figure_to_png(plot_missing_matrix(mask)),
+        'nullity': figure_to_png(plot_nullity_correlation(mask)),
+    }
+
+
+def _task_boxplots(df, columns):
+    from src.eda_advanced import box_summaries, plot_boxplots
+    summaries = box_summaries(df, columns)
+    png = figure_to_png(plot_boxplots(summaries))
+    if png is None:
+        return None
+    # Colonnes dont les valeurs aberrantes tracées ont été sous-échantillonnées
+    capped = [s['label'] for s in summaries if s['n_fliers'] > len(s['fliers'])]
+    return {'png': png, 'capped': capped}
+
+
+# Analyses disponibles : nom -> fonction(df, colonnes, **paramètres)
+_TASKS = {
+    'summaries': _task_summaries,
+    'distribution': _task_distribution,
+    'correlation': _task_correlation,
+    'missing': _task_missing,
+    'boxplots': _task_boxplots,
+}
+
+
+def _run_task(df, analysis, columns, params):
+    """Exécute une analyse, mesurée par un span 'eda.<analyse>'."""
+    with span(f"eda.{analysis}", rows=len(df), columns=len(columns)):
+        return _TASKS[analysis](df, columns, **params)
+
+
+def _init_worker():
+    """Initialisation des processus du pool : rendu sans affichage."""
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+# Dernier fichier partagé ouvert par le processus courant (chemin, table Arrow en mémoire mappée)
+_shared_table = (None, None)
+
+
+def _run_shared(path, analysis, columns, params, trace_memory=None):
+    """
+    Exécute une analyse dans un processus du pool, sur les colonnes du fichier partagé.
+
+    Si `trace_memory` n'est pas None, l'analyse est instrumentée et ses spans sont renvoyés avec le
+    résultat : (résultat, spans).
+    """
+    global _shared_table
+    if _shared_table[0] != path:
+        import pyarrow.feather as feather
+        _shared_table = (path, feather.read_table(path, memory_map=True))
+    df = _shared_table[1].select(columns).to_pandas()
+    if trace_memory is None:
+        return _run_task(df, analysis, columns, params)
+    recorder = SpanRecorder(path=None, memory=trace_memory)
+    activate(recorder)
+    try:
+        result = _run_task(df, analysis, columns, params)
+    finally:
+        activate(None)
+    return result, list(recorder.spans)
+
+
+def _traced_result(future):
+    """Résultat d'une analyse instrumentée ; ses spans sont rattachés au span courant."""
+    result, spans = future.result()
+    adopt_spans(spans)
+    return result
+
+
+def share_frame(df, fingerprints, shared_dir=EDA_SHARED_DIR):
+    """
+    Écrit (une seule fois par contenu) le DataFrame dans un fichier Arrow IPC non compressé,
+    relu en mémoire mappée par les processus du pool.
+
+    :param df: DataFrame à partager
+    :param fingerprints: Dictionnaire colonne -> empreinte du contenu
+    :param shared_dir: Répertoire des fichiers partagés
+    :return: Chemin du fichier partagé
+    """
+    key = render_key('shared', df.columns, fingerprints)
+    path = os.path.join(shared_dir, f"{key}.feather")
+    if not os.path.exists(path):
+        os.makedirs(shared_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df.reset_index(drop=True).to_feather(tmp_path, compression='uncompressed')
+        os.replace(tmp_path, path)
+        _trim_shared(shared_dir, keep=path)
+    else:
+        os.utime(path)
+    return path
+
+
+def _trim_shared(shared_dir, keep, max_disk_bytes=EDA_SHARED_MAX_DISK_BYTES):
+    """Supprime les fichiers partagés les plus anciens au-delà du budget disque."""
+    files = [os.path.join(shared_dir, name) for name in os.listdir(shared_dir) if name.endswith('.feather')]
+    files.sort(key=os.path.getmtime)
+    total = sum(os.path.getsize(path) for path in files)
+    for path in files:
+        if total <= max_disk_bytes:
+            break
+        if path != keep:
+            total -= os.path.getsize(path)
+            os.remove(path)
+
+
+class EdaExecutor:
+    """
+    Exécuteur des analyses de l'EDA+.
+
+    Avec un seul processus, les analyses sont exécutées dans le processus courant. Au-delà, elles sont
+    réparties dans un pool de processus (démarrage 'spawn', sûr dans un serveur multi-thread) conservé
+    entre les soumissions.
+    """
+
+    def __init__(self, workers=EDA_WORKERS, shared_dir=EDA_SHARED_DIR):
+        self.workers = max(int(workers), 1)
+        self.shared_dir = shared_dir
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker
+            )
+        return self._pool
+
+    def shutdown(self, wait=True, cancel_futures=True):
+        """
+        Arrête le pool de processus.
+
+        :param wait: Attendre l'arrêt des processus
+        :param cancel_futures: Annuler les analyses soumises et non démarrées (sinon elles se terminent avant l'arrêt)
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+            self._pool = None
+
+    def run(self, df, tasks, fingerprints, cache=None, null_mask=None):
+        """
+        Exécute les analyses et renvoie leurs résultats au fur et à mesure de leur achèvement.
+
+        Les résultats déjà présents dans le cache sont renvoyés immédiatement ; les autres y sont ajoutés.
+
+        :param df: DataFrame analysé
+        :param tasks: Liste d'EdaTask
+        :param fingerprints: Dictionnaire colonne -> empreinte du contenu (nommage du fichier partagé)
+        :param cache: RenderCache (facultatif)
+        :param null_mask: Masque de nullité déjà calculé, utilisé lors d'une exécution dans le processus courant
+        :return: Générateur de tuples (tâche, résultat, erreur éventuelle)
+        """
+        pending = []
+        for task in tasks:
+            cached = cache.get(task.key, _NOT_CACHED) if cache is not None else _NOT_CACHED
+            if cached is _NOT_CACHED:
+                pending.append(task)
+            else:
+                yield task, cached, None
+        if not pending:
+            return
+
+        path = None
+        if self.workers > 1 and len(pending) > 1:
+            try:
+                path = share_frame(df, fingerprints, self.shared_dir)
+            except Exception as e:
+                # Noms de colonnes non textuels, types mixtes non convertibles en Arrow... : exécution locale
+                logger.warning("Partage des données pour l'EDA+ impossible, exécution séquentielle : %s", e)
+
+        futures = None
+        if path is not None:
+            # Instrumentation active : les processus mesurent leurs analyses et renvoient les spans
+            recorder = active_recorder()
+            trace_memory = recorder.memory if recorder is not None else None
+            try:
+                pool = self._get_pool()
+                futures = {pool.submit(_run_shared, path, task.analysis, task.columns, task.params, trace_memory): task
+                           for task in pending}
+            except RuntimeError as e:
+                # Pool arrêté entre-temps (exécuteur remplacé par get_eda_executor) : exécution locale
+                logger.warning("Pool de l'EDA+ arrêté, exécution séquentielle : %s", e)
+
+        if futures is None:
+            for task in pending:
+                params = dict(task.params)
+                if task.analysis == 'missing' and null_mask is not None:
+                    params['null_mask'] = null_mask.subset(task.columns)
+                yield self._finish(task, cache, lambda: _run_task(df, task.analysis, task.columns, params))
+            return
+
+        for future in as_completed(futures):
+            collect = future.result if trace_memory is None else functools.partial(_traced_result, future)
+            task, result, error = self._finish(futures[future], cache, collect)
+            if isinstance(error, BrokenProcessPool):
+                # Un processus a été tué (ex : manque de mémoire) : le pool sera recréé à la prochaine exécution
+                self._pool = None
+            yield task, result, error
+
+    @staticmethod
+    def _finish(task, cache, compute):
+        """Récupère le résultat d'une tâche et le met en cache (les erreurs sont renvoyées, pas levées)."""
+        try:
+            result = compute()
+        except Exception as e:
+            logger.error("Échec de l'analyse %s sur %s : %s", task.analysis, task.columns, e)
+            return task, None, e
+        if cache is not None:
+            cache.put(task.key, result)
+        return task, result, None
+
+
+_NOT_CACHED = object()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_eda_executor(workers=EDA_WORKERS):
+    """
+    Renvoie l'exécuteur partagé par les sessions du processus.
+
+    Un seul pool est conservé : si le nombre de processus demandé change, l'exécuteur précédent est arrêté
+    (les analyses déjà soumises se terminent, ses processus s'arrêtent ensuite) puis remplacé.
+    """
+    global _executor
+    workers = max(int(workers), 1)
+    with _executor_lock:
+        if _executor is None or _executor.workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False, cancel_futures=False)
+            _executor = EdaExecutor(workers)
+        return _executor
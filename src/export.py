@@ -0,0 +1,241 @@
+# export.py
+# Ce module enregistre les DataFrames générés par les traitements : CSV écrit par blocs (en parallèle,
+# compressé gzip si demandé), Parquet, Feather et Excel en écriture en flux (openpyxl write-only),
+# avec une fonction de progression appelée après chaque bloc écrit.
+import codecs
+import gzip
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from src.config import DEFAULT_CHUNKSIZE, EXPORT_WORKERS
+from src.tracing import traced
+
+# Formats d'export proposés : libellé -> extension du fichier
+EXPORT_FORMATS = {
+    "CSV": ".csv",
+    "CSV compressé (gzip)": ".csv.gz",
+    "Excel": ".xlsx",
+    "Parquet": ".parquet",
+    "Feather": ".feather",
+}
+
+# Nombre maximal de lignes d'une feuille Excel (ligne d'en-tête comprise) et de colonnes
+EXCEL_MAX_ROWS = 1_048_576
+EXCEL_MAX_COLUMNS = 16_384
+
+# Niveau de compression gzip (6 : compromis usuel entre taille et vitesse)
+GZIP_LEVEL = 6
+
+
+def _chunk_starts(n_rows, chunksize):
+    """Débuts des blocs de lignes ; un bloc vide pour un DataFrame sans ligne (en-tête seul)."""
+    return range(0, n_rows, chunksize) if n_rows else [0]
+
+
+def _encode_csv_chunk(chunk, header, first, separator, encoding, compress):
+    """
+    Sérialise un bloc en octets CSV (exécuté dans un thread de travail).
+
+    La marque d'ordre des octets (utf-8-sig, utf-16) n'est écrite qu'en tête du fichier. En mode gzip,
+    chaque bloc est compressé en un membre gzip indépendant : leur concaténation est un fichier gzip valide.
+    """
+    text = chunk.to_csv(None, index=False, header=header, sep=separator)
+    encoder = codecs.getincrementalencoder(encoding)()
+    if not first:
+        encoder.encode('')
+    data = encoder.encode(text, final=True)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL) if compress else data
+
+
+def _replace_on_success(path, write):
+    """Écrit dans un fichier temporaire puis le renomme : pas de fichier partiel en cas d'erreur."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+@traced('write_csv')
+def write_csv(df, path, separator=',', encoding='utf-8', compress=None, chunksize=DEFAULT_CHUNKSIZE,
+              workers=EXPORT_WORKERS, progress=None):
+    """
+    Écrit un DataFrame au format CSV, bloc par bloc.
+
+    Les blocs sont sérialisés (et compressés) en parallèle dans des threads, puis écrits dans l'ordre ;
+    seule une fenêtre bornée de blocs est conservée en mémoire.
+
+    :param df: DataFrame à exporter
+    :param path: Chemin du fichier de sortie
+    :param separator: Séparateur CSV
+    :param encoding: Encodage du fichier
+    :param compress: Compression gzip (par défaut : si le chemin se termine par '.gz')
+    :param chunksize: Nombre de lignes par bloc
+    :param workers: Nombre de threads de sérialisation
+    :param progress: Fonction appelée avec la part écrite (entre 0 et 1) après chaque bloc
+    :return: Chemin du fichier écrit
+    """
+    if compress is None:
+        compress = path.endswith('.gz')
+    starts = _chunk_starts(len(df), chunksize)
+
+    def encode(i, start):
+        return _encode_csv_chunk(df.iloc[start:start + chunksize], i == 0, i == 0, separator, encoding, compress)
+
+    def write(tmp_path):
+        with open(tmp_path, 'wb') as f:
+            written = 0
+
+            def emit(data):
+                nonlocal written
+                f.write(data)
+                written += 1
+                if progress is not None:
+                    progress(written / len(starts))
+
+            if workers <= 1 or len(starts) == 1:
+                for i, start in enumerate(starts):
+                    emit(encode(i, start))
+                return
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = deque()
+                for i, start in enumerate(starts):
+                    pending.append(executor.submit(encode, i, start))
+                    if len(pending) >= 2 * workers:
+                        emit(pending.popleft().result())
+                while pending:
+                    emit(pending.popleft().result())
+
+    return _replace_on_success(path, write)
+
+
+def _excel_values(chunk):
+    """Lignes d'un bloc sous forme de tuples de valeurs Python (valeurs manquantes -> cellules vides)."""
+    columns = []
+    for col in chunk.columns:
+        series = chunk[col]
+        values = series.astype(object).to_numpy()
+        missing = series.isna().to_numpy()
+        if missing.any():
+            values[missing] = None
+        columns.append(values)
+    return zip(*columns)
+
+
+@traced('write_excel')
+def write_excel(df, path, chunksize=DEFAULT_CHUNKSIZE, max_rows=EXCEL_MAX_ROWS, progress=None):
+    """
+    Écrit un DataFrame au format Excel en flux (openpyxl en mode write-only, mémoire constante).
+
+    Au-delà de la limite de lignes d'une feuille, les lignes suivantes sont écrites dans de nouvelles
+    feuilles (Sheet1, Sheet2...), chacune avec la ligne d'en-tête.
+
+    :param df: DataFrame à exporter
+    :param path: Chemin du fichier de sortie
+    :param chunksize: Nombre de lignes converties à la fois
+    :param max_rows: Nombre maximal de lignes par feuille (en-tête comprise)
+    :param progress: Fonction appelée avec la part écrite (entre 0 et 1) après chaque bloc
+    :return: Chemin du fichier écrit
+    """
+    from openpyxl import Workbook
+
+    if df.shape[1] > EXCEL_MAX_COLUMNS:
+        raise ValueError(f"Excel est limité à {EXCEL_MAX_COLUMNS} colonnes ({df.shape[1]} demandées).")
+    rows_per_sheet = max_rows - 1
+    header = [str(col) for col in df.columns]
+
+    def write(tmp_path):
+        workbook = Workbook(write_only=True)
+        for sheet_index, sheet_start in enumerate(_chunk_starts(len(df), rows_per_sheet)):
+            sheet = workbook.create_sheet(f"Sheet{sheet_index + 1}")
+            sheet.append(header)
+            sheet_end = min(sheet_start + rows_per_sheet, len(df))
+            for start in range(sheet_start, sheet_end, chunksize):
+                for row in _excel_values(df.iloc[start:min(start + chunksize, sheet_end)]):
+                    sheet.append(row)
+                if progress is not None:
+                    progress(min(start + chunksize, sheet_end) / len(df))
+        workbook.save(tmp_path)
+
+    path = _replace_on_success(path, write)
+    if progress is not None and not len(df):
+        progress(1.0)
+    return path
+
+
+@traced('write_arrow')
+def write_arrow(df, path, file_format='parquet', chunksize=DEFAULT_CHUNKSIZE, progress=None):
+    """
+    Écrit un DataFrame au format Parquet (compression snappy) ou Feather (Arrow IPC, compression lz4).
+
+    Le DataFrame est converti une fois en table Arrow, puis écrit par groupes de `chunksize` lignes.
+
+    :param df: DataFrame à exporter
+    :param path: Chemin du fichier de sortie
+    :param file_format: 'parquet' ou 'feather'
+    :param chunksize: Nombre de lignes par groupe (row group Parquet, batch Arrow)
+    :param progress: Fonction appelée avec la part écrite (entre 0 et 1) après chaque groupe
+    :return: Chemin du fichier écrit
+    """
+    import pyarrow as pa
+
+    if file_format not in ('parquet', 'feather'):
+        raise ValueError(f"Format Arrow inconnu : {file_format}")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    starts = _chunk_starts(table.num_rows, chunksize)
+
+    def write(tmp_path):
+        if file_format == 'parquet':
+            import pyarrow.parquet as pq
+            writer = pq.ParquetWriter(tmp_path, table.schema, compression='snappy')
+        else:
+            options = pa.ipc.IpcWriteOptions(compression='lz4')
+            writer = pa.ipc.new_file(tmp_path, table.schema, options=options)
+        with writer:
+            for i, start in enumerate(starts):
+                part = table.slice(start, chunksize)
+                if file_format == 'parquet':
+                    writer.write_table(part)
+                else:
+                    writer.write_table(part, max_chunksize=chunksize)
+                if progress is not None:
+                    progress((i + 1) / len(starts))
+
+    return _replace_on_success(path, write)
+
+
+def export_format(path):
+    """Libellé du format d'export correspondant à l'extension d'un chemin."""
+    for label, extension in sorted(EXPORT_FORMATS.items(), key=lambda item: -len(item[1])):
+        if path.lower().endswith(extension):
+            return label
+    raise ValueError(f"Format d'export non supporté pour {path} (extensions : {list(EXPORT_FORMATS.values())}).")
+
+
+@traced('export_dataframe')
+def export_dataframe(df, path, separator=',', encoding='utf-8', chunksize=DEFAULT_CHUNKSIZE,
+                     workers=EXPORT_WORKERS, progress=None):
+    """
+    Enregistre un DataFrame dans le format correspondant à l'extension du chemin (voir EXPORT_FORMATS).
+
+    :param df: DataFrame à exporter
+    :param path: Chemin du fichier de sortie (.csv, .csv.gz, .xlsx, .parquet, .feather)
+    :param separator: Séparateur (CSV uniquement)
+    :param encoding: Encodage (CSV uniquement)
+    :param chunksize: Nombre de lignes par bloc
+    :param workers: Nombre de threads de sérialisation (CSV uniquement)
+    :param progress: Fonction appelée avec la part écrite (entre 0 et 1) après chaque bloc
+    :return: Chemin du fichier écrit
+    """
+    label = export_format(path)
+    if label == "Excel":
+        return write_excel(df, path, chunksize=chunksize, progress=progress)
+    if label in ("Parquet", "Feather"):
+        return write_arrow(df, path, label.lower(), chunksize=chunksize, progress=progress)
+    return write_csv(df, path, separator, encoding, chunksize=chunksize, workers=workers, progress=progress)
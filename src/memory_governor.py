@@ -0,0 +1,245 @@
+# memory_governor.py
+# Ce module suit les DataFrames conservés par les sessions Streamlit d'un même processus serveur et les
+# borne par un budget mémoire global : au-delà, les DataFrames les moins récemment utilisés sont déversés
+# sur disque (Arrow IPC non compressé) puis relus en mémoire mappée lorsque leur session y accède de nouveau.
+# Les entrées en mémoire du cache d'analyse (src/cache.py) entrent dans le même budget : un DataFrame déversé
+# n'est réellement libéré que si le cache ne le retient plus.
+import itertools
+import logging
+import os
+import tempfile
+import threading
+import weakref
+
+from src.cache import get_parse_cache
+from src.config import SESSION_MEMORY_MAX_BYTES, SESSION_SPILL_DIR
+from src.upload_spool import purge_stale_spools
+
+logger = logging.getLogger(__name__)
+
+
+def _remove_files(paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning("Suppression du fichier déversé %s impossible : %s", path, e)
+    paths.clear()
+
+
+def _spillable(df):
+    """Seuls les noms de colonnes textuels et uniques sont restitués à l'identique par Arrow."""
+    return df.columns.is_unique and all(isinstance(col, str) for col in df.columns)
+
+
+class FrameHandle:
+    """
+    Référence à un DataFrame de session confié au gouverneur.
+
+    `get()` renvoie le DataFrame, relu en mémoire mappée s'il a été déversé entre-temps. Le DataFrame
+    renvoyé doit être traité en lecture seule : un traitement produit un nouveau DataFrame, à confier
+    de nouveau au gouverneur. Le fichier déversé est supprimé par `release()` ou à la destruction de la référence.
+    """
+
+    def __init__(self, governor, df, owner, nbytes):
+        self._governor = governor
+        self._df = df
+        self.owner = owner
+        self.nbytes = nbytes
+        self.last_used = 0
+        self.spillable = _spillable(df)
+        self.released = False
+        self._files = []  # fichier déversé (liste partagée avec le finaliseur)
+        self._finalizer = weakref.finalize(self, _remove_files, self._files)
+
+    def __repr__(self):
+        state = 'libéré' if self.released else 'déversé' if self.spilled else 'en mémoire'
+        return f"FrameHandle({self.owner!r}, {self.nbytes} octets, {state})"
+
+    @property
+    def spilled(self):
+        return self._df is None and not self.released
+
+    @property
+    def path(self):
+        return self._files[0] if self._files else None
+
+    def get(self):
+        """Renvoie le DataFrame (en le relisant depuis le disque s'il a été déversé)."""
+        return self._governor.touch(self)
+
+    def release(self):
+        """Oublie le DataFrame et supprime son fichier déversé."""
+        self._governor.release(self)
+
+
+class MemoryGovernor:
+    """
+    Budget mémoire global des DataFrames de session.
+
+    Un DataFrame partagé par plusieurs références (ex : même fichier chargé par deux sessions via le cache
+    d'analyse) n'est compté qu'une fois. Le déversement supprime la référence du gouverneur : la mémoire
+    est libérée dès qu'aucun autre objet (page en cours d'exécution, cache d'analyse) ne retient le DataFrame.
+    Les DataFrames non restituables à l'identique par Arrow (noms de colonnes non textuels ou dupliqués,
+    colonnes de types mixtes) restent en mémoire.
+
+    Avec `cache` (ParseCache), les entrées du cache d'analyse sont comptées dans le budget : celles qui ne
+    portent aucun DataFrame de session sont retirées de la mémoire en premier, et le déversement d'un
+    DataFrame de session retire aussi du cache les entrées qui partagent ce DataFrame.
+    """
+
+    def __init__(self, max_bytes=SESSION_MEMORY_MAX_BYTES, spill_dir=SESSION_SPILL_DIR, cache=None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.cache = cache
+        self._handles = weakref.WeakSet()
+        self._clock = itertools.count(1)
+        self._lock = threading.RLock()
+        purge_stale_spools(spill_dir)
+
+    def register(self, df, owner=None, nbytes=None):
+        """
+        Confie un DataFrame au gouverneur puis fait respecter le budget (ce DataFrame excepté).
+
+        :param df: DataFrame de session
+        :param owner: Identifiant de la session propriétaire
+        :param nbytes: Taille en mémoire si elle est déjà connue (sinon memory_usage(deep=True))
+        :return: FrameHandle
+        """
+        if nbytes is None:
+            nbytes = int(df.memory_usage(deep=True).sum())
+        handle = FrameHandle(self, df, owner, nbytes)
+        with self._lock:
+            handle.last_used = next(self._clock)
+            self._handles.add(handle)
+            self.enforce(keep=handle)
+        return handle
+
+    def touch(self, handle):
+        """Marque le DataFrame comme utilisé et le renvoie, relu en mémoire mappée s'il a été déversé."""
+        with self._lock:
+            if handle.released:
+                raise ValueError("Ce DataFrame a été libéré.")
+            handle.last_used = next(self._clock)
+            if handle._df is not None:
+                return handle._df
+            import pyarrow.feather as feather
+            # Lecture mappée : les colonnes sans valeurs nulles de types primitifs ne sont pas copiées
+            handle._df = feather.read_table(handle.path, memory_map=True).to_pandas(split_blocks=True)
+            self.enforce(keep=handle)
+            return handle._df
+
+    def release(self, handle):
+        with self._lock:
+            self._handles.discard(handle)
+            handle._df = None
+            handle.released = True
+        _remove_files(handle._files)
+
+    def release_owner(self, owner):
+        """Libère tous les DataFrames d'une session (mémoire et fichiers déversés)."""
+        with self._lock:
+            handles = [h for h in self._handles if h.owner == owner]
+        for handle in handles:
+            self.release(handle)
+
+    def _resident(self):
+        return [h for h in self._handles if h._df is not None]
+
+    def _cache_frames(self):
+        return self.cache.resident_frames() if self.cache is not None else []
+
+    @property
+    def memory_bytes(self):
+        """Mémoire des DataFrames non déversés et du cache d'analyse (chaque DataFrame compté une fois)."""
+        with self._lock:
+            sizes = {id(h._df): h.nbytes for h in self._resident()}
+            for df, nbytes in self._cache_frames():
+                sizes.setdefault(id(df), nbytes)
+            return sum(sizes.values())
+
+    def enforce(self, keep=None):
+        """
+        Fait respecter le budget : retire d'abord de la mémoire les entrées du cache d'analyse sans session,
+        puis déverse les DataFrames de session les moins récemment utilisés.
+        """
+        with self._lock:
+            if self.memory_bytes <= self.max_bytes:
+                return
+            session_frames = {id(h._df) for h in self._resident()}
+            for df, _ in self._cache_frames():
+                if self.memory_bytes <= self.max_bytes:
+                    return
+                if id(df) not in session_frames:
+                    self.cache.demote(df)
+            for handle in sorted(self._resident(), key=lambda h: h.last_used):
+                if self.memory_bytes <= self.max_bytes:
+                    break
+                if handle is not keep and handle.spillable:
+                    self._spill(handle)
+
+    def _spill(self, handle):
+        if handle.path is None:
+            try:
+                import pyarrow as pa
+                import pyarrow.feather as feather
+                os.makedirs(self.spill_dir, exist_ok=True)
+                fd, path = tempfile.mkstemp(prefix=f"{os.getpid()}_", suffix='.arrow', dir=self.spill_dir)
+                os.close(fd)
+                handle._files.append(path)
+                table = pa.Table.from_pandas(handle._df, preserve_index=True)
+                feather.write_feather(table, path, compression='uncompressed')
+            except Exception as e:
+                # Types mixtes, disque plein... : le DataFrame reste en mémoire
+                logger.warning("Déversement du DataFrame de la session %s impossible : %s", handle.owner, e)
+                _remove_files(handle._files)
+                handle.spillable = False
+                return
+        # Un DataFrame déjà relu depuis son fichier (lecture seule) n'est pas réécrit
+        df, handle._df = handle._df, None
+        if self.cache is not None:
+            # Le cache d'analyse retiendrait sinon le même DataFrame : rien ne serait libéré
+            self.cache.demote(df)
+
+    def usage(self):
+        """
+        État du budget.
+
+        :return: Dictionnaire (octets en mémoire, dont ceux du cache d'analyse, budget, octets déversés
+                 sur disque, nombre de DataFrames, de DataFrames déversés et de sessions)
+        """
+        with self._lock:
+            handles = list(self._handles)
+            memory = self.memory_bytes
+            cache_bytes = self.cache.memory_bytes if self.cache is not None else 0
+        disk = 0
+        for handle in handles:
+            if handle.spilled and handle.path is not None:
+                try:
+                    disk += os.path.getsize(handle.path)
+                except OSError:
+                    pass
+        return {
+            'memory_bytes': memory,
+            'cache_bytes': cache_bytes,
+            'max_bytes': self.max_bytes,
+            'disk_bytes': disk,
+            'frames': len(handles),
+            'spilled_frames': sum(h.spilled for h in handles),
+            'sessions': len({h.owner for h in handles}),
+        }
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def get_memory_governor():
+    """Renvoie le gouverneur partagé par toutes les sessions du processus."""
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = MemoryGovernor(cache=get_parse_cache())
+    return _governor
@@ -0,0 +1,138 @@
+# null_mask.py
+# Ce module stocke la nullité d'un DataFrame sous forme de masque compacté (un bit par cellule)
+# et en dérive les analyses de valeurs manquantes (comptages, co-occurrences, corrélation, bandes de lignes).
+import numpy as np
+import pandas as pd
+
+# Nombre de lignes décompactées à la fois pour le calcul des co-occurrences
+COOCCURRENCE_BLOCK_ROWS = 1 << 16
+
+if hasattr(np, 'bitwise_count'):
+    _popcount = np.bitwise_count
+else:
+    # NumPy < 2.0 : table du nombre de bits à 1 pour chaque octet
+    _POPCOUNT_TABLE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+    def _popcount(values):
+        return _POPCOUNT_TABLE[values]
+
+
+class NullMask:
+    """
+    Masque de nullité compacté : un bit par cellule (np.packbits), stocké colonne par colonne.
+
+    Un dataset de 100 millions de cellules occupe environ 12 Mo. Les colonnes peuvent être
+    recalculées individuellement (`update` avec `columns`), ce qui permet au profil du dataset
+    de ne mettre à jour que les colonnes modifiées.
+    """
+
+    def __init__(self):
+        self._bits = {}       # colonne -> octets compactés (uint8)
+        self.n_rows = None
+
+    @classmethod
+    def from_frame(cls, df):
+        """Construit le masque complet d'un DataFrame."""
+        return cls().update(df)
+
+    @property
+    def columns(self):
+        return list(self._bits)
+
+    @property
+    def nbytes(self):
+        """Mémoire occupée par le masque (octets)."""
+        return sum(bits.nbytes for bits in self._bits.values())
+
+    def update(self, df, columns=None):
+        """
+        Recalcule le masque des colonnes indiquées (toutes par défaut) et oublie les colonnes disparues.
+
+        Un changement du nombre de lignes entraîne le recalcul de toutes les colonnes.
+        """
+        if len(df) != self.n_rows:
+            self._bits.clear()
+            self.n_rows = len(df)
+            columns = None
+        if columns is None:
+            columns = df.columns
+        for col in columns:
+            self._bits[col] = np.packbits(df[col].isna().to_numpy())
+        self._bits = {col: self._bits[col] for col in df.columns if col in self._bits}
+        return self
+
+    def rename(self, new_names):
+        """Reporte le masque sur les nouveaux noms de colonnes."""
+        self._bits = {new_names.get(col, col): bits for col, bits in self._bits.items()}
+
+    def clear(self):
+        self._bits.clear()
+        self.n_rows = None
+
+    def subset(self, columns):
+        """Renvoie un masque restreint aux colonnes indiquées (sans copie des données)."""
+        mask = NullMask()
+        mask.n_rows = self.n_rows
+        mask._bits = {col: self._bits[col] for col in columns if col in self._bits}
+        return mask
+
+    def _stacked(self):
+        return np.stack(list(self._bits.values())) if self._bits else np.empty((0, 0), dtype=np.uint8)
+
+    def count(self, col):
+        """Nombre de valeurs manquantes d'une colonne."""
+        return int(_popcount(self._bits[col]).sum(dtype=np.int64))
+
+    def counts(self):
+        """Nombre de valeurs manquantes par colonne (Series)."""
+        return pd.Series({col: self.count(col) for col in self._bits}, dtype='int64')
+
+    def cooccurrence(self, block_rows=COOCCURRENCE_BLOCK_ROWS):
+        """
+        Matrice des co-occurrences : nombre de lignes où les deux colonnes sont manquantes
+        (la diagonale contient les comptages par colonne).
+
+        Le masque est décompacté par blocs de lignes et les blocs sont multipliés (BLAS).
+        """
+        bits = self._stacked()
+        k = len(bits)
+        result = np.zeros((k, k), dtype=np.int64)
+        block_bytes = max(block_rows // 8, 1)
+        for start in range(0, bits.shape[1] if k else 0, block_bytes):
+            block = np.unpackbits(bits[:, start:start + block_bytes], axis=1).astype(np.float32)
+            result += np.rint(block @ block.T).astype(np.int64)
+        return pd.DataFrame(result, index=self.columns, columns=self.columns)
+
+    def nullity_correlation(self):
+        """
+        Corrélation de Pearson entre les indicateurs de nullité des colonnes.
+
+        Les colonnes jamais ou toujours manquantes n'ont pas de corrélation définie (NaN).
+        """
+        co = self.cooccurrence().to_numpy(dtype=np.float64)
+        n = float(self.n_rows or 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            p = np.diag(co) / n
+            cov = co / n - np.outer(p, p)
+            var = p * (1 - p)
+            corr = np.clip(cov / np.sqrt(np.outer(var, var)), -1, 1)
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def row_bands(self, bands=500):
+        """
+        Part de valeurs manquantes par bande de lignes consécutives et par colonne.
+
+        Les bandes sont alignées sur les octets du masque (multiples de 8 lignes).
+
+        :param bands: Nombre maximal de bandes
+        :return: Tuple (array (bandes × colonnes) des parts manquantes, nombre de lignes par bande)
+        """
+        bits = self._stacked()
+        if not self.n_rows or not len(bits):
+            return np.empty((0, len(bits))), 0
+        n_bytes = bits.shape[1]
+        band_bytes = -(-n_bytes // bands)
+        starts = np.arange(0, n_bytes, band_bytes)
+        missing = np.add.reduceat(_popcount(bits).astype(np.int64), starts, axis=1)
+        rows = np.minimum(starts * 8 + band_bytes * 8, self.n_rows) - starts * 8
+        return (missing / rows).T, band_bytes * 8
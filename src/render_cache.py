@@ -0,0 +1,148 @@
+# render_cache.py
+# Ce module rastérise les graphiques EDA+ en PNG et mémorise les rendus (et les résultats intermédiaires)
+# dans un cache LRU partagé par les sessions du processus serveur.
+import hashlib
+import io
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from src.config import RENDER_CACHE_MAX_BYTES, RENDER_DPI
+
+_MISSING = object()
+
+
+def figure_to_png(fig, dpi=RENDER_DPI):
+    """
+    Rastérise une figure matplotlib en PNG puis la ferme (libération immédiate de la mémoire).
+
+    :param fig: Figure matplotlib, ou None
+    :return: Octets PNG, ou None si aucune figure n'a été fournie
+    """
+    if fig is None:
+        return None
+    import matplotlib.pyplot as plt  # déjà chargé par la création de la figure
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def render_key(analysis, columns, fingerprints, **params):
+    """
+    Construit la clé d'un rendu : analyse, colonnes (noms et empreintes du contenu) et paramètres.
+
+    :param analysis: Nom de l'analyse (ex : 'distribution')
+    :param columns: Colonnes utilisées par l'analyse
+    :param fingerprints: Dictionnaire colonne -> empreinte du contenu
+    :param params: Paramètres de l'analyse influant sur le rendu
+    """
+    parts = [analysis] + [f"{col!r}:{fingerprints[col]}" for col in columns]
+    parts += [f"{name}={params[name]!r}" for name in sorted(params)]
+    return hashlib.blake2b('|'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _sizeof(value):
+    """Estime la mémoire occupée par une valeur mise en cache (octets)."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(value.memory_usage(deep=True).sum()) if isinstance(value, pd.DataFrame) \
+            else int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_sizeof(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(item) for item in value.values())
+    return sys.getsizeof(value)
+
+
+class RenderCache:
+    """
+    Cache LRU des rendus PNG et des résultats d'analyse, borné par un budget mémoire.
+
+    Les figures ne sont jamais conservées : elles sont rastérisées puis fermées, seuls les octets PNG
+    sont mis en cache. Les valeurs renvoyées sont partagées et doivent être traitées en lecture seule.
+    """
+
+    def __init__(self, max_bytes=RENDER_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # clé -> (valeur, taille en octets)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def memory_bytes(self):
+        """Mémoire occupée par les entrées du cache (octets)."""
+        return self._bytes
+
+    def get(self, key, default=None):
+        """Renvoie la valeur associée à la clé (et la marque comme récemment utilisée), ou `default`."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value):
+        """Ajoute une valeur au cache, en évinçant les entrées les moins récemment utilisées."""
+        nbytes = _sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if nbytes <= self.max_bytes:
+                self._entries[key] = (value, nbytes)
+                self._bytes += nbytes
+            while self._bytes > self.max_bytes and self._entries:
+                self._bytes -= self._entries.popitem(last=False)[1][1]
+
+    def get_or_compute(self, key, compute):
+        """
+        Renvoie la valeur associée à la clé, en l'obtenant par `compute()` si elle est absente.
+
+        Le calcul est effectué hors du verrou : deux sessions peuvent le lancer simultanément,
+        la dernière valeur calculée est conservée.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def render(self, key, plot_func, *args, **kwargs):
+        """
+        Renvoie le PNG du graphique produit par `plot_func(*args, **kwargs)`, depuis le cache si possible.
+
+        :return: Octets PNG, ou None si la fonction de tracé ne renvoie pas de figure
+        """
+        return self.get_or_compute(key, lambda: figure_to_png(plot_func(*args, **kwargs)))
+
+    def clear(self):
+        """Vide le cache."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+_render_cache = None
+
+
+def get_render_cache():
+    """Renvoie le cache de rendus partagé par toutes les sessions du processus."""
+    global _render_cache
+    if _render_cache is None:
+        _render_cache = RenderCache()
+    return _render_cache
@@ -0,0 +1,273 @@
+# row_index.py
+# Ce module construit l'index des débuts de lignes d'un fichier CSV (positions en octets), conservé à côté
+# du fichier. Il donne le nombre exact de lignes sans analyse du fichier et un accès direct à n'importe
+# quelle ligne : navigation par pages et échantillonnage aléatoire exact ne lisant que les lignes tirées.
+import hashlib
+import io
+import json
+import logging
+import mmap
+import os
+
+import numpy as np
+import pandas as pd
+
+from src.config import ROW_INDEX_BLOCK_BYTES, ROW_INDEX_DIR
+from src.tracing import traced
+from src.working_copy import file_signature
+
+logger = logging.getLogger(__name__)
+
+_NEWLINE = ord('\n')
+_CARRIAGE_RETURN = ord('\r')
+
+
+def _as_bytes(source):
+    """
+    Contenu d'un fichier sous forme d'array d'octets, sans copie.
+
+    :param source: Chemin (fichier projeté en mémoire) ou objet en mémoire possédant `getbuffer` (BytesIO, UploadedFile)
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return np.empty(0, dtype=np.uint8)
+            # La projection reste valide après la fermeture du fichier ; elle est libérée avec l'array
+            return np.frombuffer(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), dtype=np.uint8)
+    if hasattr(source, 'getbuffer'):
+        return np.frombuffer(source.getbuffer(), dtype=np.uint8)
+    raise TypeError("L'index des lignes nécessite un chemin de fichier ou un objet en mémoire (BytesIO).")
+
+
+def _check_encoding(encoding, quotechar):
+    """Les fins de ligne et guillemets doivent être codés sur un octet (UTF-8, Latin-1, cp1252...)."""
+    if '\n'.encode(encoding) != b'\n' or len(quotechar.encode(encoding)) != 1:
+        raise ValueError(f"L'encodage '{encoding}' n'est pas compatible avec l'index des lignes.")
+
+
+def find_record_starts(data, quotechar='"', block_bytes=ROW_INDEX_BLOCK_BYTES):
+    """
+    Positions (octets) des débuts d'enregistrements d'un CSV, ligne d'en-tête comprise.
+
+    Le fichier est parcouru par blocs : un saut de ligne termine un enregistrement seulement s'il est précédé
+    d'un nombre pair de guillemets (les sauts de ligne à l'intérieur d'un champ entre guillemets sont ignorés,
+    les guillemets échappés "" ne changent pas la parité). Les lignes vides, ignorées par pandas, sont exclues.
+
+    :param data: Array d'octets (uint8) du fichier
+    :param quotechar: Caractère de citation
+    :param block_bytes: Taille des blocs parcourus
+    :return: Array int64 des positions
+    """
+    size = len(data)
+    quote = ord(quotechar)
+    parts = [np.zeros(1, dtype=np.int64)] if size else []
+    inside = 0   # parité du nombre de guillemets vus avant le bloc
+    for pos in range(0, size, block_bytes):
+        block = data[pos:pos + block_bytes]
+        newlines = np.flatnonzero(block == _NEWLINE)
+        quotes = np.flatnonzero(block == quote)
+        if len(quotes):
+            newlines = newlines[((np.searchsorted(quotes, newlines) + inside) & 1) == 0]
+            inside = (inside + len(quotes)) & 1
+        elif inside:
+            newlines = newlines[:0]
+        parts.append(newlines + (pos + 1))
+    starts = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+    starts = starts[starts < size]
+
+    # Lignes vides : l'enregistrement commence par '\n', '\r\n' ou se réduit à '\r' en fin de fichier
+    first = data[starts]
+    blank = first == _NEWLINE
+    cr = np.flatnonzero(first == _CARRIAGE_RETURN)
+    after_cr = starts[cr] + 1
+    blank[cr] = (after_cr >= size) | (data[np.minimum(after_cr, size - 1)] == _NEWLINE)
+    return starts[~blank]
+
+
+class RowIndex:
+    """
+    Index des débuts de lignes de données d'un CSV (positions en octets, uint32 si le fichier fait moins de 4 Go).
+
+    L'index ne conserve pas le contenu du fichier : les méthodes de lecture reçoivent la source (chemin ou objet
+    en mémoire), projetée en mémoire le temps de la lecture. Les lignes lues sont analysées par pandas avec
+    la ligne d'en-tête ; le DataFrame obtenu est indexé par la position des lignes dans le fichier.
+    """
+
+    def __init__(self, offsets, size, header_end):
+        self.offsets = offsets          # début de chaque ligne de données
+        self.size = int(size)           # taille du fichier indexé (octets)
+        self.header_end = int(header_end)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    @property
+    def n_rows(self):
+        """Nombre exact de lignes de données."""
+        return len(self.offsets)
+
+    @classmethod
+    @traced('RowIndex.build', measure=lambda index: {'rows': index.n_rows, 'bytes': index.size})
+    def build(cls, source, encoding='utf-8', quotechar='"', block_bytes=ROW_INDEX_BLOCK_BYTES):
+        """
+        Construit l'index d'un CSV.
+
+        :param source: Chemin ou objet en mémoire (BytesIO, UploadedFile)
+        :param encoding: Encodage du fichier (les fins de ligne doivent être codées sur un octet)
+        :param quotechar: Caractère de citation
+        :param block_bytes: Taille des blocs parcourus
+        :return: RowIndex
+        """
+        _check_encoding(encoding, quotechar)
+        data = _as_bytes(source)
+        starts = find_record_starts(data, quotechar, block_bytes)
+        dtype = np.uint32 if len(data) < 2 ** 32 else np.int64
+        header_end = starts[1] if len(starts) > 1 else len(data)
+        return cls(starts[1:].astype(dtype), len(data), header_end)
+
+    def _bounds(self, rows):
+        """Positions de début et de fin (exclue) des lignes demandées."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) and (rows.min() < 0 or rows.max() >= self.n_rows):
+            raise IndexError(f"Lignes hors de l'index (0 à {self.n_rows - 1}).")
+        starts = self.offsets[rows].astype(np.int64)
+        next_rows = rows + 1
+        ends = np.full(len(rows), self.size, dtype=np.int64)
+        inside = next_rows < self.n_rows
+        ends[inside] = self.offsets[next_rows[inside]]
+        return starts, ends
+
+    def _parse(self, data, pieces, rows, separator, encoding, read_options):
+        """Analyse l'en-tête suivi des morceaux de fichier indiqués."""
+        buffer = io.BytesIO()
+        buffer.write(data[:self.header_end].tobytes())
+        if self.header_end and data[self.header_end - 1] != _NEWLINE:
+            buffer.write(b'\n')
+        for start, end in pieces:
+            buffer.write(data[start:end].tobytes())
+            if data[end - 1] != _NEWLINE:
+                buffer.write(b'\n')   # dernière ligne du fichier sans saut de ligne final
+        buffer.seek(0)
+        df = pd.read_csv(buffer, sep=separator, encoding=encoding, **read_options)
+        if len(df) != len(rows):
+            raise ValueError("Le fichier ne correspond plus à son index : reconstruisez l'index.")
+        df.index = pd.Index(rows)
+        return df
+
+    def read_rows(self, source, start, stop, separator=',', encoding='utf-8', **read_options):
+        """
+        Lit les lignes de données `start` (incluse) à `stop` (exclue), en ne lisant que cette portion du fichier.
+
+        :param source: Chemin ou objet en mémoire indexé
+        :param read_options: Options supplémentaires de pd.read_csv (ex : dtype)
+        :return: DataFrame indexé par la position des lignes
+        """
+        start, stop = max(int(start), 0), min(int(stop), self.n_rows)
+        data = self._source_bytes(source)
+        rows = np.arange(start, max(stop, start))
+        pieces = []
+        if len(rows):
+            starts, ends = self._bounds([start, stop - 1])
+            pieces = [(starts[0], ends[1])]
+        return self._parse(data, pieces, rows, separator, encoding, read_options)
+
+    def take(self, source, rows, separator=',', encoding='utf-8', **read_options):
+        """
+        Lit les lignes de données indiquées (positions), dans l'ordre du fichier.
+
+        Les lignes consécutives sont lues d'un seul tenant.
+
+        :return: DataFrame indexé par la position des lignes
+        """
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        data = self._source_bytes(source)
+        starts, ends = self._bounds(rows)
+        # Fusion des lignes contiguës en plages
+        breaks = np.flatnonzero(starts[1:] != ends[:-1]) + 1
+        first = np.concatenate(([0], breaks)) if len(rows) else np.empty(0, dtype=np.int64)
+        last = np.concatenate((breaks - 1, [len(rows) - 1])) if len(rows) else first
+        pieces = zip(starts[first].tolist(), ends[last].tolist())
+        return self._parse(data, pieces, rows, separator, encoding, read_options)
+
+    def sample(self, source, n=None, frac=None, seed=None, separator=',', encoding='utf-8', **read_options):
+        """
+        Échantillon aléatoire simple exact (sans remise) : seules les lignes tirées sont lues.
+
+        :param n: Nombre de lignes à tirer
+        :param frac: Fraction des lignes à tirer (si n n'est pas fourni)
+        :param seed: Graine aléatoire
+        :return: DataFrame dans l'ordre du fichier
+        """
+        if n is None and frac is None:
+            raise ValueError("Il faut fournir soit 'n' soit 'frac'.")
+        size = min(int(n), self.n_rows) if n is not None else int(round(frac * self.n_rows))
+        rows = np.random.default_rng(seed).choice(self.n_rows, size=size, replace=False)
+        return self.take(source, rows, separator, encoding, **read_options)
+
+    def _source_bytes(self, source):
+        data = _as_bytes(source)
+        if len(data) != self.size:
+            raise ValueError("Le fichier ne correspond plus à son index : reconstruisez l'index.")
+        return data
+
+    def save(self, path, signature=None):
+        """
+        Enregistre l'index : positions dans un fichier .npy (relu en mémoire projetée) et métadonnées JSON.
+
+        :param path: Chemin du fichier .npy
+        :param signature: Signature du fichier indexé (voir working_copy.file_signature)
+        """
+        tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, self.offsets)
+        os.replace(tmp_path, path)
+        with open(f"{path}.json", 'w') as f:
+            json.dump({'size': self.size, 'header_end': self.header_end, 'signature': signature}, f)
+
+    @classmethod
+    def load(cls, path):
+        """Charge un index enregistré ; les positions sont projetées en mémoire (chargement immédiat)."""
+        with open(f"{path}.json") as f:
+            metadata = json.load(f)
+        index = cls(np.load(path, mmap_mode='r'), metadata['size'], metadata['header_end'])
+        return index, metadata.get('signature')
+
+
+def row_index_path(file_path, index_dir=ROW_INDEX_DIR):
+    """
+    Chemin de l'index d'un fichier : à côté du fichier, ou dans `index_dir` si son répertoire
+    n'est pas accessible en écriture.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    if os.access(directory, os.W_OK):
+        return f"{file_path}.rowidx.npy"
+    key = hashlib.blake2b(os.path.abspath(file_path).encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(index_dir, f"{key}.rowidx.npy")
+
+
+def get_row_index(file_path, encoding='utf-8', quotechar='"', index_dir=ROW_INDEX_DIR):
+    """
+    Renvoie l'index des lignes d'un fichier CSV, en réutilisant l'index enregistré s'il est à jour.
+
+    L'index est reconstruit (et enregistré) si le fichier a changé depuis sa construction.
+
+    :param file_path: Chemin du fichier CSV
+    :param encoding: Encodage du fichier
+    :param quotechar: Caractère de citation
+    :param index_dir: Répertoire de repli des index
+    :return: RowIndex
+    """
+    path = row_index_path(file_path, index_dir)
+    signature = file_signature(file_path)
+    try:
+        index, saved_signature = RowIndex.load(path)
+        if saved_signature == signature:
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+    index = RowIndex.build(file_path, encoding, quotechar)
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        index.save(path, signature)
+    except OSError as e:
+        logger.warning("Enregistrement de l'index de %s impossible : %s", file_path, e)
+    return index
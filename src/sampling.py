@@ -0,0 +1,343 @@
+# sampling.py
+# Ce module contient les moteurs d'échantillonnage en flux (out-of-core) pour les fichiers CSV
+# trop volumineux pour être chargés entièrement en mémoire.
+import io
+import math
+import numpy as np
+import pandas as pd
+
+from src.config import DEFAULT_CHUNKSIZE
+from src.tracing import traced
+
+# Taille des blocs lus depuis la fin du fichier pour la méthode 'last_n'
+TAIL_BLOCK_SIZE = 1024 * 1024
+
+
+def _rewind(source):
+    """Replace un objet fichier au début (sans effet sur un chemin)."""
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+
+def iter_csv_chunks(source, separator, encoding, chunksize, dtype=None):
+    """
+    Itère sur le CSV par blocs de `chunksize` lignes.
+
+    Chaque bloc est indexé par la position de ses lignes dans le fichier (0 = première ligne de données),
+    comme le ferait un DataFrame chargé entièrement.
+    """
+    _rewind(source)
+    offset = 0
+    with pd.read_csv(source, sep=separator, encoding=encoding, dtype=dtype, chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield chunk
+
+
+def _keep_smallest(frame, keys, k):
+    """Conserve les `k` lignes dont les clés aléatoires sont les plus petites, dans l'ordre du fichier."""
+    if len(keys) <= k:
+        return frame, keys
+    keep = np.argpartition(keys, k - 1)[:k]
+    keep.sort()
+    return frame.iloc[keep], keys[keep]
+
+
+def reservoir_sample_n(chunks, n, rng):
+    """
+    Échantillonnage aléatoire simple de `n` lignes sur un flux de blocs (reservoir sampling).
+
+    Chaque ligne reçoit une clé uniforme ; le réservoir conserve les `n` plus petites clés.
+    Une fois le réservoir plein, seules les lignes dont la clé est inférieure au seuil courant
+    sont examinées, ce qui maintient la mémoire à la taille de l'échantillon plus un bloc.
+
+    :param chunks: Itérable de DataFrames
+    :param n: Nombre de lignes à conserver
+    :param rng: Générateur numpy (np.random.Generator)
+    :return: DataFrame échantillonné (ordre du fichier)
+    """
+    reservoir, keys = None, None
+    for chunk in chunks:
+        chunk_keys = rng.random(len(chunk))
+        if reservoir is None:
+            reservoir, keys = chunk, chunk_keys
+        else:
+            if len(keys) >= n:
+                mask = chunk_keys < keys.max()
+                chunk, chunk_keys = chunk[mask], chunk_keys[mask]
+            reservoir = pd.concat([reservoir, chunk])
+            keys = np.concatenate([keys, chunk_keys])
+        reservoir, keys = _keep_smallest(reservoir, keys, n)
+    if reservoir is None:
+        return pd.DataFrame()
+    return reservoir.sort_index()
+
+
+def _frac_threshold(frac, total):
+    """
+    Seuil de pré-sélection pour un échantillonnage par fraction sur `total` lignes vues.
+
+    Le seuil décroît avec le nombre de lignes vues et reste, avec une probabilité écrasante,
+    au-dessus de la clé de rang round(frac * N) en fin de lecture.
+    """
+    if total == 0:
+        return 1.0
+    return min(1.0, frac + 6 * math.sqrt(frac * (1 - frac) / total) + 1.0 / total)
+
+
+def reservoir_sample_frac(chunks, frac, rng):
+    """
+    Échantillonnage aléatoire simple d'une fraction `frac` des lignes sur un flux de blocs.
+
+    Le nombre total de lignes étant inconnu à l'avance, on conserve les lignes dont la clé
+    est sous un seuil adaptatif, puis on garde exactement round(frac * N) lignes en fin de lecture
+    (même taille que DataFrame.sample(frac=...)).
+
+    :param chunks: Itérable de DataFrames
+    :param frac: Fraction de lignes à conserver (entre 0 et 1)
+    :param rng: Générateur numpy (np.random.Generator)
+    :return: DataFrame échantillonné (ordre du fichier)
+    """
+    if not 0 <= frac <= 1:
+        raise ValueError("La fraction doit être comprise entre 0 et 1.")
+    candidates, keys = None, None
+    total = 0
+    for chunk in chunks:
+        total += len(chunk)
+        threshold = _frac_threshold(frac, total)
+        chunk_keys = rng.random(len(chunk))
+        mask = chunk_keys < threshold
+        if candidates is None:
+            candidates, keys = chunk[mask], chunk_keys[mask]
+        else:
+            still_in = keys < threshold
+            candidates = pd.concat([candidates[still_in], chunk[mask]])
+            keys = np.concatenate([keys[still_in], chunk_keys[mask]])
+    if candidates is None:
+        return pd.DataFrame()
+    k = int(round(frac * total))
+    if k == 0:
+        return candidates.iloc[:0]
+    candidates, _ = _keep_smallest(candidates, keys, k)
+    return candidates.sort_index()
+
+
+def read_last_rows(source, n, separator=',', encoding='utf-8', block_size=TAIL_BLOCK_SIZE):
+    """
+    Lit les `n` dernières lignes d'un CSV en remontant depuis la fin du fichier.
+
+    Seuls l'en-tête et les derniers blocs nécessaires sont lus. Les champs entre guillemets
+    contenant des retours à la ligne ne sont pas pris en charge par cette méthode.
+
+    :param source: Chemin du fichier (str) ou objet fichier binaire positionnable
+    :param n: Nombre de lignes à lire
+    :param separator: Séparateur CSV
+    :param encoding: Encodage du fichier
+    :param block_size: Taille des blocs lus à rebours (octets)
+    :return: DataFrame des `n` dernières lignes (index 0..n-1)
+    """
+    handle = open(source, 'rb') if isinstance(source, str) else source
+    try:
+        handle.seek(0)
+        header = handle.readline()
+        header_end = handle.tell()
+        handle.seek(0, io.SEEK_END)
+        pos = handle.tell()
+        data = b''
+        while pos > header_end:
+            size = min(block_size, pos - header_end)
+            pos -= size
+            handle.seek(pos)
+            data = handle.read(size) + data
+            # n lignes complètes = n séparateurs de ligne avant la fin (hors saut de ligne final)
+            if data.rstrip(b'\r\n').count(b'\n') >= n:
+                break
+        data = data.rstrip(b'\r\n')
+        if data.count(b'\n') >= n:
+            cut = len(data)
+            for _ in range(n):
+                cut = data.rindex(b'\n', 0, cut)
+            data = data[cut + 1:]
+    finally:
+        if isinstance(source, str):
+            handle.close()
+    if not header.endswith(b'\n'):
+        header += b'\n'
+    return pd.read_csv(io.BytesIO(header + data), sep=separator, encoding=encoding)
+
+
+def sample_csv(source, method, n=None, frac=None, separator=',', encoding='utf-8', seed=None,
+               chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Échantillonne un fichier CSV sans le charger entièrement en mémoire.
+
+    :param source: Chemin du fichier (str) ou objet fichier (ex: UploadedFile)
+    :param method: Méthode d'échantillonnage ('random_total', 'first_n', 'last_n')
+    :param n: Nombre de lignes à échantillonner (si applicable)
+    :param frac: Fraction de lignes à échantillonner (si applicable)
+    :param separator: Séparateur CSV
+    :param encoding: Encodage du fichier
+    :param seed: Graine aléatoire pour des résultats reproductibles
+    :param chunksize: Nombre de lignes lues par bloc
+    :return: DataFrame échantillonné
+    """
+    if method == 'random_total':
+        rng = np.random.default_rng(seed)
+        chunks = iter_csv_chunks(source, separator, encoding, chunksize)
+        return reservoir_sample_n(chunks, n, rng) if n else reservoir_sample_frac(chunks, frac, rng)
+    elif method == 'first_n':
+        _rewind(source)
+        return pd.read_csv(source, sep=separator, encoding=encoding, nrows=n)
+    elif method == 'last_n':
+        return read_last_rows(source, n, separator=separator, encoding=encoding)
+    else:
+        raise ValueError("Méthode d'échantillonnage non supportée.")
+
+
+def _water_fill(counts, total):
+    """
+    Répartition égalitaire de `total` lignes entre strates plafonnées par leur effectif.
+
+    Les strates trop petites sont prises en entier, le reste est partagé à parts égales entre les autres.
+    """
+    order = np.argsort(counts, kind='stable')
+    sorted_counts = counts[order]
+    k = len(counts)
+    # Volume alloué si le niveau commun est fixé à l'effectif de chaque strate
+    before = np.concatenate([[0], np.cumsum(sorted_counts)[:-1]])
+    filled = before + sorted_counts * (k - np.arange(k))
+    i = int(np.searchsorted(filled, total))
+    alloc_sorted = sorted_counts.copy()
+    if i < k:
+        remaining = total - before[i]
+        level, extra = divmod(int(remaining), k - i)
+        alloc_sorted[i:] = level
+        alloc_sorted[i:i + extra] += 1
+    alloc = np.empty_like(alloc_sorted)
+    alloc[order] = alloc_sorted
+    return alloc
+
+
+def allocate_strata(counts, total, allocation='proportional', min_per_stratum=1):
+    """
+    Calcule le nombre de lignes à tirer dans chaque strate (calcul vectorisé).
+
+    :param counts: Effectifs de chaque strate (array d'entiers)
+    :param total: Taille d'échantillon visée
+    :param allocation: 'proportional' (proportionnelle aux effectifs) ou 'equal' (parts égales)
+    :param min_per_stratum: Nombre minimum de lignes par strate (dans la limite de son effectif)
+    :return: Array d'entiers, une allocation par strate
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    total = min(int(total), int(counts.sum()))
+    if allocation == 'proportional':
+        raw = counts * total / counts.sum()
+        alloc = np.floor(raw).astype(np.int64)
+        # Méthode du plus fort reste pour atteindre exactement `total`
+        missing = total - alloc.sum()
+        if missing > 0:
+            alloc[np.argsort(alloc - raw, kind='stable')[:missing]] += 1
+    elif allocation == 'equal':
+        alloc = _water_fill(counts, total)
+    else:
+        raise ValueError("Allocation non supportée. Utilisez 'proportional' ou 'equal'.")
+    alloc = np.maximum(alloc, np.minimum(min_per_stratum, counts))
+    return np.minimum(alloc, counts)
+
+
+def _select_in_strata(frame, strata, keys, alloc):
+    """
+    Conserve dans chaque strate les lignes de plus petites clés, dans la limite de son allocation.
+
+    :param frame: DataFrame candidat
+    :param strata: Colonnes définissant les strates
+    :param keys: Clés aléatoires des lignes
+    :param alloc: Allocation de la strate de chaque ligne (array aligné sur `frame`)
+    :return: Tuple (DataFrame, clés, allocations) restreints aux lignes retenues
+    """
+    codes = frame.groupby(strata, dropna=False, sort=False).ngroup().to_numpy()
+    order = np.lexsort((keys, codes))
+    sorted_codes = codes[order]
+    starts = np.searchsorted(sorted_codes, sorted_codes, side='left')
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order)) - starts
+    mask = rank < alloc
+    return frame[mask], keys[mask], alloc[mask]
+
+
+def _strata_report(population, sample, strata):
+    """Construit le tableau des effectifs par strate (population vs échantillon)."""
+    report = population.merge(
+        sample[strata].value_counts(dropna=False).rename('echantillon').reset_index(),
+        on=strata, how='left'
+    )
+    report['echantillon'] = report['echantillon'].fillna(0).astype(np.int64)
+    report['part_population'] = report['population'] / report['population'].sum()
+    report['part_echantillon'] = report['echantillon'] / max(report['echantillon'].sum(), 1)
+    return report.sort_values('population', ascending=False, ignore_index=True)
+
+
+@traced('stratified_sample')
+def stratified_sample(data, strata, n=None, frac=None, allocation='proportional', min_per_stratum=1, seed=None,
+                      separator=',', encoding='utf-8', chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Échantillonnage aléatoire stratifié sur une ou plusieurs colonnes clés.
+
+    Sur un fichier CSV, le traitement se fait en deux passes par blocs : comptage des effectifs par strate,
+    puis sélection par réservoir dans chaque strate. La mémoire reste bornée par la taille de l'échantillon.
+    Dans ce mode, les colonnes de strate sont lues comme du texte pour garantir des clés identiques entre blocs.
+
+    :param data: DataFrame, ou chemin/objet fichier CSV
+    :param strata: Nom ou liste des colonnes définissant les strates
+    :param n: Taille d'échantillon visée (si applicable)
+    :param frac: Fraction de lignes à échantillonner (si applicable)
+    :param allocation: 'proportional' ou 'equal'
+    :param min_per_stratum: Nombre minimum de lignes conservées par strate
+    :param seed: Graine aléatoire pour des résultats reproductibles
+    :param separator: Séparateur CSV (mode fichier uniquement)
+    :param encoding: Encodage du fichier (mode fichier uniquement)
+    :param chunksize: Nombre de lignes lues par bloc (mode fichier uniquement)
+    :return: Tuple (DataFrame échantillonné, DataFrame des effectifs par strate)
+    """
+    strata = [strata] if isinstance(strata, str) else list(strata)
+    rng = np.random.default_rng(seed)
+
+    if isinstance(data, pd.DataFrame):
+        population = data[strata].value_counts(dropna=False, sort=False).rename('population').reset_index()
+        chunks = [data]
+    else:
+        dtype = {col: str for col in strata}
+        # Passe 1 : comptage des effectifs par strate
+        counts = None
+        _rewind(data)
+        with pd.read_csv(data, sep=separator, encoding=encoding, usecols=strata, dtype=dtype,
+                         chunksize=chunksize) as reader:
+            for chunk in reader:
+                chunk_counts = chunk.value_counts(dropna=False, sort=False).rename('population').reset_index()
+                if counts is not None:
+                    chunk_counts = pd.concat([counts, chunk_counts]).groupby(
+                        strata, dropna=False, sort=False)['population'].sum().reset_index()
+                counts = chunk_counts
+        population = counts
+        chunks = iter_csv_chunks(data, separator, encoding, chunksize, dtype=dtype)
+
+    total = n if n else int(round(frac * population['population'].sum()))
+    population['allocation'] = allocate_strata(population['population'].to_numpy(), total,
+                                               allocation=allocation, min_per_stratum=min_per_stratum)
+
+    # Passe 2 : sélection par réservoir dans chaque strate
+    selected, keys, alloc = None, None, None
+    for chunk in chunks:
+        chunk_alloc = chunk[strata].merge(population[strata + ['allocation']], on=strata, how='left')['allocation']
+        chunk_alloc = chunk_alloc.fillna(0).to_numpy(dtype=np.int64)
+        chunk_keys = rng.random(len(chunk))
+        if selected is not None:
+            chunk = pd.concat([selected, chunk])
+            chunk_keys = np.concatenate([keys, chunk_keys])
+            chunk_alloc = np.concatenate([alloc, chunk_alloc])
+        selected, keys, alloc = _select_in_strata(chunk, strata, chunk_keys, chunk_alloc)
+
+    sample = selected.sort_index()
+    return sample, _strata_report(population.drop(columns='allocation'), sample, strata)
+
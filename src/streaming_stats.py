@@ -0,0 +1,242 @@
+# streaming_stats.py
+# Ce module calcule les statistiques descriptives en une seule passe par blocs, sans charger le fichier.
+# Les états partiels (moments, t-digest) sont fusionnables : des blocs peuvent être traités en parallèle.
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.config import DEFAULT_CHUNKSIZE
+from src.tracing import traced
+
+# Compression du t-digest : plus elle est élevée, plus les quantiles sont précis (et l'état volumineux)
+DEFAULT_COMPRESSION = 200
+
+
+class TDigest:
+    """
+    Esquisse t-digest fusionnable pour l'estimation des quantiles.
+
+    La compression est vectorisée : les centroïdes triés sont regroupés par tranche unitaire de la
+    fonction d'échelle k1 (arc sinus), ce qui garde des centroïdes fins dans les queues de distribution.
+    """
+
+    def __init__(self, compression=DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = np.inf
+        self.max = -np.inf
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def update(self, values):
+        """Ajoute un lot de valeurs (les NaN sont ignorés)."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress(np.concatenate([self.means, values]),
+                       np.concatenate([self.weights, np.ones(values.size)]))
+        return self
+
+    def merge(self, other):
+        """Fusionne un autre t-digest dans celui-ci."""
+        if other.weights.size:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress(np.concatenate([self.means, other.means]),
+                           np.concatenate([self.weights, other.weights]))
+        return self
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        if means.size <= 5 * self.compression:
+            # Tant que l'état reste petit, on conserve les points tels quels (quantiles quasi exacts)
+            self.means, self.weights = means, weights
+            return
+        total = weights.sum()
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / total
+        k = self.compression / (2 * math.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1))
+        bucket = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.concatenate([[True], bucket[1:] != bucket[:-1]]))
+        merged_weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / merged_weights
+        self.weights = merged_weights
+
+    def quantile(self, q):
+        """Estime le(s) quantile(s) `q` (entre 0 et 1)."""
+        if self.weights.size == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [total]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(np.asarray(q, dtype=np.float64) * total, positions, values)
+
+
+class Moments:
+    """Effectif, moyenne, somme des carrés des écarts (M2), min et max, fusionnables (Welford / Chan)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        """Ajoute un lot de valeurs (les NaN sont ignorés)."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        batch = Moments()
+        batch.count = values.size
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        return self.merge(batch)
+
+    def merge(self, other):
+        """Fusionne les moments d'un autre état (formule parallèle de Chan)."""
+        if other.count == 0:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def std(self):
+        """Écart-type corrigé (ddof=1), comme DataFrame.describe()."""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+
+class StreamingDescriber:
+    """
+    Accumulateur de statistiques descriptives colonne par colonne.
+
+    Les colonnes suivies sont les colonnes numériques du premier bloc ; dans les blocs suivants,
+    les valeurs non numériques de ces colonnes sont ignorées.
+    """
+
+    def __init__(self, compression=DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.columns = None
+        self.moments = {}
+        self.digests = {}
+
+    def init_columns(self, columns):
+        """Fixe les colonnes suivies et initialise leurs états."""
+        self.columns = list(columns)
+        self.moments = {col: Moments() for col in self.columns}
+        self.digests = {col: TDigest(self.compression) for col in self.columns}
+        return self
+
+    def update(self, chunk):
+        """Ajoute un bloc de lignes (DataFrame)."""
+        if self.columns is None:
+            self.init_columns(chunk.select_dtypes(include='number').columns)
+        for col in self.columns:
+            values = pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+            self.moments[col].update(values)
+            self.digests[col].update(values)
+        return self
+
+    def merge(self, other):
+        """Fusionne l'état d'un autre accumulateur (ex : calculé sur d'autres blocs, en parallèle)."""
+        if other.columns is None:
+            return self
+        if self.columns is None:
+            self.init_columns(other.columns)
+        for col in self.columns:
+            if col in other.moments:
+                self.moments[col].merge(other.moments[col])
+                self.digests[col].merge(other.digests[col])
+        return self
+
+    def result(self, percentiles=(0.25, 0.5, 0.75)):
+        """Renvoie un DataFrame de même forme que DataFrame.describe()."""
+        index = ['count', 'mean', 'std', 'min'] + [f"{p * 100:g}%" for p in percentiles] + ['max']
+        data = {}
+        for col in self.columns or []:
+            moments = self.moments[col]
+            empty = moments.count == 0
+            quantiles = self.digests[col].quantile(list(percentiles))
+            data[col] = [float(moments.count),
+                         np.nan if empty else moments.mean,
+                         moments.std,
+                         np.nan if empty else moments.min,
+                         *quantiles,
+                         np.nan if empty else moments.max]
+        return pd.DataFrame(data, index=index)
+
+
+def _describe_chunk(chunk, columns, compression):
+    """État partiel calculé sur un seul bloc (exécuté dans un thread de travail)."""
+    return StreamingDescriber(compression).init_columns(columns).update(chunk)
+
+
+@traced('streaming_describe', result_rows=False)
+def streaming_describe(source, separator=',', encoding='utf-8', chunksize=DEFAULT_CHUNKSIZE, usecols=None,
+                       workers=1, compression=DEFAULT_COMPRESSION, percentiles=(0.25, 0.5, 0.75)):
+    """
+    Statistiques descriptives (équivalent de describe()) calculées par blocs sur un CSV ou un DataFrame.
+
+    Les quantiles sont approchés par un t-digest ; effectif, moyenne, écart-type, min et max sont exacts.
+
+    :param source: Chemin/objet fichier CSV, ou DataFrame déjà chargé
+    :param separator: Séparateur CSV
+    :param encoding: Encodage du fichier
+    :param chunksize: Nombre de lignes par bloc
+    :param usecols: Colonnes à lire (toutes par défaut)
+    :param workers: Nombre de threads traitant les blocs en parallèle
+    :param compression: Compression du t-digest
+    :param percentiles: Quantiles à estimer
+    :return: DataFrame de même forme que DataFrame.describe()
+    """
+    reader = None
+    if isinstance(source, pd.DataFrame):
+        frame = source if usecols is None else source[usecols]
+        chunks = (frame.iloc[start:start + chunksize] for start in range(0, len(frame), chunksize))
+    else:
+        if hasattr(source, 'seek'):
+            source.seek(0)
+        reader = pd.read_csv(source, sep=separator, encoding=encoding, usecols=usecols, chunksize=chunksize)
+        chunks = iter(reader)
+
+    describer = StreamingDescriber(compression)
+    try:
+        first = next(chunks, None)
+        if first is not None:
+            describer.update(first)
+        if workers <= 1:
+            for chunk in chunks:
+                describer.update(chunk)
+        else:
+            # Fenêtre bornée de blocs en cours de traitement pour limiter la mémoire
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending = []
+                for chunk in chunks:
+                    pending.append(executor.submit(_describe_chunk, chunk, describer.columns, compression))
+                    if len(pending) >= 2 * workers:
+                        describer.merge(pending.pop(0).result())
+                for future in pending:
+                    describer.merge(future.result())
+    finally:
+        if reader is not None:
+            reader.close()
+    return describer.result(percentiles)
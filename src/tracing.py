@@ -0,0 +1,262 @@
+# tracing.py
+# Ce module instrumente les opérations coûteuses (chargement, prévisualisation, profilage, analyses EDA+,
+# traitements, exports). Chaque opération produit un « span » : durée réelle, temps CPU, lignes et octets
+# traités, pic mémoire (tracemalloc, facultatif). Les spans sont écrits en JSON Lines et conservés en mémoire
+# pour le panneau de la barre latérale. Sans enregistreur actif, un span se réduit à la lecture d'une
+# variable de contexte.
+import contextvars
+import functools
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+import pandas as pd
+
+from src.config import TRACE_FILE, TRACE_MAX_BYTES, TRACE_MAX_SPANS
+
+logger = logging.getLogger(__name__)
+
+# Enregistreur actif du thread courant (None : instrumentation désactivée) et span englobant
+_recorder = contextvars.ContextVar('span_recorder', default=None)
+_current = contextvars.ContextVar('current_span', default=None)
+
+_sequence = itertools.count()
+_file_lock = threading.Lock()
+
+
+class _NullSpan:
+    """Span renvoyé lorsque l'instrumentation est désactivée : les mesures transmises sont ignorées."""
+    __slots__ = ()
+
+    def set(self, **values):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """Opération en cours de mesure ; `set()` ajoute des mesures (rows, bytes) ou des attributs."""
+    __slots__ = ('name', 'attrs', 'parent', 'depth', 'seq', 'base', 'peak')
+
+    def __init__(self, name, attrs, parent):
+        self.name = name
+        self.attrs = attrs
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.seq = next(_sequence)
+        self.base = self.peak = 0
+
+    def set(self, **values):
+        self.attrs.update(values)
+
+
+class SpanRecorder:
+    """
+    Enregistreur des spans d'une session.
+
+    Les spans sont numérotés par exécution (`new_run()`, appelé à chaque exécution du script Streamlit),
+    ajoutés au fichier JSON Lines `path` (None : pas de fichier) et les `max_spans` derniers sont gardés en mémoire.
+    Au-delà de `max_bytes`, le fichier est renommé en `path.1` (remplaçant le précédent) et un nouveau est commencé.
+    Avec `memory=True`, le pic mémoire de chaque span est mesuré par tracemalloc, qui ralentit les
+    opérations et suit tout le processus : les pics sont approximatifs si plusieurs sessions mesurent en même temps.
+    """
+
+    def __init__(self, path=TRACE_FILE, memory=False, max_spans=TRACE_MAX_SPANS, session=None,
+                 max_bytes=TRACE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.memory = memory
+        self.session = session or uuid.uuid4().hex[:8]
+        self.run = 0
+        self.spans = deque(maxlen=max_spans)
+
+    def new_run(self):
+        self.run += 1
+
+    def add(self, record):
+        """Ajoute un span terminé (dictionnaire) au fichier et à la mémoire."""
+        record = {'session': self.session, 'run': self.run, **record}
+        self.spans.append(record)
+        if self.path:
+            try:
+                line = json.dumps(record, ensure_ascii=False, default=str)
+                with _file_lock:
+                    self._rotate(len(line.encode('utf-8')) + 1)
+                    with open(self.path, 'a', encoding='utf-8') as f:
+                        f.write(line + '\n')
+            except OSError as e:
+                logger.error("Écriture des traces dans %s impossible : %s", self.path, e)
+
+    def _rotate(self, incoming):
+        """Renomme le fichier de traces s'il dépasserait `max_bytes` (appelé sous `_file_lock`)."""
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            return
+        if size and size + incoming > self.max_bytes:
+            os.replace(self.path, f"{self.path}.1")
+
+    def last_run(self):
+        """Spans de la dernière exécution ayant produit des mesures, dans l'ordre de démarrage."""
+        if not self.spans:
+            return []
+        run = self.spans[-1]['run']
+        return sorted((s for s in self.spans if s['run'] == run), key=lambda s: s['seq'])
+
+
+def activate(recorder):
+    """Active `recorder` (ou désactive l'instrumentation avec None) pour le thread courant."""
+    _recorder.set(recorder)
+    _current.set(None)
+
+
+def active_recorder():
+    return _recorder.get()
+
+
+@contextmanager
+def span(name, **attrs):
+    """
+    Mesure le bloc de code : durée réelle, temps CPU du processus, pic mémoire et mesures transmises
+    par `set()` (ex : `s.set(rows=len(df))`).
+
+    Les spans imbriqués sont reliés à leur parent. Une exception est enregistrée dans 'status' puis propagée.
+
+    :param name: Nom de l'opération
+    :param attrs: Attributs enregistrés avec le span (rows, bytes, paramètres...)
+    :return: Context manager renvoyant le Span (ou un span nul si l'instrumentation est désactivée)
+    """
+    recorder = _recorder.get()
+    if recorder is None:
+        yield _NULL_SPAN
+        return
+    parent = _current.get()
+    current = Span(name, attrs, parent)
+    token = _current.set(current)
+    started_tracing = False
+    if recorder.memory:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        size, peak = tracemalloc.get_traced_memory()
+        if parent is not None:
+            parent.peak = max(parent.peak, peak)  # le pic du parent est conservé avant la remise à zéro
+        tracemalloc.reset_peak()
+        current.base = current.peak = size
+    start = time.time()
+    start_wall, start_cpu = time.perf_counter(), time.process_time()
+    status = 'ok'
+    try:
+        yield current
+    except BaseException as e:
+        status = type(e).__name__
+        raise
+    finally:
+        wall, cpu = time.perf_counter() - start_wall, time.process_time() - start_cpu
+        peak_mb = None
+        if recorder.memory and tracemalloc.is_tracing():
+            current.peak = max(current.peak, tracemalloc.get_traced_memory()[1])
+            peak_mb = round((current.peak - current.base) / 1024 ** 2, 3)
+            if parent is not None:
+                parent.peak = max(parent.peak, current.peak)
+            if started_tracing:
+                tracemalloc.stop()
+        _current.reset(token)
+        attrs = dict(current.attrs)
+        recorder.add({
+            'seq': current.seq,
+            'name': name,
+            'parent': parent.name if parent is not None else None,
+            'depth': current.depth,
+            'start': round(start, 6),
+            'wall_s': round(wall, 6),
+            'cpu_s': round(cpu, 6),
+            'rows': attrs.pop('rows', None),
+            'bytes': attrs.pop('bytes', None),
+            'peak_mb': peak_mb,
+            'status': status,
+            'attrs': attrs,
+        })
+
+
+def adopt_spans(spans):
+    """
+    Enregistre des spans mesurés dans un autre processus (ex : analyses de l'EDA+ exécutées dans un pool),
+    rattachés au span courant.
+    """
+    recorder = _recorder.get()
+    if recorder is None:
+        return
+    parent = _current.get()
+    offset = 0 if parent is None else parent.depth + 1
+    for record in sorted(spans, key=lambda s: s['seq']):
+        record = {key: value for key, value in record.items() if key not in ('session', 'run')}
+        record.update(seq=next(_sequence), depth=record['depth'] + offset)
+        if record['parent'] is None and parent is not None:
+            record['parent'] = parent.name
+        recorder.add(record)
+
+
+def data_size(obj):
+    """
+    Lignes et octets d'un objet traité, sans parcours des données : taille du fichier pour un chemin,
+    nombre de lignes et mémoire superficielle (hors contenu des chaînes) pour un DataFrame.
+    """
+    if isinstance(obj, pd.DataFrame):
+        return {'rows': len(obj), 'bytes': int(obj.memory_usage(index=False, deep=False).sum())}
+    if isinstance(obj, (str, os.PathLike)) and os.path.isfile(obj):
+        return {'bytes': os.path.getsize(obj)}
+    return {}
+
+
+def traced(name=None, measure=None, result_rows=True):
+    """
+    Décorateur instrumentant une fonction par un span.
+
+    Par défaut, les lignes et octets sont ceux du premier argument (fichier ou DataFrame, voir data_size) ;
+    pour un fichier, le nombre de lignes est celui du résultat s'il s'agit d'un DataFrame (ou d'un tuple
+    commençant par un DataFrame).
+
+    :param name: Nom du span (nom qualifié de la fonction par défaut)
+    :param measure: Fonction(résultat) -> dictionnaire de mesures complétant ou remplaçant les mesures par défaut
+    :param result_rows: False si le résultat n'a pas une ligne par ligne traitée (ex : tableau de statistiques)
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _recorder.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name, **(data_size(args[0]) if args else {})) as current:
+                result = func(*args, **kwargs)
+                frame = result[0] if isinstance(result, tuple) and result else result
+                if result_rows and 'rows' not in current.attrs and isinstance(frame, pd.DataFrame):
+                    current.set(rows=len(frame))
+                if measure is not None:
+                    current.set(**measure(result))
+                return result
+        return wrapper
+    return decorator
+
+
+def spans_to_frame(spans):
+    """Tableau de synthèse des spans (opérations imbriquées indentées) pour l'affichage."""
+    return pd.DataFrame({
+        'Opération': ['  ' * s['depth'] + s['name'] for s in spans],
+        'Durée (s)': [s['wall_s'] for s in spans],
+        'CPU (s)': [s['cpu_s'] for s in spans],
+        'Lignes': pd.array([s['rows'] for s in spans], dtype='Int64'),
+        'Octets': pd.array([s['bytes'] for s in spans], dtype='Int64'),
+        'Pic mémoire (Mo)': pd.array([s['peak_mb'] for s in spans], dtype='Float64'),
+        'Statut': [s['status'] for s in spans],
+    })
@@ -1,38 +1,441 @@
 # treatments.py
+import numpy as np
 import pandas as pd
 
-def rename_columns(df, new_names):
+from src.config import DEFAULT_CHUNKSIZE
+from src.sampling import iter_csv_chunks
+from src.streaming_stats import Moments, TDigest
+from src.tracing import data_size, span, traced
+
+@traced('rename_columns')
+def rename_columns(df, new_names, profile=None):
     """
     Renomme les colonnes d'un DataFrame selon le dictionnaire fourni.
     
     :param df: DataFrame original
     :param new_names: Dictionnaire de mapping {ancien_nom: nouveau_nom}
+    :param profile: DatasetProfile à tenir à jour (optionnel), les statistiques suivent les nouveaux noms
     :return: DataFrame avec les colonnes renommées
     """
+    if profile is not None:
+        profile.rename(new_names)
     return df.rename(columns=new_names)
 
-def fill_missing_values(df, columns, method, custom_value=None):
+# Méthodes de remplissage disponibles (les méthodes "group_*" nécessitent des colonnes de regroupement)
+FILL_METHODS = ["0", "mean", "median", "ffill", "bfill", "custom",
+                "group_mean", "group_median", "group_ffill", "group_bfill", "interpolate"]
+
+def _require_numeric(block, method):
+    """Vérifie que les colonnes à remplir sont numériques (moyenne, médiane, interpolation)."""
+    invalid = [col for col in block.columns if not pd.api.types.is_numeric_dtype(block[col])]
+    if invalid:
+        raise ValueError(f"La méthode '{method}' ne s'applique qu'aux colonnes numériques : {', '.join(map(str, invalid))}")
+
+def _interpolate(block, order):
+    """
+    Interpolation linéaire des valeurs manquantes.
+
+    :param order: Série donnant l'ordre (et l'espacement) des lignes, ex : une colonne de dates ;
+                  None pour interpoler selon l'ordre des lignes
+    """
+    if order is None:
+        return block.interpolate(method='linear')
+    positions = np.argsort(order.to_numpy(), kind='stable')
+    ordered = block.iloc[positions]
+    ordered.index = pd.Index(order.iloc[positions].to_numpy())
+    # L'espacement réel entre les valeurs de `order` pondère l'interpolation
+    ordered = ordered.interpolate(method='index')
+    restored = ordered.iloc[np.argsort(positions, kind='stable')]
+    restored.index = block.index
+    return restored
+
+@traced('fill_missing_values')
+def fill_missing_values(df, columns, method, custom_value=None, profile=None, group_by=None, order_by=None):
     """
     Remplit les valeurs nulles dans les colonnes sélectionnées avec la méthode choisie.
-    
+
+    Le DataFrame d'origine n'est pas copié : seules les colonnes traitées sont matérialisées
+    (copie superficielle puis remplacement des colonnes), et chaque méthode est appliquée à toutes
+    les colonnes sélectionnées en un seul appel vectorisé.
+
     :param df: DataFrame original
     :param columns: Liste des colonnes à traiter
-    :param method: Méthode de remplissage. Options : "0", "mean", "median", "ffill", "bfill", "custom"
+    :param method: Méthode de remplissage. Options : "0", "mean", "median", "ffill", "bfill", "custom",
+                   "group_mean", "group_median", "group_ffill", "group_bfill" (par groupe de `group_by`),
+                   "interpolate" (interpolation linéaire, selon l'ordre de `order_by` s'il est fourni)
     :param custom_value: Valeur personnalisée à utiliser si method == "custom"
+    :param profile: DatasetProfile à tenir à jour (optionnel), seules les colonnes traitées sont marquées modifiées
+    :param group_by: Colonne(s) de regroupement pour les méthodes "group_*"
+    :param order_by: Colonne d'ordre (ex : date) pour la méthode "interpolate"
     :return: DataFrame modifié avec les valeurs nulles remplies
     """
-    df_filled = df.copy()
+    if method not in FILL_METHODS:
+        raise ValueError(f"Méthode de remplissage non supportée : {method}")
+    columns = list(columns)
+    block = df[columns]
+    if method == "0":
+        filled = block.fillna(0)
+    elif method == "mean":
+        _require_numeric(block, method)
+        filled = block.fillna(block.mean())
+    elif method == "median":
+        _require_numeric(block, method)
+        filled = block.fillna(block.median())
+    elif method == "ffill":
+        filled = block.ffill()
+    elif method == "bfill":
+        filled = block.bfill()
+    elif method == "custom":
+        filled = block.fillna(custom_value)
+    elif method == "interpolate":
+        _require_numeric(block, method)
+        filled = _interpolate(block, df[order_by] if order_by is not None else None)
+    else:
+        if not group_by:
+            raise ValueError(f"La méthode '{method}' nécessite au moins une colonne de regroupement.")
+        keys = [group_by] if isinstance(group_by, str) else list(group_by)
+        grouped = block.groupby([df[key] for key in keys], sort=False, observed=True)
+        if method in ("group_mean", "group_median"):
+            _require_numeric(block, method)
+            filled = block.fillna(grouped.transform(method.split('_')[1]))
+        elif method == "group_ffill":
+            filled = grouped.ffill()
+        else:
+            filled = grouped.bfill()
+
+    if profile is not None:
+        profile.mark_dirty(columns)
+    df_filled = df.copy(deep=False)
     for col in columns:
-        if method == "0":
-            df_filled[col] = df_filled[col].fillna(0)
-        elif method == "mean":
-            df_filled[col] = df_filled[col].fillna(df_filled[col].mean())
-        elif method == "median":
-            df_filled[col] = df_filled[col].fillna(df_filled[col].median())
-        elif method == "ffill":
-            df_filled[col] = df_filled[col].fillna(method="ffill")
-        elif method == "bfill":
-            df_filled[col] = df_filled[col].fillna(method="bfill")
-        elif method == "custom":
-            df_filled[col] = df_filled[col].fillna(custom_value)
+        df_filled[col] = filled[col]
     return df_filled
+
+# ------------------ Chaîne de traitements en flux ------------------
+
+# Méthodes de remplissage utilisables en flux (l'interpolation et le report arrière par groupe
+# nécessiteraient de conserver des lignes en attente)
+PIPELINE_FILL_METHODS = [m for m in FILL_METHODS if m not in ("interpolate", "group_bfill")]
+
+# Méthodes d'échantillonnage utilisables en flux
+PIPELINE_SAMPLE_METHODS = ["first_n", "last_n", "random_total"]
+
+def _group_by(chunk, keys):
+    """Clés de regroupement d'un bloc (une série seule pour une clé, afin d'obtenir des groupes scalaires)."""
+    return chunk[keys[0]] if len(keys) == 1 else [chunk[key] for key in keys]
+
+def _group_index(chunk, keys):
+    """Index des groupes de chaque ligne, aligné sur les tables de statistiques par groupe."""
+    if len(keys) == 1:
+        return pd.Index(chunk[keys[0]])
+    return pd.MultiIndex.from_frame(chunk[keys])
+
+class _StatelessStep:
+    """Étape sans état : la pré-lecture applique simplement la transformation au bloc."""
+    needs_prepass = False
+
+    def reset(self):
+        pass
+
+    def collect(self, chunk):
+        return self.apply(chunk)
+
+    def finish_collect(self):
+        pass
+
+class _RenameStep(_StatelessStep):
+    def __init__(self, new_names):
+        self.new_names = dict(new_names)
+
+    def apply(self, chunk):
+        return chunk.rename(columns=self.new_names)
+
+class _SelectStep(_StatelessStep):
+    def __init__(self, columns):
+        self.columns = list(columns)
+
+    def apply(self, chunk):
+        return chunk[self.columns]
+
+class _FillStep:
+    """Remplissage en flux : statistiques issues de la pré-lecture, reports (ffill/bfill) entre blocs."""
+
+    def __init__(self, columns, method, custom_value=None, group_by=None):
+        if method not in PIPELINE_FILL_METHODS:
+            raise ValueError(f"La méthode '{method}' n'est pas disponible dans une chaîne de traitements en flux.")
+        if method.startswith("group_") and not group_by:
+            raise ValueError(f"La méthode '{method}' nécessite au moins une colonne de regroupement.")
+        self.columns = list(columns)
+        self.method = method
+        self.custom_value = custom_value
+        self.keys = [group_by] if isinstance(group_by, str) else list(group_by or [])
+        self.needs_prepass = method in ("mean", "median", "bfill", "group_mean", "group_median")
+        self.reset()
+
+    def reset(self):
+        self.moments = {col: Moments() for col in self.columns}
+        self.digests = {}           # colonne ou (groupe, colonne) -> TDigest
+        self.sums = None            # sommes et effectifs par groupe (group_mean)
+        self.firsts = []            # première valeur renseignée de chaque bloc (bfill)
+        self.fill_values = None
+        self.carry = None           # dernières valeurs renseignées (ffill, group_ffill)
+        self.chunk_index = 0
+
+    def collect(self, chunk):
+        """Pré-lecture : accumule les statistiques sur les valeurs d'origine, sans modifier le bloc."""
+        block = chunk[self.columns]
+        if self.method in ("mean", "median", "group_mean", "group_median"):
+            _require_numeric(block, self.method)
+        if self.method == "mean":
+            for col in self.columns:
+                self.moments[col].update(block[col].to_numpy(dtype=np.float64, na_value=np.nan))
+        elif self.method == "median":
+            for col in self.columns:
+                self.digests.setdefault(col, TDigest()).update(block[col].to_numpy(dtype=np.float64, na_value=np.nan))
+        elif self.method == "group_mean":
+            sums = block.groupby(_group_by(chunk, self.keys), sort=False, observed=True).agg(['sum', 'count'])
+            self.sums = sums if self.sums is None else self.sums.add(sums, fill_value=0)
+        elif self.method == "group_median":
+            for group, rows in block.groupby(_group_by(chunk, self.keys), sort=False, observed=True):
+                for col in self.columns:
+                    values = rows[col].to_numpy(dtype=np.float64, na_value=np.nan)
+                    self.digests.setdefault((group, col), TDigest()).update(values)
+        elif self.method == "bfill":
+            self.firsts.append(block.bfill().iloc[0] if len(block) else pd.Series(np.nan, index=self.columns))
+        return chunk
+
+    def finish_collect(self):
+        if self.method == "mean":
+            self.fill_values = pd.Series({col: m.mean if m.count else np.nan for col, m in self.moments.items()})
+        elif self.method == "median":
+            self.fill_values = pd.Series({col: self.digests[col].quantile(0.5) if col in self.digests else np.nan
+                                          for col in self.columns})
+        elif self.method == "group_mean" and self.sums is not None:
+            self.fill_values = pd.DataFrame({
+                col: self.sums[(col, 'sum')] / self.sums[(col, 'count')].replace(0, np.nan) for col in self.columns
+            })
+        elif self.method == "group_median" and self.digests:
+            medians = {}
+            for (group, col), digest in self.digests.items():
+                medians.setdefault(col, {})[group] = digest.quantile(0.5)
+            self.fill_values = pd.DataFrame(medians)[self.columns]
+        elif self.method == "bfill":
+            # Valeur de report pour la fin de chaque bloc : première valeur renseignée des blocs suivants
+            following = {}
+            lookahead = []
+            for first in reversed(self.firsts):
+                lookahead.append(dict(following))
+                following.update(first.dropna().to_dict())
+            self.fill_values = lookahead[::-1]
+            self.firsts = []
+
+    def apply(self, chunk):
+        block = chunk[self.columns]
+        if self.method == "0":
+            filled = block.fillna(0)
+        elif self.method == "custom":
+            filled = block.fillna(self.custom_value)
+        elif self.method in ("mean", "median"):
+            filled = block.fillna(self.fill_values)
+        elif self.method == "ffill":
+            filled = block.ffill()
+            if self.carry is not None:
+                filled = filled.fillna(self.carry)
+            if len(filled):
+                self.carry = filled.iloc[-1]
+        elif self.method == "bfill":
+            filled = block.bfill().fillna(self.fill_values[self.chunk_index])
+        elif self.method in ("group_mean", "group_median"):
+            filled = block
+            if self.fill_values is not None:
+                stats = self.fill_values.reindex(_group_index(chunk, self.keys))
+                stats.index = block.index
+                filled = block.fillna(stats)
+        else:
+            keys = _group_by(chunk, self.keys)
+            filled = block.groupby(keys, sort=False, observed=True).ffill()
+            if self.carry is not None:
+                carried = self.carry.reindex(_group_index(chunk, self.keys))
+                carried.index = block.index
+                filled = filled.fillna(carried)
+            last = filled.groupby(keys, sort=False, observed=True).last()
+            self.carry = last if self.carry is None else last.combine_first(self.carry)
+        self.chunk_index += 1
+        chunk = chunk.copy(deep=False)
+        for col in self.columns:
+            chunk[col] = filled[col]
+        return chunk
+
+class _SampleStep:
+    """Échantillonnage en flux : nombre exact de lignes, dans l'ordre du fichier, en mémoire constante."""
+
+    def __init__(self, method, n=None, frac=None, seed=None):
+        if method not in PIPELINE_SAMPLE_METHODS:
+            raise ValueError(f"La méthode d'échantillonnage '{method}' n'est pas disponible dans une chaîne en flux.")
+        if n is None and frac is None:
+            raise ValueError("Il faut fournir soit 'n' soit 'frac'.")
+        self.method = method
+        self.n = n
+        self.frac = frac
+        self.seed = seed
+        # Seules les n premières lignes peuvent être choisies sans connaître le nombre total de lignes
+        self.needs_prepass = not (method == "first_n" and n is not None)
+        self.reset()
+
+    def reset(self):
+        self.total = 0
+        self.target = self.n
+        self.seen = 0
+        self.remaining = None       # lignes restant à parcourir (random_total)
+        self.needed = self.n        # lignes restant à tirer (random_total)
+        self.rng = np.random.default_rng(self.seed)
+
+    def collect(self, chunk):
+        self.total += len(chunk)
+        return chunk
+
+    def finish_collect(self):
+        target = self.n if self.n is not None else int(round(self.frac * self.total))
+        self.target = min(target, self.total)
+        self.remaining, self.needed = self.total, self.target
+
+    @property
+    def saturated(self):
+        """Vrai lorsque plus aucune ligne ne peut être retenue (la lecture peut s'arrêter)."""
+        if self.method == "first_n":
+            return self.seen >= self.target
+        return self.method == "random_total" and self.needed == 0
+
+    def apply(self, chunk):
+        size = len(chunk)
+        if self.method == "first_n":
+            keep = np.arange(max(0, min(size, self.target - self.seen)))
+        elif self.method == "last_n":
+            start = self.total - self.target
+            keep = np.arange(max(0, start - self.seen), size)
+        else:
+            # Tirage sans remise séquentiel : le nombre de lignes retenues dans le bloc suit une loi
+            # hypergéométrique, ce qui donne exactement `target` lignes uniformément réparties
+            taken = 0
+            if self.needed and size:
+                taken = int(self.rng.hypergeometric(size, self.remaining - size, self.needed)) \
+                    if self.remaining > size else self.needed
+            keep = np.sort(self.rng.choice(size, taken, replace=False)) if taken else np.empty(0, dtype=np.int64)
+            self.remaining -= size
+            self.needed -= taken
+        self.seen += size
+        return chunk.iloc[keep]
+
+class TreatmentPipeline:
+    """
+    Chaîne de traitements paresseuse : les étapes (sélection, remplissage, échantillonnage, renommage)
+    sont enregistrées puis exécutées en une passe par blocs, du fichier d'entrée au fichier de sortie.
+
+    Les étapes qui en ont besoin (moyenne, médiane, report arrière, nombre total de lignes) sont préparées
+    par une pré-lecture du fichier ; les statistiques portent alors sur les valeurs d'origine du fichier complet.
+    Les médianes sont estimées par t-digest. Le report avant (ffill) se propage d'un bloc à l'autre.
+
+    Exemple :
+        TreatmentPipeline().fill(['age'], 'median').rename({'age': 'âge'}).run('entree.csv', 'sortie.csv')
+    """
+
+    def __init__(self):
+        self.steps = []
+        self.rows_read = 0   # lignes lues lors de la dernière exécution (toutes celles du fichier en cas de pré-lecture)
+
+    def rename(self, new_names):
+        """Ajoute un renommage de colonnes {ancien_nom: nouveau_nom}."""
+        self.steps.append(_RenameStep(new_names))
+        return self
+
+    def select(self, columns):
+        """Ajoute une sélection (et un ordre) de colonnes."""
+        self.steps.append(_SelectStep(columns))
+        return self
+
+    def fill(self, columns, method, custom_value=None, group_by=None):
+        """Ajoute un remplissage des valeurs nulles (méthodes de PIPELINE_FILL_METHODS)."""
+        self.steps.append(_FillStep(columns, method, custom_value, group_by))
+        return self
+
+    def sample(self, method, n=None, frac=None, seed=None):
+        """Ajoute un échantillonnage (méthodes de PIPELINE_SAMPLE_METHODS) ; une seule fois par chaîne."""
+        if any(isinstance(step, _SampleStep) for step in self.steps):
+            raise ValueError("Une chaîne de traitements ne peut contenir qu'une seule étape d'échantillonnage.")
+        self.steps.append(_SampleStep(method, n, frac, seed))
+        return self
+
+    @property
+    def needs_prepass(self):
+        return any(step.needs_prepass for step in self.steps)
+
+    @staticmethod
+    def _source_chunks(source, separator, encoding, chunksize):
+        if isinstance(source, pd.DataFrame):
+            return (source.iloc[start:start + chunksize] for start in range(0, len(source), chunksize))
+        return iter_csv_chunks(source, separator, encoding, chunksize)
+
+    def iter_chunks(self, source, separator=',', encoding='utf-8', chunksize=DEFAULT_CHUNKSIZE):
+        """
+        Exécute la chaîne et renvoie les blocs transformés au fur et à mesure.
+
+        :param source: Chemin/objet fichier CSV, ou DataFrame
+        :return: Générateur de DataFrames
+        """
+        for step in self.steps:
+            step.reset()
+        self.rows_read = 0
+        if self.needs_prepass:
+            for chunk in self._source_chunks(source, separator, encoding, chunksize):
+                self.rows_read += len(chunk)
+                for step in self.steps:
+                    chunk = step.collect(chunk)
+            for step in self.steps:
+                step.finish_collect()
+
+        read = 0
+        chunks = self._source_chunks(source, separator, encoding, chunksize)
+        try:
+            for chunk in chunks:
+                read += len(chunk)
+                self.rows_read = max(self.rows_read, read)
+                for step in self.steps:
+                    chunk = step.apply(chunk)
+                yield chunk
+                if any(getattr(step, 'saturated', False) for step in self.steps):
+                    break
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+    def run(self, source, output_path, separator=',', encoding='utf-8', output_separator=None,
+            output_encoding=None, chunksize=DEFAULT_CHUNKSIZE, on_chunk=None):
+        """
+        Exécute la chaîne et écrit le résultat dans un fichier CSV, bloc par bloc.
+
+        :param source: Chemin/objet fichier CSV, ou DataFrame
+        :param output_path: Chemin du fichier CSV de sortie
+        :param separator: Séparateur du fichier d'entrée
+        :param encoding: Encodage du fichier d'entrée
+        :param output_separator: Séparateur du fichier de sortie (celui de l'entrée par défaut)
+        :param output_encoding: Encodage du fichier de sortie (celui de l'entrée par défaut)
+        :param chunksize: Nombre de lignes par bloc
+        :param on_chunk: Fonction appelée sur chaque bloc écrit (ex : statistiques sur la sortie)
+        :return: Dictionnaire (lignes lues, lignes écrites, colonnes, nombre de lectures du fichier)
+        """
+        rows, columns = 0, []
+        with span('TreatmentPipeline.run', **data_size(source)) as current, \
+                open(output_path, 'w', encoding=output_encoding or encoding, newline='') as f:
+            for i, chunk in enumerate(self.iter_chunks(source, separator, encoding, chunksize)):
+                chunk.to_csv(f, index=False, header=(i == 0), sep=output_separator or separator)
+                if on_chunk is not None:
+                    on_chunk(chunk)
+                rows += len(chunk)
+                columns = chunk.columns.tolist()
+            current.set(rows=self.rows_read, rows_written=rows)
+        return {'rows_read': self.rows_read, 'rows': rows, 'columns': columns,
+                'passes': 2 if self.needs_prepass else 1}
+
+    def to_frame(self, source, separator=',', encoding='utf-8', chunksize=DEFAULT_CHUNKSIZE):
+        """Exécute la chaîne et renvoie le résultat complet en mémoire (aperçu, petits fichiers)."""
+        chunks = list(self.iter_chunks(source, separator, encoding, chunksize))
+        return pd.concat(chunks) if chunks else pd.DataFrame()
@@ -1,32 +1,54 @@
 # ui_upload.py
+import mmap
 import streamlit as st
 import chardet
+from src.upload_spool import spool_upload
 
 def detect_encoding(file):
     """
     Détecte l'encodage d'un fichier via un échantillon.
-    
-    :param file: Objet fichier (ex: UploadedFile de Streamlit)
+
+    :param file: Chemin du fichier (lu en mémoire projetée) ou objet fichier (ex: UploadedFile de Streamlit)
     :return: Encodage détecté (ex: 'utf-8', 'iso-8859-1', etc.)
     """
-    file.seek(0)
-    sample = file.read(1024)
+    if isinstance(file, str):
+        with open(file, 'rb') as f:
+            if not f.seek(0, 2):
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                sample = mapping[:1024]
+    else:
+        file.seek(0)
+        sample = file.read(1024)
     result = chardet.detect(sample)
     return result['encoding']
 
 def render_file_upload():
     """
-    Affiche le widget d'upload et gère la détection d'encodage.
-    
-    :return: Tuple (uploaded_file, detected_encoding) ou (None, None)
+    Affiche le widget d'upload, recopie le fichier dans un fichier local (une fois par upload)
+    et détecte son encodage.
+
+    La copie locale est conservée dans st.session_state et supprimée en fin de session.
+
+    :return: Tuple (SpooledUpload, detected_encoding) ou (None, None)
     """
     uploaded_file = st.file_uploader("Déposez votre fichier ici", type=['csv', 'xlsx'])
-    if uploaded_file is not None:
+    if uploaded_file is None:
+        spooled = st.session_state.pop('spooled_upload', None)
+        if spooled is not None:
+            spooled.close()
+        return None, None
+    try:
+        spooled = spool_upload(uploaded_file, st.session_state.get('spooled_upload'))
+    except Exception as e:
+        st.error(f"Erreur lors de la copie locale du fichier : {e}")
+        return None, None
+    if st.session_state.get('spooled_upload') is not spooled:
+        st.session_state.spooled_upload = spooled
         try:
-            detected_enc = detect_encoding(uploaded_file)
-            st.info(f"Encodage détecté : {detected_enc}")
+            spooled.detected_encoding = detect_encoding(spooled.path)
         except Exception as e:
             st.error(f"Erreur lors de la détection de l'encodage : {e}")
-            detected_enc = 'utf-8'
-        return uploaded_file, detected_enc
-    return None, None
+            spooled.detected_encoding = 'utf-8'
+    st.info(f"Encodage détecté : {spooled.detected_encoding}")
+    return spooled, spooled.detected_encoding
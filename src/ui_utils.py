@@ -1,7 +1,15 @@
 # ui_utils.py
 import os
+import uuid
 import streamlit as st
 from src.config import DEFAULT_OUTPUT_DIR
+from src.export import EXPORT_FORMATS, export_dataframe
+from src.memory_governor import get_memory_governor
+from src.working_copy import remove_working_copy, save_working_copy
+
+# Encodages et séparateurs proposés pour les fichiers exportés
+EXPORT_ENCODINGS = ["utf-8", "utf-8-sig", "latin-1", "iso-8859-1", "cp1252", "ascii"]
+EXPORT_SEPARATORS = [",", ";", "\t", "|"]
 
 def get_default_output_name(treatment_suffix):
     """
@@ -20,15 +28,18 @@ def get_default_output_name(treatment_suffix):
         base = "output"
     return f"{base}_{treatment_suffix}"
 
-def select_output_dir():
+def select_output_dir(key=None):
     """
     Permet de sélectionner le répertoire de destination.
     
     Si l'utilisateur ne renseigne pas de chemin, on utilise le répertoire par défaut relatif à l'application.
     
+    :param key: Clé Streamlit du widget (nécessaire si plusieurs sélecteurs sont affichés sur la même page)
     :return: Chemin du répertoire de sortie
     """
-    output_dir = st.text_input("Chemin du dossier de destination (laisser vide pour utiliser le dossier par défaut)", value="")
+    output_dir = st.text_input(
+        "Chemin du dossier de destination (laisser vide pour utiliser le dossier par défaut)", value="", key=key
+    )
     if not output_dir:
         output_dir = os.path.join(os.path.dirname(__file__), DEFAULT_OUTPUT_DIR)
         if not os.path.exists(output_dir):
@@ -37,3 +48,103 @@ def select_output_dir():
     else:
         st.info(f"Utilisation du dossier personnalisé : {output_dir}")
     return output_dir
+
+def select_export_options(key=None):
+    """
+    Affiche le choix du format de sortie, de l'encodage et du séparateur (formats CSV uniquement).
+
+    :param key: Préfixe des clés Streamlit des widgets (nécessaire si plusieurs choix sont affichés sur la même page)
+    :return: Tuple (format parmi EXPORT_FORMATS, encodage, séparateur)
+    """
+    output_format = st.selectbox("Format de sortie", list(EXPORT_FORMATS), key=f"{key}_export_format" if key else None)
+    output_encoding, export_separator = "utf-8", ","
+    if output_format.startswith("CSV"):
+        output_encoding = st.selectbox(
+            "Choisir l'encodage pour le fichier de sortie", options=EXPORT_ENCODINGS, index=0,
+            key=f"{key}_export_encoding" if key else None
+        )
+        export_separator = st.selectbox(
+            "Séparateur CSV", options=EXPORT_SEPARATORS, index=0, key=f"{key}_export_separator" if key else None
+        )
+    return output_format, output_encoding, export_separator
+
+def export_with_progress(df, output_dir, output_name, output_format, encoding="utf-8", separator=","):
+    """
+    Enregistre le DataFrame (voir src/export.py) en affichant une barre de progression.
+
+    :param df: DataFrame à enregistrer
+    :param output_dir: Répertoire de sortie
+    :param output_name: Nom du fichier, sans extension
+    :param output_format: Format parmi EXPORT_FORMATS
+    :param encoding: Encodage (formats CSV)
+    :param separator: Séparateur (formats CSV)
+    :return: Chemin du fichier écrit
+    """
+    output_path = os.path.join(output_dir, f"{output_name}{EXPORT_FORMATS[output_format]}")
+    text = f"Enregistrement de {output_path}..."
+    bar = st.progress(0.0, text=text)
+    export_dataframe(df, output_path, separator=separator, encoding=encoding,
+                     progress=lambda fraction: bar.progress(fraction, text=text))
+    bar.empty()
+    return output_path
+
+def set_last_file(df, output_path):
+    """
+    Mémorise le dernier fichier généré par la session et enregistre sa copie de travail.
+
+    La copie de travail du fichier généré précédemment, qui ne sera plus relue, est supprimée.
+
+    :param df: DataFrame exporté
+    :param output_path: Chemin du fichier exporté
+    """
+    save_working_copy(df, output_path)
+    previous = st.session_state.get('last_file')
+    if previous and os.path.abspath(previous) != os.path.abspath(output_path):
+        remove_working_copy(previous)
+    st.session_state.last_file = output_path
+
+def _session_owner():
+    """Identifiant de la session auprès du gouverneur mémoire."""
+    if 'memory_owner' not in st.session_state:
+        st.session_state.memory_owner = uuid.uuid4().hex
+    return st.session_state.memory_owner
+
+def set_session_frame(df):
+    """
+    Remplace le DataFrame courant de la session (None pour l'oublier).
+
+    Le DataFrame est confié au gouverneur mémoire, qui peut le déverser sur disque entre deux exécutions.
+    """
+    previous = st.session_state.get('frame')
+    st.session_state.frame = get_memory_governor().register(df, owner=_session_owner()) if df is not None else None
+    if previous is not None:
+        previous.release()
+
+def get_session_frame():
+    """Renvoie le DataFrame courant de la session (relu en mémoire mappée s'il a été déversé), ou None."""
+    handle = st.session_state.get('frame')
+    return handle.get() if handle is not None else None
+
+def release_session_frames():
+    """
+    Libère les DataFrames de la session, leurs fichiers déversés et la copie de travail du dernier fichier
+    généré (ex : bouton Reset App).
+    """
+    if st.session_state.get('last_file'):
+        remove_working_copy(st.session_state.last_file)
+    if 'memory_owner' in st.session_state:
+        get_memory_governor().release_owner(st.session_state.memory_owner)
+
+def render_memory_usage():
+    """Affiche l'occupation du budget mémoire des DataFrames de session et du cache d'analyse."""
+    usage = get_memory_governor().usage()
+    ratio = usage['memory_bytes'] / usage['max_bytes'] if usage['max_bytes'] else 1.0
+    st.progress(min(ratio, 1.0), text=(
+        f"Mémoire des sessions et du cache : {usage['memory_bytes'] / 1024 ** 2:.1f} / "
+        f"{usage['max_bytes'] / 1024 ** 2:.0f} Mo"
+    ))
+    st.caption(
+        f"{usage['frames']} DataFrame(s) pour {usage['sessions']} session(s), dont {usage['spilled_frames']} "
+        f"déversé(s) sur disque ({usage['disk_bytes'] / 1024 ** 2:.1f} Mo) ; "
+        f"cache d'analyse en mémoire : {usage['cache_bytes'] / 1024 ** 2:.1f} Mo"
+    )
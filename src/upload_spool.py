@@ -0,0 +1,123 @@
+# upload_spool.py
+# Ce module recopie une seule fois chaque fichier uploadé dans un fichier temporaire local. Les lectures
+# (détection d'encodage, prévisualisation, index des lignes, lecture Arrow) se font ensuite depuis ce fichier,
+# projeté en mémoire, au lieu du tampon de l'UploadedFile ; le fichier est supprimé en fin de session,
+# avec les fichiers qui en dérivent (ex : index des lignes <copie>.rowidx.npy).
+import glob
+import logging
+import os
+import shutil
+import tempfile
+import weakref
+
+from src.config import UPLOAD_SPOOL_DIR
+
+logger = logging.getLogger(__name__)
+
+# Taille des blocs recopiés depuis l'upload (lire par blocs évite la copie complète du tampon de l'UploadedFile,
+# qu'entraînerait getbuffer() sur son contenu partagé)
+SPOOL_COPY_BLOCK_BYTES = 8 * 1024 * 1024
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("Suppression de la copie locale %s impossible : %s", path, e)
+
+
+def _remove_spool(path):
+    """Supprime la copie locale et ses fichiers dérivés, nommés '<copie>.<suffixe>'."""
+    for derived in glob.glob(glob.escape(path) + '.*'):
+        _remove(derived)
+    _remove(path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def purge_stale_spools(spool_dir=UPLOAD_SPOOL_DIR):
+    """
+    Supprime les copies laissées par des processus serveur arrêtés brutalement (Unix uniquement).
+
+    Les noms de fichiers commencent par le PID du processus qui les a créés.
+    """
+    if os.name != 'posix' or not os.path.isdir(spool_dir):
+        return
+    for name in os.listdir(spool_dir):
+        pid = name.split('_', 1)[0]
+        if pid.isdigit() and int(pid) != os.getpid() and not _pid_alive(int(pid)):
+            _remove(os.path.join(spool_dir, name))
+
+
+class SpooledUpload:
+    """
+    Fichier uploadé recopié sur le disque local.
+
+    Expose le nom d'origine (`name`), la taille (`size`) et le chemin de la copie (`path`), à transmettre
+    aux fonctions de lecture. La copie est supprimée par `close()`, à la destruction de l'objet
+    (fin de session Streamlit) ou à l'arrêt du processus.
+    """
+
+    def __init__(self, uploaded_file, spool_dir=UPLOAD_SPOOL_DIR):
+        os.makedirs(spool_dir, exist_ok=True)
+        self.name = uploaded_file.name
+        self.file_id = getattr(uploaded_file, 'file_id', None)
+        extension = os.path.splitext(self.name)[1].lower()
+        fd, self.path = tempfile.mkstemp(prefix=f"{os.getpid()}_", suffix=extension, dir=spool_dir)
+        self._finalizer = weakref.finalize(self, _remove_spool, self.path)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                uploaded_file.seek(0)
+                shutil.copyfileobj(uploaded_file, f, SPOOL_COPY_BLOCK_BYTES)
+                uploaded_file.seek(0)
+        except BaseException:
+            self.close()
+            raise
+        self.size = os.path.getsize(self.path)
+
+    def __repr__(self):
+        return f"SpooledUpload({self.name!r}, {self.path!r})"
+
+    @property
+    def closed(self):
+        return not self._finalizer.alive
+
+    def close(self):
+        """Supprime la copie locale et ses fichiers dérivés (sans effet s'ils ont déjà été supprimés)."""
+        self._finalizer()
+
+    def matches(self, uploaded_file):
+        """Indique si la copie correspond à l'upload (même identifiant Streamlit, sinon même nom et taille)."""
+        file_id = getattr(uploaded_file, 'file_id', None)
+        if file_id is not None or self.file_id is not None:
+            return file_id == self.file_id
+        return (uploaded_file.name, getattr(uploaded_file, 'size', None)) == (self.name, self.size)
+
+
+def spool_upload(uploaded_file, previous=None, spool_dir=UPLOAD_SPOOL_DIR):
+    """
+    Renvoie la copie locale d'un upload, en réutilisant `previous` si elle correspond au même fichier.
+
+    Une copie précédente d'un autre fichier est supprimée.
+
+    :param uploaded_file: Fichier uploadé (UploadedFile, ou tout objet fichier possédant un attribut `name`)
+    :param previous: SpooledUpload conservé d'une exécution précédente (facultatif)
+    :param spool_dir: Répertoire des copies locales
+    :return: SpooledUpload
+    """
+    if previous is not None:
+        if not previous.closed and previous.matches(uploaded_file):
+            return previous
+        previous.close()
+    purge_stale_spools(spool_dir)
+    return SpooledUpload(uploaded_file, spool_dir)
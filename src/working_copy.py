@@ -0,0 +1,119 @@
+# working_copy.py
+# Ce module conserve, pour chaque fichier généré par un traitement (CSV/Excel), une copie de travail
+# binaire au format Arrow IPC (Feather). La relecture se fait en mémoire mappée au lieu de ré-analyser le texte.
+import hashlib
+import json
+import logging
+import os
+
+from src.config import WORKING_COPY_DIR, WORKING_COPY_MAX_DISK_BYTES
+from src.data_loader import load_data
+from src.tracing import traced
+
+logger = logging.getLogger(__name__)
+
+
+def file_signature(file_path):
+    """
+    Renvoie la signature (taille, date de modification) d'un fichier, utilisée pour détecter un changement.
+
+    :param file_path: Chemin du fichier
+    :return: Liste [taille en octets, mtime en nanosecondes], ou None si le fichier n'existe pas
+    """
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def working_copy_path(output_path, working_dir=WORKING_COPY_DIR):
+    """Chemin de la copie de travail associée au fichier généré `output_path`."""
+    key = hashlib.blake2b(os.path.abspath(output_path).encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(working_dir, f"{key}.feather")
+
+
+def remove_working_copy(output_path, working_dir=WORKING_COPY_DIR):
+    """Supprime la copie de travail associée au fichier généré `output_path` (si elle existe)."""
+    path = working_copy_path(output_path, working_dir)
+    for name in (path, f"{path}.json"):
+        try:
+            os.remove(name)
+        except FileNotFoundError:
+            pass
+
+
+def _trim_working_copies(working_dir, keep, max_disk_bytes=WORKING_COPY_MAX_DISK_BYTES):
+    """Supprime les copies de travail les moins récemment utilisées au-delà du budget disque."""
+    files = [os.path.join(working_dir, name) for name in os.listdir(working_dir) if name.endswith('.feather')]
+    files.sort(key=os.path.getmtime)
+    total = sum(os.path.getsize(path) for path in files)
+    for path in files:
+        if total <= max_disk_bytes:
+            break
+        if path != keep:
+            total -= os.path.getsize(path)
+            os.remove(path)
+            if os.path.exists(f"{path}.json"):
+                os.remove(f"{path}.json")
+
+
+@traced('save_working_copy')
+def save_working_copy(df, output_path, working_dir=WORKING_COPY_DIR, max_disk_bytes=WORKING_COPY_MAX_DISK_BYTES):
+    """
+    Enregistre la copie de travail d'un fichier qui vient d'être exporté.
+
+    La copie est écrite sans compression pour pouvoir être relue en mémoire mappée.
+    À appeler après l'écriture du fichier utilisateur, dont la signature est mémorisée. Les copies les
+    moins récemment utilisées sont ensuite supprimées au-delà du budget disque.
+
+    :param df: DataFrame exporté
+    :param output_path: Chemin du fichier CSV/Excel exporté
+    :param working_dir: Répertoire des copies de travail
+    :param max_disk_bytes: Budget disque du répertoire des copies de travail (octets)
+    :return: Chemin de la copie de travail, ou None si elle n'a pas pu être écrite
+    """
+    path = working_copy_path(output_path, working_dir)
+    try:
+        os.makedirs(working_dir, exist_ok=True)
+        df.reset_index(drop=True).to_feather(path, compression='uncompressed')
+        with open(f"{path}.json", 'w') as f:
+            json.dump({'source': os.path.abspath(output_path), 'signature': file_signature(output_path)}, f)
+    except Exception as e:
+        logger.warning("Écriture de la copie de travail de %s impossible : %s", output_path, e)
+        return None
+    try:
+        _trim_working_copies(working_dir, keep=path, max_disk_bytes=max_disk_bytes)
+    except OSError as e:  # Copie supprimée en parallèle par une autre session
+        logger.warning("Nettoyage des copies de travail impossible : %s", e)
+    return path
+
+
+@traced('load_working_copy')
+def load_working_copy(output_path, separator=',', encoding='utf-8', working_dir=WORKING_COPY_DIR):
+    """
+    Recharge un fichier généré depuis sa copie de travail binaire.
+
+    Si le fichier a été modifié sur disque depuis l'écriture de la copie (ou si la copie est absente),
+    il est relu depuis le CSV/Excel et la copie de travail est régénérée.
+
+    :param output_path: Chemin du fichier CSV/Excel généré
+    :param separator: Séparateur pour les fichiers CSV
+    :param encoding: Encodage du fichier
+    :param working_dir: Répertoire des copies de travail
+    :return: DataFrame pandas
+    """
+    path = working_copy_path(output_path, working_dir)
+    try:
+        with open(f"{path}.json") as f:
+            metadata = json.load(f)
+        if metadata['signature'] == file_signature(output_path) and os.path.exists(path):
+            import pyarrow.feather as feather
+            os.utime(path)  # Copie récemment utilisée : dernière évincée du budget disque
+            # Lecture mappée : les colonnes sans valeurs nulles de types primitifs ne sont pas copiées
+            return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+    except (OSError, ValueError, KeyError):
+        pass
+    df = load_data(output_path, separator=separator, encoding=encoding)
+    save_working_copy(df, output_path, working_dir)
+    return df
@@ -0,0 +1,67 @@
+import unittest
+import os
+import pandas as pd
+from benchmarks.generator import DATASETS, make_dataset
+from benchmarks.run import DEFERRED_MODULES, STARTUP_CASE, app_imports, compare, run_benchmarks, select_cases
+
+class TestGenerator(unittest.TestCase):
+    def test_datasets_are_deterministic(self):
+        for kind in DATASETS:
+            df = make_dataset(kind, 500, seed=1)
+            self.assertEqual(len(df), 500)
+            self.assertTrue(df.isna().any().any(), kind)
+            pd.testing.assert_frame_equal(df, make_dataset(kind, 500, seed=1))
+        self.assertFalse(make_dataset('mixed', 500, seed=1).equals(make_dataset('mixed', 500, seed=2)))
+
+    def test_spotify_schema(self):
+        expected = pd.read_csv(os.path.join('data', 'spotify_2023.csv'), encoding='latin-1', nrows=5)
+        df = make_dataset('spotify', 100)
+        self.assertEqual(df.columns.tolist(), expected.columns.tolist())
+        self.assertEqual(df['streams'].dtype, object)
+
+    def test_unknown_dataset(self):
+        with self.assertRaises(ValueError):
+            make_dataset('inconnu', 10)
+
+class TestRun(unittest.TestCase):
+    def setUp(self):
+        self.baseline = {'meta': {}, 'results': [
+            {'dataset': 'mixed', 'rows': 10, 'case': 'a', 'seconds': 1.0, 'peak_mb': 100.0},
+            {'dataset': 'mixed', 'rows': 10, 'case': 'b', 'seconds': 0.01, 'peak_mb': 1.0},
+            {'dataset': 'mixed', 'rows': 10, 'case': 'c', 'skipped': 'non applicable'},
+        ]}
+
+    def test_compare_flags_regressions_above_threshold_and_noise(self):
+        results = {'meta': {}, 'results': [
+            {'dataset': 'mixed', 'rows': 10, 'case': 'a', 'seconds': 1.1, 'peak_mb': 200.0},
+            {'dataset': 'mixed', 'rows': 10, 'case': 'b', 'seconds': 0.03, 'peak_mb': 3.0},
+            {'dataset': 'mixed', 'rows': 10, 'case': 'c', 'seconds': 5.0, 'peak_mb': 5.0},
+            {'dataset': 'mixed', 'rows': 20, 'case': 'a', 'seconds': 9.0, 'peak_mb': 900.0},
+        ]}
+        regressions = compare(results, self.baseline, threshold=0.25)
+        self.assertEqual([(r['case'], r['metric'], r['ratio']) for r in regressions], [('a', 'peak_mb', 2.0)])
+        self.assertEqual(compare(self.baseline, self.baseline), [])
+
+    def test_run_small_selection(self):
+        cases = select_cases(['get_data_info', 'group_mean'])
+        report = run_benchmarks([200], ['mixed', 'wide'], cases, repeat=1, log=None)
+        self.assertEqual(len(report['results']), 4)
+        self.assertTrue(all(r['seconds'] >= 0 and r['peak_mb'] >= 0 for r in report['results']))
+        self.assertIn('pandas', report['meta']['versions'])
+        self.assertEqual(run_benchmarks([200], ['wide'], cases, max_cells=100, log=None)['results'], [])
+
+class TestStartup(unittest.TestCase):
+    def test_app_imports_exclude_plotting_stack(self):
+        modules = app_imports()
+        self.assertIn('src.eda_executor', modules)
+        self.assertNotIn('src.eda_advanced', modules)
+
+    def test_startup_loads_no_deferred_module(self):
+        report = run_benchmarks(cases={}, repeat=1, log=None, startup=True)
+        entry, = report['results']
+        self.assertEqual(entry['case'], STARTUP_CASE)
+        self.assertGreater(entry['seconds'], 0)
+        self.assertEqual(entry['deferred_loaded'], [], f"{DEFERRED_MODULES} doivent être importés à la demande")
+
+if __name__ == '__main__':
+    unittest.main()
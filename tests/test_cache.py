@@ -0,0 +1,42 @@
+import unittest
+import os
+import shutil
+import tempfile
+import pandas as pd
+from src.cache import ParseCache, cache_key, file_fingerprint, load_data_cached
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "test_cache.csv")
+        with open(self.path, "w") as f:
+            f.write("col1,col2\n1,a\n3,b")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_key_depends_on_content_and_options(self):
+        fingerprint = file_fingerprint(self.path)
+        self.assertNotEqual(cache_key(fingerprint, ',', 'utf-8'), cache_key(fingerprint, ';', 'utf-8'))
+        with open(self.path, "a") as f:
+            f.write("\n5,c")
+        self.assertNotEqual(file_fingerprint(self.path), fingerprint)
+
+    def test_second_load_is_served_from_cache(self):
+        cache = ParseCache(spill_dir=os.path.join(self.tmp_dir, "spill"))
+        first = load_data_cached(self.path, cache=cache)
+        second = load_data_cached(self.path, cache=cache)
+        self.assertIs(first, second)
+
+    def test_lru_eviction_spills_to_disk(self):
+        cache = ParseCache(max_bytes=1, spill_dir=os.path.join(self.tmp_dir, "spill"))
+        df = pd.DataFrame({'A': range(100)})
+        cache.put('cle', df)
+        self.assertEqual(cache.memory_bytes, 0)
+        self.assertIn('cle', cache)
+        pd.testing.assert_frame_equal(cache.get('cle'), df)
+        cache.clear(disk=True)
+        self.assertNotIn('cle', cache)
+
+if __name__ == '__main__':
+    unittest.main()
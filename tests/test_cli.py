@@ -0,0 +1,107 @@
+import unittest
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import pandas as pd
+from src.cli import build_pipeline, expand_inputs, load_job, main, output_paths, run_job
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.tmp_dir, "in"))
+        for i in range(3):
+            pd.DataFrame({'cat': ['a', 'b'] * 50, 'x': [1.0, None] * 50, 'y': range(100)}).to_csv(
+                os.path.join(self.tmp_dir, "in", f"f{i}.csv"), index=False)
+        with open(os.path.join(self.tmp_dir, "in", "notes.txt"), "w") as f:
+            f.write("ignoré")
+        self.job_path = os.path.join(self.tmp_dir, "job.json")
+        self.write_job({
+            "inputs": ["in"],
+            "operations": [{"op": "fill", "columns": ["x"], "method": "mean"},
+                           {"op": "sample", "method": "first_n", "n": 10},
+                           {"op": "rename", "columns": {"x": "X"}}],
+            "output_dir": "out", "profile": True, "chunksize": 7,
+        })
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_job(self, job):
+        with open(self.job_path, "w") as f:
+            json.dump(job, f)
+
+    def test_job_paths_and_inputs(self):
+        job = load_job(self.job_path)
+        self.assertEqual(job['output_dir'], os.path.join(self.tmp_dir, "out"))
+        self.assertEqual([os.path.basename(p) for p in expand_inputs(job['inputs'])], ["f0.csv", "f1.csv", "f2.csv"])
+        self.write_job({"inputs": [], "unknown": 1})
+        with self.assertRaises(ValueError):
+            load_job(self.job_path)
+        with self.assertRaises(ValueError):
+            build_pipeline([{"op": "drop"}])
+
+    def test_run_job_report_and_outputs(self):
+        with open(os.path.join(self.tmp_dir, "in", "bad.csv"), "w") as f:
+            f.write("z\n1\n")
+        report = run_job(load_job(self.job_path), workers=1)
+        self.assertEqual(report['summary'], {'files': 4, 'ok': 3, 'errors': 1, 'rows_in': 300, 'rows_out': 30})
+        bad = report['files'][0]
+        self.assertEqual(bad['status'], 'error')
+        self.assertIsNone(bad['output'])
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir, "out", "bad_traite.csv")))
+
+        entry = report['files'][1]
+        self.assertEqual((entry['rows_in'], entry['rows_out'], entry['passes']), (100, 10, 2))
+        out = pd.read_csv(entry['output'])
+        self.assertEqual(out.columns.tolist(), ['cat', 'X', 'y'])
+        self.assertEqual(out['X'].tolist(), [1.0] * 10)
+        profile = pd.read_csv(entry['profile'], index_col=0)
+        self.assertEqual(profile.loc['y', 'max'], 9)
+        self.assertEqual(profile.loc['X', 'missing'], 0)
+
+    def test_main_in_process_pool_writes_report(self):
+        report_path = os.path.join(self.tmp_dir, "rapport.json")
+        self.assertEqual(main([self.job_path, "--workers", "2", "--report", report_path]), 0)
+        with open(report_path) as f:
+            report = json.load(f)
+        self.assertEqual([e['rows_out'] for e in report['files']], [10, 10, 10])
+        self.assertEqual(report['workers'], 2)
+
+    def test_same_named_inputs_get_distinct_outputs(self):
+        df = pd.DataFrame({'cat': ['a', 'b'], 'x': [1.0, None], 'y': [1, 2]})
+        for sub in ("a", "b"):
+            os.makedirs(os.path.join(self.tmp_dir, "dup", sub))
+            df.to_csv(os.path.join(self.tmp_dir, "dup", sub, "x.csv"), index=False)
+        df.to_excel(os.path.join(self.tmp_dir, "dup", "a", "x.xlsx"), index=False)
+        self.write_job({"inputs": ["dup/*/x.*"], "output_dir": "out", "operations": []})
+        job = load_job(self.job_path)
+        out = os.path.join(self.tmp_dir, "out")
+        self.assertEqual(sorted(os.path.relpath(p, out) for p in output_paths(expand_inputs(job['inputs']), job).values()),
+                         [os.path.join("a", "x_csv_traite.csv"), os.path.join("a", "x_xlsx_traite.csv"),
+                          os.path.join("b", "x_traite.csv")])
+        report = run_job(job, workers=2)
+        self.assertEqual(report['summary']['ok'], 3)
+        self.assertEqual(len({entry['output'] for entry in report['files']}), 3)
+        self.assertTrue(all(os.path.exists(entry['output']) for entry in report['files']))
+
+    @unittest.skipUnless(os.name == 'posix', "plafond mémoire Unix")
+    def test_memory_cap_not_applied_to_calling_process(self):
+        import resource
+        before = resource.getrlimit(resource.RLIMIT_AS)
+        job = load_job(self.job_path)
+        job['max_memory_mb'] = 64 * 1024
+        report = run_job(job, workers=1)
+        self.assertEqual(report['summary']['ok'], 3)
+        self.assertEqual(resource.getrlimit(resource.RLIMIT_AS), before)
+
+    def test_no_streamlit_import(self):
+        code = "import sys, src.cli; print('streamlit' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        self.assertEqual(result.stdout.strip(), "False")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.compaction import compact_dtypes
+
+class TestCompaction(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'petit_entier': np.arange(100, dtype='int64'),
+            'flottant_exact': np.linspace(0, 1, 100).astype('float32').astype('float64'),
+            'flottant_precis': np.linspace(0, 1, 100) / 3,
+            'categorie': ['a', 'b'] * 50,
+            'texte': [f"ligne {i}" for i in range(100)],
+            'date': ['2024-01-15'] * 100,
+        })
+
+    def test_dtypes_are_compacted(self):
+        compacted, _ = compact_dtypes(self.df)
+        self.assertEqual(str(compacted['petit_entier'].dtype), 'int8')
+        self.assertEqual(str(compacted['flottant_exact'].dtype), 'float32')
+        # Une conversion en float32 perdrait de la précision : on garde float64
+        self.assertEqual(str(compacted['flottant_precis'].dtype), 'float64')
+        self.assertEqual(str(compacted['categorie'].dtype), 'category')
+        self.assertEqual(str(compacted['texte'].dtype), 'object')
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(compacted['date']))
+
+    def test_values_preserved(self):
+        compacted, _ = compact_dtypes(self.df)
+        self.assertTrue((compacted['petit_entier'] == self.df['petit_entier']).all())
+        self.assertEqual(compacted['categorie'].tolist(), self.df['categorie'].tolist())
+
+    def test_report(self):
+        compacted, report = compact_dtypes(self.df)
+        self.assertEqual(report['Colonne'].tolist(), self.df.columns.tolist())
+        self.assertLess(report['Mémoire après (Mo)'].sum(), report['Mémoire avant (Mo)'].sum())
+
+if __name__ == '__main__':
+    unittest.main()
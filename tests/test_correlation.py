@@ -0,0 +1,68 @@
+import unittest
+import os
+import numpy as np
+import pandas as pd
+from src.correlation import PearsonAccumulator, correlation_matrix, top_correlated_pairs, cluster_order
+
+class TestCorrelation(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        a = rng.normal(1000, 5, 5000)
+        self.df = pd.DataFrame({
+            'A': a,
+            'B': 2 * a + rng.normal(0, 1, 5000),
+            'C': rng.integers(0, 10, 5000),
+            'D': ['texte'] * 5000
+        })
+        self.df.loc[::9, 'B'] = np.nan
+
+    def test_pearson_matches_pandas(self):
+        corr = correlation_matrix(self.df, chunksize=700)
+        expected = self.df[['A', 'B', 'C']].corr()
+        np.testing.assert_allclose(corr.to_numpy(), expected.to_numpy(), atol=1e-10)
+
+    def test_accumulators_are_mergeable(self):
+        cols = ['A', 'B', 'C']
+        left = PearsonAccumulator(cols).update(self.df.iloc[:1000])
+        right = PearsonAccumulator(cols).update(self.df.iloc[1000:])
+        np.testing.assert_allclose(left.merge(right).result().to_numpy(), self.df[cols].corr().to_numpy(), atol=1e-10)
+
+    def test_pearson_from_file(self):
+        path = "test_correlation.csv"
+        self.df.to_csv(path, index=False)
+        try:
+            corr = correlation_matrix(path, chunksize=1000)
+        finally:
+            os.remove(path)
+        np.testing.assert_allclose(corr.to_numpy(), self.df[['A', 'B', 'C']].corr().to_numpy(), atol=1e-10)
+
+    def test_pearson_from_file_with_stray_text(self):
+        path = "test_correlation.csv"
+        df = self.df.astype({'A': object})
+        df.loc[20, 'A'] = 'oops'
+        df.to_csv(path, index=False)
+        try:
+            corr = correlation_matrix(path, chunksize=5)
+        finally:
+            os.remove(path)
+        expected = df[['A', 'B', 'C']].apply(pd.to_numeric, errors='coerce').corr()
+        np.testing.assert_allclose(corr.to_numpy(), expected.to_numpy(), atol=1e-10)
+
+    def test_spearman_on_bounded_sample(self):
+        exact = correlation_matrix(self.df, method='spearman')
+        np.testing.assert_allclose(exact.to_numpy(), self.df[['A', 'B', 'C']].corr(method='spearman').to_numpy())
+        approx = correlation_matrix(self.df, method='spearman', sample_size=1000, seed=1)
+        self.assertAlmostEqual(approx.loc['A', 'B'], exact.loc['A', 'B'], delta=0.05)
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            correlation_matrix(self.df, method='kendall')
+
+    def test_top_pairs_and_cluster_order(self):
+        corr = correlation_matrix(self.df)
+        pairs = top_correlated_pairs(corr, k=1)
+        self.assertEqual(set(pairs.loc[0, ['Colonne 1', 'Colonne 2']]), {'A', 'B'})
+        self.assertEqual(sorted(cluster_order(corr)), ['A', 'B', 'C'])
+
+if __name__ == '__main__':
+    unittest.main()
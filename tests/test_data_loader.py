@@ -1,6 +1,8 @@
 import unittest
+from unittest import mock
 import pandas as pd
-from src.data_loader import load_data, sample_data
+import pyarrow.csv as pa_csv
+from src.data_loader import load_data, preview_data, sample_data
 import os
 
 class TestDataLoader(unittest.TestCase):
@@ -14,6 +16,59 @@ class TestDataLoader(unittest.TestCase):
         self.assertEqual(list(data.columns), ["col1", "col2"])
         os.remove("test_sample.csv")  # Nettoie après le test
 
+    def test_load_data_pyarrow_projection_and_dtypes(self):
+        with open("test_sample.csv", "w") as f:
+            f.write("col1;col2;col3\n1;a;2.5\n3;b;4.5")
+        data = load_data("test_sample.csv", separator=';', engine='pyarrow', usecols=['col1', 'col2'],
+                         dtype={'col1': 'int32', 'col2': 'category'})
+        os.remove("test_sample.csv")
+        self.assertEqual(list(data.columns), ["col1", "col2"])
+        self.assertEqual(str(data['col1'].dtype), 'int32')
+        self.assertEqual(str(data['col2'].dtype), 'category')
+
+    def test_load_data_pyarrow_backend(self):
+        with open("test_sample.csv", "w") as f:
+            f.write("col1,col2\n1,a\n3,b")
+        data = load_data("test_sample.csv", engine='pyarrow', dtype_backend='pyarrow')
+        os.remove("test_sample.csv")
+        self.assertIsInstance(data['col2'].dtype, pd.ArrowDtype)
+
+    def test_load_data_pyarrow_fallback(self):
+        # Séparateur multi-caractères : pyarrow ne sait pas le lire, repli sur pandas
+        with open("test_sample.csv", "w") as f:
+            f.write("col1::col2\n1::2\n3::4")
+        data = load_data("test_sample.csv", separator='::', engine='pyarrow')
+        os.remove("test_sample.csv")
+        self.assertEqual(data.shape, (2, 2))
+
+    def test_load_data_pyarrow_matches_pandas_nulls_and_dates(self):
+        with open("test_sample.csv", "w") as f:
+            f.write('s,x,d,q\na,1,2020-01-02,"u"\n,2,2021-03-04,""\nNA,NA,,v\nnull,4,2022-05-06,"NA"')
+        expected = load_data("test_sample.csv", engine='pandas')
+        data = load_data("test_sample.csv", engine='pyarrow')
+        os.remove("test_sample.csv")
+        pd.testing.assert_frame_equal(data.isna(), expected.isna())
+        self.assertEqual(data.isna().sum().tolist(), [3, 1, 1, 2])
+        pd.testing.assert_frame_equal(data.fillna(-1), expected.fillna(-1))
+
+    def test_load_data_pyarrow_parses_dated_file_once(self):
+        with open("test_sample.csv", "w") as f:
+            f.write("x,d\n1,2020-01-02\n2,2021-03-04")
+        with mock.patch.object(pa_csv, 'read_csv', wraps=pa_csv.read_csv) as read_csv:
+            data = load_data("test_sample.csv", engine='pyarrow')
+        os.remove("test_sample.csv")
+        self.assertEqual(read_csv.call_count, 1)
+        self.assertEqual(data['d'].tolist(), ['2020-01-02', '2021-03-04'])
+
+    def test_load_data_pyarrow_dates_after_first_block(self):
+        # Colonne vide sur tout le premier bloc lu par Arrow (1 Mo), datée ensuite
+        with open("test_sample.csv", "w") as f:
+            f.write("x,d\n" + "1,\n" * 400_000 + "2,2020-01-02\n")
+        data = load_data("test_sample.csv", engine='pyarrow')
+        os.remove("test_sample.csv")
+        self.assertEqual(data['d'].iloc[-1], '2020-01-02')
+        self.assertEqual(data['d'].count(), 1)
+
     def test_sample_data_random_total(self):
         df = pd.DataFrame({'A': range(10), 'B': ['x'] * 10})
         sampled = sample_data(df, 'random_total', n=5)
@@ -26,5 +81,72 @@ class TestDataLoader(unittest.TestCase):
         self.assertEqual(len(sampled), 3)
         self.assertEqual(sampled['A'].tolist(), [0, 1, 2])
 
+    def test_sample_data_seed_reproducible(self):
+        df = pd.DataFrame({'A': range(100)})
+        first = sample_data(df, 'random_total', n=10, seed=7)
+        second = sample_data(df, 'random_total', n=10, seed=7)
+        self.assertEqual(first['A'].tolist(), second['A'].tolist())
+
+
+class TestPreviewData(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({'A': range(5000), 'B': ['texte'] * 5000})
+
+    def test_preview_csv_reads_only_head(self):
+        path = "test_preview.csv"
+        self.df.to_csv(path, index=False)
+        try:
+            preview = preview_data(path, nrows=5, max_bytes=4096)
+        finally:
+            os.remove(path)
+        self.assertEqual(preview['data']['A'].tolist(), [0, 1, 2, 3, 4])
+        self.assertEqual(preview['schema'], {'A': 'int64', 'B': 'object'})
+        self.assertFalse(preview['exact'])
+        self.assertAlmostEqual(preview['estimated_rows'], 5000, delta=1000)
+
+    def test_preview_xlsx_streamed(self):
+        path = "test_preview.xlsx"
+        self.df.head(20).to_excel(path, index=False)
+        try:
+            preview = preview_data(path, nrows=3)
+        finally:
+            os.remove(path)
+        self.assertEqual(preview['data'].shape, (3, 2))
+        self.assertEqual(preview['estimated_rows'], 20)
+
+
+class TestSampleDataFromFile(unittest.TestCase):
+    def setUp(self):
+        self.path = "test_sample_stream.csv"
+        pd.DataFrame({'A': range(1000), 'B': ['x', 'y'] * 500}).to_csv(self.path, index=False)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_random_total_n_streaming(self):
+        sampled = sample_data(self.path, 'random_total', n=50, seed=1, chunksize=64)
+        self.assertEqual(len(sampled), 50)
+        self.assertEqual(sampled['A'].nunique(), 50)
+        # Les lignes conservent l'ordre et la position du fichier
+        self.assertEqual(sampled.index.tolist(), sampled['A'].tolist())
+
+    def test_random_total_frac_streaming(self):
+        sampled = sample_data(self.path, 'random_total', frac=0.25, seed=1, chunksize=64)
+        self.assertEqual(len(sampled), 250)
+
+    def test_random_total_seed_reproducible(self):
+        first = sample_data(self.path, 'random_total', n=20, seed=3, chunksize=100)
+        second = sample_data(self.path, 'random_total', n=20, seed=3, chunksize=100)
+        self.assertEqual(first['A'].tolist(), second['A'].tolist())
+
+    def test_first_n_streaming(self):
+        sampled = sample_data(self.path, 'first_n', n=3)
+        self.assertEqual(sampled['A'].tolist(), [0, 1, 2])
+
+    def test_last_n_streaming(self):
+        sampled = sample_data(self.path, 'last_n', n=3)
+        self.assertEqual(sampled['A'].tolist(), [997, 998, 999])
+        self.assertEqual(list(sampled.columns), ['A', 'B'])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
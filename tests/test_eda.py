@@ -1,6 +1,8 @@
 import unittest
 import pandas as pd
-from src.eda import get_data_info
+import numpy as np
+from src.eda import get_data_info, DatasetProfile
+from src.treatments import fill_missing_values, rename_columns
 
 class TestEDA(unittest.TestCase):
     def test_get_data_info(self):
@@ -12,5 +14,42 @@ class TestEDA(unittest.TestCase):
         self.assertEqual(info['missing_values']['A'], 0)
         self.assertEqual(info['missing_values']['B'], 0)
 
+class TestDatasetProfile(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({f"c{i}": [1.0, np.nan, 3.0] for i in range(300)})
+
+    def test_info_matches_get_data_info(self):
+        df = pd.DataFrame({'A': [1, 2, None], 'B': ['x', 'y', 'z']})
+        info = DatasetProfile().update(df).info()
+        self.assertEqual(info, get_data_info(df))
+
+    def test_only_dirty_columns_are_recomputed(self):
+        profile = DatasetProfile().update(self.df)
+        self.assertEqual(len(profile.last_computed), 300)
+        profile.update(self.df)
+        self.assertEqual(profile.last_computed, [])
+        filled = fill_missing_values(self.df, ['c0', 'c1'], "0", profile=profile)
+        profile.update(filled)
+        self.assertEqual(profile.last_computed, ['c0', 'c1'])
+        self.assertEqual(profile.info()['missing_values']['c0'], 0)
+        self.assertEqual(profile.info()['missing_values']['c2'], 1)
+
+    def test_rename_keeps_statistics(self):
+        profile = DatasetProfile().update(self.df)
+        renamed = rename_columns(self.df, {'c0': 'premiere'}, profile=profile)
+        profile.update(renamed)
+        self.assertEqual(profile.last_computed, [])
+        self.assertEqual(profile.to_frame().loc['premiere', 'min'], 1.0)
+        self.assertEqual(profile.null_mask.count('premiere'), 1)
+
+    def test_fingerprints_follow_modifications(self):
+        profile = DatasetProfile().update(self.df)
+        before = profile.fingerprints(self.df, ['c0', 'c1'])
+        filled = fill_missing_values(self.df, ['c0'], "0", profile=profile)
+        profile.update(filled)
+        after = profile.fingerprints(filled, ['c0', 'c1'])
+        self.assertNotEqual(before['c0'], after['c0'])
+        self.assertEqual(before['c1'], after['c1'])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
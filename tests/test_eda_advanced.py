@@ -1,6 +1,9 @@
 import unittest
+import tracemalloc
 import pandas as pd
-from src.eda_advanced import descriptive_stats, plot_distribution, plot_correlation, plot_missing_values, plot_boxplot
+import numpy as np
+from src.null_mask import NullMask
+from src.eda_advanced import MAX_HISTOGRAM_BINS, binned_kde, histogram_bin_count, histogram_counts, numeric_columns, descriptive_stats, plot_distribution, plot_correlation, plot_missing_values, plot_missing_matrix, plot_boxplot, box_summaries, plot_boxplots
 
 class TestEDAAdvanced(unittest.TestCase):
     def test_descriptive_stats(self):
@@ -15,20 +18,97 @@ class TestEDAAdvanced(unittest.TestCase):
         fig = plot_distribution(df, 'A')
         self.assertIsNotNone(fig)
 
+    def test_plot_distribution_fast_path(self):
+        df = pd.DataFrame({'A': np.random.default_rng(0).normal(size=1000)})
+        fig = plot_distribution(df, 'A', exact=False)
+        self.assertIsNotNone(fig)
+        self.assertEqual(len(fig.axes[0].lines), 1)
+
+    def test_histogram_bin_count_matches_numpy_rules(self):
+        values = np.random.default_rng(0).normal(size=2000)
+        for rule in ('auto', 'fd', 'sturges', 'scott', 'rice', 'sqrt'):
+            self.assertEqual(histogram_bin_count(values, rule), len(np.histogram_bin_edges(values, rule)) - 1, rule)
+        self.assertEqual(histogram_bin_count(np.ones(10)), 1)
+
+    def test_histogram_with_extreme_outlier(self):
+        values = np.append(np.random.default_rng(0).normal(0, 1e-3, size=10 ** 6), 1e7)
+        counts, edges = histogram_counts(values)
+        self.assertEqual(len(counts), MAX_HISTOGRAM_BINS)
+        self.assertEqual(counts.sum(), len(values))
+        self.assertIsNotNone(plot_distribution(pd.DataFrame({'A': values}), 'A'))
+        fig = plot_distribution(pd.DataFrame({'A': values[-10 ** 4:]}), 'A', exact=True)
+        self.assertLessEqual(len(fig.axes[0].patches), MAX_HISTOGRAM_BINS)
+
+    def test_binned_kde_integrates_to_one(self):
+        grid, density = binned_kde(np.random.default_rng(0).normal(size=5000))
+        self.assertAlmostEqual(density.sum() * (grid[1] - grid[0]), 1.0, places=2)
+
     def test_plot_correlation(self):
         df = pd.DataFrame({'A': [1, 2, 3], 'B': [4, 5, 6]})
         fig = plot_correlation(df)
         self.assertIsNotNone(fig)
 
+    def test_plot_correlation_compacted_dtypes(self):
+        df = pd.DataFrame({'A': pd.Series([1, 2, 3], dtype='int8'), 'B': pd.Series([4.0, 5.5, 6.0], dtype='float32')})
+        self.assertEqual(list(numeric_columns(df)), ['A', 'B'])
+        self.assertIsNotNone(plot_correlation(df))
+
+    def test_plot_correlation_wide_table(self):
+        df = pd.DataFrame(np.random.default_rng(0).normal(size=(50, 20)), columns=[f'c{i}' for i in range(20)])
+        fig = plot_correlation(df)
+        self.assertIsNotNone(fig)
+        self.assertEqual(len(fig.axes[0].texts), 0)
+
     def test_plot_missing_values(self):
         df = pd.DataFrame({'A': [1, None, 3], 'B': [4, 5, 6]})
         fig = plot_missing_values(df)
         self.assertIsNotNone(fig)
 
+    def test_plot_missing_matrix(self):
+        df = pd.DataFrame({'A': [1, None, 3] * 100, 'B': [4, 5, 6] * 100})
+        mask = NullMask.from_frame(df)
+        self.assertIsNotNone(plot_missing_values(df, mask=mask))
+        self.assertIsNotNone(plot_missing_matrix(mask))
+
     def test_plot_boxplot(self):
         df = pd.DataFrame({'A': [1, 2, 3, 4, 5]})
         fig = plot_boxplot(df, 'A')
         self.assertIsNotNone(fig)
 
+    def test_box_summaries_match_describe(self):
+        df = pd.DataFrame({'A': [1, 2, 3, 4, 100, None], 'B': [5.0, 6, 7, 8, 9, 10], 'C': list('abcdef')})
+        summaries = box_summaries(df)
+        self.assertEqual([s['label'] for s in summaries], ['A', 'B'])
+        pd.testing.assert_frame_equal(descriptive_stats(df, summaries=summaries), df.describe())
+        a = summaries[0]
+        self.assertEqual((a['whislo'], a['whishi'], list(a['fliers'])), (1.0, 4.0, [100.0]))
+
+    def test_box_summaries_cap_fliers(self):
+        values = np.concatenate([np.zeros(10000), np.arange(1, 501) * 1000.0])
+        summary = box_summaries(pd.DataFrame({'A': values}), max_fliers=50)[0]
+        self.assertEqual(summary['n_fliers'], 500)
+        self.assertEqual(len(summary['fliers']), 50)
+        self.assertEqual(summary['fliers'][-1], 500000.0)
+
+    def test_box_summaries_work_one_column_at_a_time(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({f'c{i}': rng.normal(size=200_000) for i in range(8)})
+        df['vide'] = np.nan
+        column_bytes = 200_000 * 8
+        tracemalloc.start()
+        try:
+            summaries = box_summaries(df)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 3 * column_bytes)
+        self.assertEqual((summaries[-1]['count'], summaries[-1]['n_fliers']), (0, 0))
+        self.assertTrue(np.isnan(summaries[-1]['whislo']))
+
+    def test_plot_boxplots_single_figure(self):
+        df = pd.DataFrame({'A': [1, 2, 3, 4, 5], 'B': [2, 4, 6, 8, 10], 'C': [None] * 5})
+        fig = plot_boxplots(box_summaries(df))
+        self.assertEqual(len([ax for ax in fig.axes if ax.get_visible()]), 2)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
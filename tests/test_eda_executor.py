@@ -0,0 +1,79 @@
+import unittest
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from src.eda import DatasetProfile
+from src.eda_executor import EdaExecutor, EdaTask, get_eda_executor
+from src.render_cache import RenderCache
+
+class TestEdaExecutor(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({'A': rng.normal(size=500), 'B': rng.normal(size=500), 'C': ['x'] * 500})
+        self.df.loc[::5, 'A'] = np.nan
+        self.profile = DatasetProfile().update(self.df)
+        self.fingerprints = self.profile.fingerprints(self.df, self.df.columns)
+        self.tasks = [
+            EdaTask('summaries', ['A', 'B'], self.fingerprints),
+            EdaTask('distribution', ['A'], self.fingerprints, exact=False),
+            EdaTask('correlation', ['A', 'B'], self.fingerprints, method='pearson'),
+            EdaTask('missing', ['A', 'B', 'C'], self.fingerprints),
+            EdaTask('boxplots', ['A', 'B'], self.fingerprints),
+        ]
+
+    def check_results(self, results):
+        self.assertEqual(sorted(task.key for task, _, _ in results), sorted(task.key for task in self.tasks))
+        by_analysis = {task.analysis: (result, error) for task, result, error in results}
+        self.assertTrue(all(error is None for _, error in by_analysis.values()))
+        self.assertEqual(by_analysis['summaries'][0][0]['count'], 400)
+        self.assertTrue(by_analysis['distribution'][0].startswith(b'\x89PNG'))
+        self.assertEqual(by_analysis['correlation'][0]['corr'].shape, (2, 2))
+        self.assertIsNotNone(by_analysis['missing'][0]['matrix'])
+        self.assertEqual(by_analysis['boxplots'][0]['capped'], [])
+
+    def test_inline_execution_and_cache(self):
+        cache = RenderCache()
+        executor = EdaExecutor(workers=1)
+        self.check_results(list(executor.run(self.df, self.tasks, self.fingerprints, cache=cache,
+                                             null_mask=self.profile.null_mask)))
+        self.assertEqual(len(cache), len(self.tasks))
+        self.check_results(list(executor.run(self.df, self.tasks, self.fingerprints, cache=cache)))
+
+    def test_process_pool_execution(self):
+        shared_dir = tempfile.mkdtemp()
+        executor = EdaExecutor(workers=2, shared_dir=shared_dir)
+        try:
+            self.check_results(list(executor.run(self.df, self.tasks, self.fingerprints)))
+        finally:
+            executor.shutdown()
+            shutil.rmtree(shared_dir)
+
+    def test_shared_executor_replaced_when_workers_change(self):
+        first = get_eda_executor(2)
+        self.assertIs(get_eda_executor(2), first)
+        pool = first._get_pool()
+        second = get_eda_executor(3)
+        try:
+            self.assertIsNot(second, first)
+            self.assertIsNone(first._pool)
+            with self.assertRaises(RuntimeError):
+                pool.submit(int)
+        finally:
+            second.shutdown()
+
+    def test_pool_shut_down_by_another_session_falls_back_to_inline(self):
+        shared_dir = tempfile.mkdtemp()
+        executor = EdaExecutor(workers=2, shared_dir=shared_dir)
+        try:
+            executor._get_pool().shutdown()
+            self.check_results(list(executor.run(self.df, self.tasks, self.fingerprints)))
+        finally:
+            shutil.rmtree(shared_dir)
+
+    def test_unknown_analysis(self):
+        with self.assertRaises(ValueError):
+            EdaTask('inconnue', ['A'], self.fingerprints)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from src.data_loader import load_data
+from src.export import export_dataframe, export_format, write_csv, write_excel
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.df = pd.DataFrame({
+            'x': np.arange(25, dtype=float),
+            'texte': ['é', None, 'a;b', 'c', 'd'] * 5,
+            'date': pd.date_range('2024-01-01', periods=25, freq='D'),
+        })
+        self.df.loc[3, 'x'] = np.nan
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def path(self, name):
+        return os.path.join(self.tmp_dir, name)
+
+    def test_chunked_csv_matches_to_csv(self):
+        expected = self.path("ref.csv")
+        self.df.to_csv(expected, index=False, sep=';', encoding='utf-8-sig')
+        fractions = []
+        for workers in (1, 3):
+            write_csv(self.df, self.path("out.csv"), ';', 'utf-8-sig', chunksize=4, workers=workers,
+                      progress=fractions.append)
+            with open(self.path("out.csv"), 'rb') as f, open(expected, 'rb') as g:
+                self.assertEqual(f.read(), g.read())  # une seule marque BOM, en tête
+        self.assertEqual(fractions[-1], 1.0)
+        self.assertEqual(len(fractions), 14)
+
+    def test_gzip_csv_is_readable(self):
+        path = export_dataframe(self.df, self.path("out.csv.gz"), chunksize=7, workers=2)
+        pd.testing.assert_frame_equal(load_data(path), pd.read_csv(self.path("out.csv.gz")))
+        self.assertEqual(len(pd.read_csv(path)), 25)
+
+    def test_arrow_formats_round_trip(self):
+        for name in ("out.parquet", "out.feather"):
+            path = export_dataframe(self.df, self.path(name), chunksize=10)
+            pd.testing.assert_frame_equal(load_data(path), self.df)
+
+    def test_excel_is_split_into_sheets(self):
+        fractions = []
+        write_excel(self.df, self.path("out.xlsx"), chunksize=4, max_rows=11, progress=fractions.append)
+        workbook = load_workbook(self.path("out.xlsx"), read_only=True)
+        self.assertEqual(workbook.sheetnames, ['Sheet1', 'Sheet2', 'Sheet3'])
+        sheets = pd.read_excel(self.path("out.xlsx"), sheet_name=None)
+        self.assertEqual([len(sheet) for sheet in sheets.values()], [10, 10, 5])
+        combined = pd.concat(sheets.values(), ignore_index=True)
+        pd.testing.assert_frame_equal(combined, self.df.fillna({"texte": np.nan}))
+        self.assertEqual(fractions[-1], 1.0)
+
+    def test_unknown_format_and_no_partial_file(self):
+        with self.assertRaises(ValueError):
+            export_format(self.path("out.txt"))
+        with self.assertRaises(UnicodeEncodeError):
+            write_csv(self.df, self.path("out.csv"), encoding='ascii')
+        self.assertEqual(os.listdir(self.tmp_dir), [])
+
+if __name__ == '__main__':
+    unittest.main()
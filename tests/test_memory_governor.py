@@ -0,0 +1,102 @@
+import unittest
+import gc
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from src.cache import ParseCache
+from src.memory_governor import MemoryGovernor
+
+def make_frame(seed, n=1000):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'x': rng.normal(size=n),
+        'cat': pd.Categorical(rng.choice(['a', 'b'], n)),
+        'texte': rng.choice(['u', None, 'v'], n),
+    }, index=np.arange(n) * 2)
+
+class TestMemoryGovernor(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.df1, self.df2 = make_frame(1), make_frame(2)
+        size = int(self.df1.memory_usage(deep=True).sum())
+        self.governor = MemoryGovernor(max_bytes=int(size * 1.5), spill_dir=self.tmp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_least_recently_used_frame_is_spilled_and_mapped_back(self):
+        first = self.governor.register(self.df1, owner='s1')
+        second = self.governor.register(self.df2, owner='s2')
+        self.assertTrue(first.spilled)
+        self.assertFalse(second.spilled)
+        self.assertTrue(os.path.exists(first.path))
+        pd.testing.assert_frame_equal(first.get(), self.df1)
+        # Relire le premier déverse à son tour le second, moins récemment utilisé
+        self.assertFalse(first.spilled)
+        self.assertTrue(second.spilled)
+        usage = self.governor.usage()
+        self.assertEqual((usage['frames'], usage['spilled_frames'], usage['sessions']), (2, 1, 2))
+        self.assertLessEqual(usage['memory_bytes'], self.governor.max_bytes)
+        self.assertGreater(usage['disk_bytes'], 0)
+
+    def test_shared_frames_counted_once_and_unspillable_frames_kept(self):
+        self.governor.register(self.df1, owner='s1')
+        self.governor.register(self.df1, owner='s2')
+        self.assertEqual(self.governor.usage()['spilled_frames'], 0)
+        numbered = self.governor.register(pd.DataFrame({0: np.arange(10 ** 5)}), owner='s3')
+        self.governor.register(self.df2, owner='s4')
+        self.assertFalse(numbered.spilled)
+        self.assertFalse(numbered.spillable)
+
+    def test_release_owner_and_collection_remove_spilled_files(self):
+        first = self.governor.register(self.df1, owner='s1')
+        second = self.governor.register(self.df2, owner='s2')
+        path = first.path
+        self.governor.release_owner('s1')
+        self.assertTrue(first.released)
+        self.assertFalse(os.path.exists(path))
+        with self.assertRaises(ValueError):
+            first.get()
+        third = self.governor.register(make_frame(3), owner='s3')
+        path = second.path
+        self.assertTrue(os.path.exists(path))
+        del second
+        gc.collect()
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(self.governor.usage()['frames'], 1)
+        self.assertFalse(third.spilled)
+
+class TestMemoryGovernorWithParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.df1, self.df2, self.df3 = make_frame(1), make_frame(2), make_frame(3)
+        size = int(self.df1.memory_usage(deep=True).sum())
+        self.cache = ParseCache(max_bytes=10 * size, spill_dir=os.path.join(self.tmp_dir, 'cache'))
+        self.governor = MemoryGovernor(max_bytes=int(size * 1.5), spill_dir=self.tmp_dir, cache=self.cache)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_spilled_session_frame_is_released_by_the_cache(self):
+        self.cache.put('k1', self.df1)
+        first = self.governor.register(self.df1, owner='s1')
+        self.assertEqual(self.governor.memory_bytes, first.nbytes)  # objet partagé compté une fois
+        self.cache.put('k2', self.df2)
+        self.governor.register(self.df2, owner='s2')
+        self.assertTrue(first.spilled)
+        self.assertEqual([df is self.df1 for df, _ in self.cache.resident_frames()], [False])
+        self.assertLessEqual(self.governor.memory_bytes, self.governor.max_bytes)
+        pd.testing.assert_frame_equal(self.cache.get('k1'), self.df1.reset_index(drop=True))  # relu du disque
+
+    def test_cache_entries_without_session_are_demoted_first(self):
+        self.cache.put('k3', self.df3)
+        first = self.governor.register(self.df1, owner='s1')
+        self.assertFalse(first.spilled)
+        self.assertEqual(self.cache.memory_bytes, 0)
+        usage = self.governor.usage()
+        self.assertEqual((usage['cache_bytes'], usage['memory_bytes']), (0, first.nbytes))
+
+if __name__ == '__main__':
+    unittest.main()
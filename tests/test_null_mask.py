@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+import pandas as pd
+from src.null_mask import NullMask
+
+class TestNullMask(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 10001
+        self.df = pd.DataFrame({
+            'A': np.where(rng.random(n) < 0.3, np.nan, 1.0),
+            'B': np.where(rng.random(n) < 0.6, None, 'x'),
+            'C': np.ones(n),
+        })
+        self.df['D'] = self.df['A'].where(self.df['A'].isna(), 2.0)
+
+    def test_counts_and_memory(self):
+        mask = NullMask.from_frame(self.df)
+        pd.testing.assert_series_equal(mask.counts(), self.df.isna().sum())
+        self.assertEqual(mask.nbytes, 4 * 1251)
+
+    def test_cooccurrence_and_correlation(self):
+        mask = NullMask.from_frame(self.df)
+        nulls = self.df.isna().astype(int)
+        np.testing.assert_array_equal(mask.cooccurrence(block_rows=1024).to_numpy(), (nulls.T @ nulls).to_numpy())
+        corr = mask.nullity_correlation()
+        self.assertAlmostEqual(corr.loc['A', 'D'], 1.0)
+        self.assertTrue(np.isnan(corr.loc['C', 'A']))
+        np.testing.assert_allclose(corr.loc[['A', 'B'], ['A', 'B']], nulls[['A', 'B']].corr(), atol=1e-12)
+
+    def test_row_bands(self):
+        fractions, band_rows = NullMask.from_frame(self.df).row_bands(bands=10)
+        self.assertEqual(fractions.shape, (10, 4))
+        self.assertEqual(band_rows, 1008)
+        np.testing.assert_allclose(fractions[:, 2], 0.0)
+        self.assertAlmostEqual(fractions[:, 0].mean(), self.df['A'].isna().mean(), delta=0.01)
+
+    def test_partial_update_and_rename(self):
+        mask = NullMask.from_frame(self.df)
+        df = self.df.drop(columns='D')
+        df['C'] = np.nan
+        mask.update(df, ['C'])
+        self.assertEqual(mask.columns, ['A', 'B', 'C'])
+        self.assertEqual(mask.count('C'), len(df))
+        mask.rename({'C': 'E'})
+        self.assertEqual(mask.subset(['E']).counts().to_dict(), {'E': len(df)})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import pandas as pd
+from src.eda_advanced import plot_distribution, plot_missing_values
+from src.render_cache import RenderCache, figure_to_png, render_key
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        plt.close('all')
+        self.df = pd.DataFrame({'A': [1.0, 2.0, 3.0, 4.0], 'B': [1, 2, 3, 4]})
+        self.fingerprints = {'A': 'fa', 'B': 'fb'}
+
+    def test_figures_are_closed(self):
+        png = figure_to_png(plot_distribution(self.df, 'A'))
+        self.assertTrue(png.startswith(b'\x89PNG'))
+        self.assertEqual(plt.get_fignums(), [])
+        self.assertIsNone(figure_to_png(None))
+
+    def test_render_is_memoized(self):
+        cache = RenderCache()
+        calls = []
+        def plot(df, col):
+            calls.append(col)
+            return plot_distribution(df, col)
+        key = render_key('distribution', ['A'], self.fingerprints, exact=False)
+        first = cache.render(key, plot, self.df, 'A')
+        second = cache.render(key, plot, self.df, 'A')
+        self.assertIs(first, second)
+        self.assertEqual(calls, ['A'])
+        self.assertEqual(plt.get_fignums(), [])
+
+    def test_absent_figure_is_cached(self):
+        cache = RenderCache()
+        key = render_key('missing_values', ['A'], self.fingerprints)
+        self.assertIsNone(cache.render(key, plot_missing_values, self.df))
+        self.assertIn(key, cache)
+
+    def test_keys_depend_on_content_and_parameters(self):
+        key = render_key('distribution', ['A'], self.fingerprints, exact=False)
+        self.assertNotEqual(key, render_key('distribution', ['A'], self.fingerprints, exact=True))
+        self.assertNotEqual(key, render_key('distribution', ['A'], {'A': 'autre'}, exact=False))
+
+    def test_lru_eviction(self):
+        cache = RenderCache(max_bytes=250)
+        for key in ['a', 'b', 'c']:
+            cache.get_or_compute(key, lambda: b'x' * 100)
+        self.assertNotIn('a', cache)
+        self.assertEqual(len(cache), 2)
+        self.assertLessEqual(cache.memory_bytes, 250)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import io
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from src.row_index import RowIndex, get_row_index, row_index_path
+
+TRICKY_CSV = 'a,b,"c\nd"\n\n1,"x\n""y""",3\r\n2,plain,4\r\n\r\n"5",",",6\n7,8,9'
+
+class TestRowIndex(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "data.csv")
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({
+            'x': rng.integers(0, 100, 1000),
+            'texte': rng.choice(['simple', 'avec, virgule', 'sur\ndeux lignes', 'guillemets ""'], 1000),
+        })
+        self.df.to_csv(self.path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_quotes_crlf_and_blank_lines(self):
+        source = io.BytesIO(TRICKY_CSV.encode())
+        index = RowIndex.build(source, block_bytes=7)  # blocs coupant les champs entre guillemets
+        expected = pd.read_csv(io.BytesIO(TRICKY_CSV.encode()))
+        self.assertEqual(index.n_rows, len(expected))
+        pd.testing.assert_frame_equal(index.read_rows(source, 0, index.n_rows), expected)
+        self.assertEqual(index.take(source, [3, 0])['b'].tolist(), ['x\n"y"', '8'])  # ordre du fichier
+
+    def test_pages_and_sample_match_full_read(self):
+        index = RowIndex.build(self.path, block_bytes=4096)
+        self.assertEqual(index.offsets.dtype, np.uint32)
+        pd.testing.assert_frame_equal(index.read_rows(self.path, 990, 2000), self.df.iloc[990:])
+        sample = index.sample(self.path, n=50, seed=3)
+        self.assertEqual(len(sample), 50)
+        self.assertTrue(sample.index.is_monotonic_increasing)
+        pd.testing.assert_frame_equal(sample, self.df.loc[sample.index])
+        with self.assertRaises(IndexError):
+            index.take(self.path, [1000])
+
+    def test_persisted_index_is_reused_and_rebuilt_on_change(self):
+        index = get_row_index(self.path)
+        self.assertTrue(os.path.exists(row_index_path(self.path)))
+        reloaded = get_row_index(self.path)
+        self.assertIsInstance(reloaded.offsets, np.memmap)
+        self.assertEqual(reloaded.n_rows, index.n_rows)
+        with open(self.path, 'a') as f:
+            f.write("1,nouvelle\n")
+        self.assertEqual(get_row_index(self.path).n_rows, 1001)
+
+    def test_rejects_wide_encodings(self):
+        with self.assertRaises(ValueError):
+            RowIndex.build(self.path, encoding='utf-16')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import os
+import numpy as np
+import pandas as pd
+from src.sampling import allocate_strata, stratified_sample
+from src.data_loader import sample_data
+
+class TestAllocation(unittest.TestCase):
+    def test_proportional_allocation(self):
+        alloc = allocate_strata([600, 300, 100], 100)
+        self.assertEqual(alloc.tolist(), [60, 30, 10])
+
+    def test_equal_allocation_caps_small_strata(self):
+        alloc = allocate_strata([100, 10, 2], 30, allocation='equal')
+        self.assertEqual(alloc.tolist(), [18, 10, 2])
+
+    def test_min_per_stratum(self):
+        alloc = allocate_strata([1000, 5], 10, min_per_stratum=3)
+        self.assertEqual(alloc[1], 3)
+
+class TestStratifiedSample(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'groupe': ['a'] * 800 + ['b'] * 150 + ['c'] * 50,
+            'valeur': range(1000)
+        })
+
+    def test_proportional_in_memory(self):
+        sample, report = stratified_sample(self.df, 'groupe', n=100, seed=0)
+        self.assertEqual(len(sample), 100)
+        counts = report.set_index('groupe')['echantillon']
+        self.assertEqual(counts.to_dict(), {'a': 80, 'b': 15, 'c': 5})
+
+    def test_sample_data_representatif(self):
+        sample = sample_data(self.df, 'random_representatif', frac=0.1, seed=0, strata=['groupe'],
+                             allocation='equal')
+        self.assertEqual(len(sample), 100)
+        self.assertEqual(sample['groupe'].value_counts().min(), 33)
+
+    def test_two_pass_file_matches_counts(self):
+        path = "test_strata.csv"
+        self.df.to_csv(path, index=False)
+        try:
+            sample, report = stratified_sample(path, ['groupe'], n=100, seed=0, chunksize=90)
+            again, _ = stratified_sample(path, ['groupe'], n=100, seed=0, chunksize=90)
+        finally:
+            os.remove(path)
+        self.assertEqual(report.set_index('groupe')['population'].to_dict(), {'a': 800, 'b': 150, 'c': 50})
+        self.assertEqual(sample['groupe'].value_counts().to_dict(), {'a': 80, 'b': 15, 'c': 5})
+        self.assertEqual(sample['valeur'].tolist(), again['valeur'].tolist())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+import os
+import numpy as np
+import pandas as pd
+from src.streaming_stats import Moments, TDigest, streaming_describe
+
+class TestStreamingStats(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.df = pd.DataFrame({
+            'A': rng.normal(10, 2, 20000),
+            'B': rng.integers(0, 100, 20000),
+            'C': ['texte'] * 20000
+        })
+        self.df.loc[::7, 'A'] = np.nan
+
+    def test_same_shape_as_describe(self):
+        stats = streaming_describe(self.df, chunksize=3000)
+        expected = self.df.describe()
+        self.assertEqual(stats.index.tolist(), expected.index.tolist())
+        self.assertEqual(stats.columns.tolist(), expected.columns.tolist())
+
+    def test_exact_moments_and_approximate_quantiles(self):
+        stats = streaming_describe(self.df, chunksize=3000)
+        expected = self.df.describe()
+        for row in ['count', 'mean', 'std', 'min', 'max']:
+            np.testing.assert_allclose(stats.loc[row], expected.loc[row], rtol=1e-9)
+        np.testing.assert_allclose(stats.loc['50%', 'A'], expected.loc['50%', 'A'], rtol=1e-2)
+
+    def test_parallel_file_matches_serial(self):
+        path = "test_streaming.csv"
+        self.df.to_csv(path, index=False)
+        try:
+            serial = streaming_describe(path, chunksize=2500)
+            parallel = streaming_describe(path, chunksize=2500, workers=3)
+        finally:
+            os.remove(path)
+        np.testing.assert_allclose(serial.loc[['count', 'mean', 'std']], parallel.loc[['count', 'mean', 'std']])
+
+    def test_states_are_mergeable(self):
+        values = np.arange(10000, dtype=float)
+        left, right = Moments().update(values[:3000]), Moments().update(values[3000:])
+        self.assertAlmostEqual(left.merge(right).std, values.std(ddof=1))
+        digest = TDigest().update(values[:5000]).merge(TDigest().update(values[5000:]))
+        self.assertAlmostEqual(digest.quantile(0.5), 4999.5, delta=50)
+
+if __name__ == '__main__':
+    unittest.main()
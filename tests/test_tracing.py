@@ -0,0 +1,117 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+from src.eda import DatasetProfile
+from src.eda_executor import EdaExecutor, EdaTask
+from src.tracing import SpanRecorder, activate, adopt_spans, span, spans_to_frame, traced
+
+@traced('double')
+def double(df):
+    return pd.concat([df, df])
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "traces.jsonl")
+        self.recorder = SpanRecorder(self.path)
+        self.df = pd.DataFrame({'a': np.arange(10, dtype=np.int64)})
+
+    def tearDown(self):
+        activate(None)
+        shutil.rmtree(self.tmp_dir)
+
+    def test_disabled_records_nothing(self):
+        activate(None)
+        with span("rien") as current:
+            current.set(rows=1)
+        self.assertEqual(len(double(self.df)), 20)
+        self.assertEqual(len(self.recorder.spans), 0)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_nested_spans_measures_and_jsonl(self):
+        activate(self.recorder)
+        self.recorder.new_run()
+        with span("parent", etape=1):
+            double(self.df)
+        with self.assertRaises(KeyError):
+            with span("erreur"):
+                raise KeyError("x")
+        spans = self.recorder.last_run()
+        self.assertEqual([s['name'] for s in spans], ['parent', 'double', 'erreur'])
+        child = spans[1]
+        self.assertEqual((child['parent'], child['depth'], child['rows'], child['bytes']), ('parent', 1, 10, 80))
+        self.assertEqual(spans[0]['attrs'], {'etape': 1})
+        self.assertEqual(spans[2]['status'], 'KeyError')
+        self.assertTrue(all(s['peak_mb'] is None and s['wall_s'] >= 0 for s in spans))
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(sorted(json.loads(line)['name'] for line in f), ['double', 'erreur', 'parent'])
+        self.recorder.new_run()
+        self.assertEqual(len(self.recorder.last_run()), 3)  # exécution sans mesure : la précédente est conservée
+        self.assertEqual(len(spans_to_frame(spans)), 3)
+
+    def test_trace_file_is_rotated_by_size(self):
+        path = os.path.join(self.tmp_dir, "logs", "traces.jsonl")
+        recorder = SpanRecorder(path, max_bytes=1000)
+        activate(recorder)
+        for i in range(20):
+            with span("operation", i=i):
+                pass
+        self.assertLessEqual(os.path.getsize(path), 1000)
+        self.assertLessEqual(os.path.getsize(f"{path}.1"), 1000)
+        with open(path, encoding='utf-8') as f:
+            last = [json.loads(line)['attrs']['i'] for line in f]
+        self.assertEqual(last[-1], 19)
+        self.assertFalse(os.path.exists(f"{path}.2"))
+
+    def test_memory_peak_of_nested_spans(self):
+        self.recorder.memory = True
+        activate(self.recorder)
+        with span("parent"):
+            with span("enfant"):
+                block = np.ones(2 * 1024 ** 2)  # 16 Mo
+                del block
+            small = np.ones(1024)
+        peaks = {s['name']: s['peak_mb'] for s in self.recorder.spans}
+        self.assertGreaterEqual(peaks['enfant'], 15)
+        self.assertGreaterEqual(peaks['parent'], peaks['enfant'])
+        del small
+
+    def test_adopted_spans_are_attached_to_current_span(self):
+        worker = SpanRecorder(path=None)
+        activate(worker)
+        with span("eda.summaries"):
+            pass
+        activate(self.recorder)
+        with span("eda"):
+            adopt_spans(list(worker.spans))
+        spans = self.recorder.last_run()
+        self.assertEqual([(s['name'], s['parent'], s['depth']) for s in spans],
+                         [('eda', None, 0), ('eda.summaries', 'eda', 1)])
+
+    def test_eda_analyses_and_profile_are_traced(self):
+        df = pd.DataFrame({'A': [1.0, None, 3.0, 4.0], 'B': [2.0, 1.0, None, 0.5]})
+        activate(self.recorder)
+        profile = DatasetProfile().update(df)
+        fingerprints = profile.fingerprints(df, df.columns)
+        tasks = [EdaTask('summaries', ['A', 'B'], fingerprints), EdaTask('correlation', ['A', 'B'], fingerprints)]
+        for workers in (1, 2):
+            executor = EdaExecutor(workers=workers, shared_dir=self.tmp_dir)
+            try:
+                with span("eda"):
+                    results = list(executor.run(df, tasks, fingerprints))
+            finally:
+                executor.shutdown()
+            self.assertTrue(all(error is None for _, _, error in results))
+        names = [s['name'] for s in self.recorder.spans]
+        self.assertEqual(names.count('eda.summaries'), 2)
+        self.assertIn('correlation_matrix', names)
+        self.assertIn('profile.update', names)
+        adopted = [s for s in self.recorder.spans if s['name'] == 'eda.correlation']
+        self.assertTrue(all(s['parent'] == 'eda' for s in adopted))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import os
+import warnings
+import numpy as np
+import pandas as pd
+from src.treatments import TreatmentPipeline, fill_missing_values, rename_columns
+
+class TestTreatments(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({
+            'cat': ['a', 'a', 'a', 'b', 'b', 'b'],
+            'x': [1.0, np.nan, 3.0, 10.0, np.nan, 30.0],
+            'y': [np.nan, 2.0, np.nan, np.nan, 5.0, 6.0],
+            'untouched': [1, 2, 3, 4, 5, 6],
+        })
+
+    def test_rename_columns(self):
+        self.assertIn('z', rename_columns(self.df, {'x': 'z'}).columns)
+
+    def test_fill_does_not_copy_untouched_columns(self):
+        original = self.df.copy()
+        filled = fill_missing_values(self.df, ['x', 'y'], "mean")
+        pd.testing.assert_frame_equal(self.df, original)
+        self.assertTrue(np.shares_memory(filled['untouched'].to_numpy(), self.df['untouched'].to_numpy()))
+        self.assertEqual(filled.loc[1, 'x'], self.df['x'].mean())
+        self.assertEqual(filled.loc[0, 'y'], self.df['y'].mean())
+
+    def test_simple_methods(self):
+        self.assertEqual(fill_missing_values(self.df, ['x'], "0").loc[1, 'x'], 0)
+        self.assertEqual(fill_missing_values(self.df, ['x'], "median").loc[1, 'x'], 6.5)
+        self.assertEqual(fill_missing_values(self.df, ['x'], "ffill").loc[4, 'x'], 10.0)
+        self.assertEqual(fill_missing_values(self.df, ['x'], "bfill").loc[4, 'x'], 30.0)
+        self.assertEqual(fill_missing_values(self.df, ['x'], "custom", custom_value=-1).loc[1, 'x'], -1)
+
+    def test_group_methods(self):
+        filled = fill_missing_values(self.df, ['x'], "group_mean", group_by='cat')
+        self.assertEqual(filled['x'].tolist(), [1.0, 2.0, 3.0, 10.0, 20.0, 30.0])
+        filled = fill_missing_values(self.df, ['y'], "group_ffill", group_by=['cat'])
+        self.assertTrue(np.isnan(filled.loc[3, 'y']))  # pas de report depuis le groupe précédent
+        self.assertEqual(filled.loc[2, 'y'], 2.0)
+        with self.assertRaises(ValueError):
+            fill_missing_values(self.df, ['x'], "group_mean")
+
+    def test_group_methods_with_categorical_keys(self):
+        df = self.df.assign(cat=pd.Categorical(self.df['cat'], categories=['a', 'b', 'inutilisée']),
+                            cat2=pd.Categorical(['u'] * 6, categories=['u', 'v']))
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', FutureWarning)
+            filled = fill_missing_values(df, ['x'], "group_mean", group_by=['cat', 'cat2'])
+        self.assertEqual(filled['x'].tolist(), [1.0, 2.0, 3.0, 10.0, 20.0, 30.0])
+
+    def test_interpolate_follows_order_column(self):
+        df = pd.DataFrame({
+            'date': pd.to_datetime(['2024-01-04', '2024-01-01', '2024-01-02']),
+            'valeur': [4.0, 1.0, np.nan],
+        })
+        filled = fill_missing_values(df, ['valeur'], "interpolate", order_by='date')
+        self.assertAlmostEqual(filled.loc[2, 'valeur'], 2.0)
+        self.assertEqual(fill_missing_values(self.df, ['x'], "interpolate").loc[1, 'x'], 2.0)
+
+    def test_numeric_methods_reject_text(self):
+        with self.assertRaises(ValueError):
+            fill_missing_values(self.df, ['cat'], "mean")
+
+class TestTreatmentPipeline(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 2003
+        self.df = pd.DataFrame({
+            'cat': rng.choice(['a', 'b', 'c'], n),
+            'x': np.where(rng.random(n) < 0.3, np.nan, rng.normal(size=n)),
+            'y': np.where(rng.random(n) < 0.95, np.nan, rng.normal(size=n)),
+        })
+        self.path = "test_pipeline.csv"
+        self.df.to_csv(self.path, index=False)
+
+    def tearDown(self):
+        for path in [self.path, "test_pipeline_out.csv"]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_fills_match_in_memory_treatment(self):
+        for method in ["0", "mean", "ffill", "bfill", "group_mean", "group_ffill"]:
+            expected = fill_missing_values(self.df, ['x', 'y'], method, group_by='cat')
+            result = TreatmentPipeline().fill(['x', 'y'], method, group_by='cat').to_frame(self.path, chunksize=97)
+            pd.testing.assert_frame_equal(result, expected, check_exact=False, obj=method)
+
+    def test_fills_with_categorical_keys(self):
+        df = self.df.assign(cat=pd.Categorical(self.df['cat'], categories=['a', 'b', 'c', 'inutilisée']))
+        for method in ["group_mean", "group_median", "group_ffill"]:
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', FutureWarning)
+                result = TreatmentPipeline().fill(['x'], method, group_by='cat').to_frame(df, chunksize=97)
+            self.assertEqual(result['x'].isna().sum(), 0, method)
+
+    def test_median_is_estimated_in_prepass(self):
+        result = TreatmentPipeline().fill(['x'], 'median').to_frame(self.path, chunksize=100)
+        filled = result.loc[self.df['x'].isna(), 'x']
+        self.assertAlmostEqual(filled.iloc[0], self.df['x'].median(), delta=0.02)
+
+    def test_sampling_is_exact_and_ordered(self):
+        for method, expected_first in [("first_n", 0), ("last_n", 1903), ("random_total", None)]:
+            result = TreatmentPipeline().sample(method, n=100, seed=1).to_frame(self.path, chunksize=150)
+            self.assertEqual(len(result), 100)
+            self.assertTrue(result.index.is_monotonic_increasing)
+            if expected_first is not None:
+                self.assertEqual(result.index[0], expected_first)
+        result = TreatmentPipeline().sample("random_total", frac=0.1, seed=1).to_frame(self.path, chunksize=150)
+        self.assertEqual(len(result), 200)
+
+    def test_run_writes_output(self):
+        pipeline = TreatmentPipeline().select(['cat', 'x']).fill(['x'], "ffill").sample("first_n", n=10).rename({'x': 'X'})
+        report = pipeline.run(self.path, "test_pipeline_out.csv", chunksize=4)
+        self.assertEqual(report, {'rows_read': 12, 'rows': 10, 'columns': ['cat', 'X'], 'passes': 1})
+        written = pd.read_csv("test_pipeline_out.csv")
+        self.assertEqual(written.columns.tolist(), ['cat', 'X'])
+        np.testing.assert_allclose(written['X'], self.df['x'].ffill().iloc[:10])
+
+    def test_unsupported_steps(self):
+        with self.assertRaises(ValueError):
+            TreatmentPipeline().fill(['x'], "interpolate")
+        with self.assertRaises(ValueError):
+            TreatmentPipeline().sample("first_n", n=1).sample("last_n", n=1)
+
+if __name__ == '__main__':
+    unittest.main()
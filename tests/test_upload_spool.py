@@ -0,0 +1,72 @@
+import unittest
+import gc
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from src.data_loader import load_data
+from src.row_index import get_row_index, row_index_path
+from src.upload_spool import SpooledUpload, purge_stale_spools, spool_upload
+
+class FakeUpload(io.BytesIO):
+    def __init__(self, data, name="data.csv", file_id=None):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+        self.file_id = file_id
+
+class TestUploadSpool(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.upload = FakeUpload(b"a,b\n1,x\n2,y\n", file_id="f1")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_spooled_copy_is_readable(self):
+        spooled = spool_upload(self.upload, spool_dir=self.tmp_dir)
+        self.assertTrue(spooled.path.endswith(".csv"))
+        self.assertEqual(spooled.size, self.upload.size)
+        self.assertEqual(load_data(spooled.path, engine='pyarrow')['b'].tolist(), ['x', 'y'])
+        self.assertEqual(self.upload.tell(), 0)
+
+    def test_reuse_replace_and_close(self):
+        first = spool_upload(self.upload, spool_dir=self.tmp_dir)
+        self.assertIs(spool_upload(FakeUpload(b"a,b\n1,x\n2,y\n", file_id="f1"), first, self.tmp_dir), first)
+        second = spool_upload(FakeUpload(b"c\n3\n", file_id="f2"), first, self.tmp_dir)
+        self.assertTrue(first.closed)
+        self.assertFalse(os.path.exists(first.path))
+        second.close()
+        second.close()
+        self.assertEqual(os.listdir(self.tmp_dir), [])
+
+    def test_row_index_persisted_next_to_copy_and_removed_with_it(self):
+        spooled = spool_upload(self.upload, spool_dir=self.tmp_dir)
+        self.assertEqual(get_row_index(spooled.path).n_rows, 2)
+        self.assertTrue(os.path.exists(row_index_path(spooled.path)))
+        self.assertEqual(get_row_index(spooled.path).n_rows, 2)
+        spooled.close()
+        self.assertEqual(os.listdir(self.tmp_dir), [])
+
+    def test_copy_removed_when_object_is_collected(self):
+        spooled = SpooledUpload(self.upload, self.tmp_dir)
+        path = spooled.path
+        del spooled
+        gc.collect()
+        self.assertFalse(os.path.exists(path))
+
+    def test_purge_removes_copies_of_dead_processes(self):
+        dead = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead.wait()
+        stale = os.path.join(self.tmp_dir, f"{dead.pid}_old.csv")
+        open(stale, "w").close()
+        alive = SpooledUpload(self.upload, self.tmp_dir)
+        purge_stale_spools(self.tmp_dir)
+        if os.name == 'posix':
+            self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.exists(alive.path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import os
+import shutil
+import tempfile
+import pandas as pd
+from src.working_copy import load_working_copy, remove_working_copy, save_working_copy, working_copy_path
+
+class TestWorkingCopy(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.work_dir = os.path.join(self.tmp_dir, "work")
+        self.output_path = os.path.join(self.tmp_dir, "sortie.csv")
+        self.df = pd.DataFrame({'A': [1, 2, 3], 'B': ['x', 'y', 'z']})
+        self.df.to_csv(self.output_path, index=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_reload_uses_working_copy(self):
+        save_working_copy(self.df, self.output_path, self.work_dir)
+        self.assertTrue(os.path.exists(working_copy_path(self.output_path, self.work_dir)))
+        reloaded = load_working_copy(self.output_path, working_dir=self.work_dir)
+        pd.testing.assert_frame_equal(reloaded, self.df)
+
+    def test_modified_file_is_reparsed(self):
+        save_working_copy(self.df, self.output_path, self.work_dir)
+        with open(self.output_path, "a") as f:
+            f.write("4,w\n")
+        reloaded = load_working_copy(self.output_path, working_dir=self.work_dir)
+        self.assertEqual(len(reloaded), 4)
+
+    def test_missing_working_copy_is_created(self):
+        reloaded = load_working_copy(self.output_path, working_dir=self.work_dir)
+        self.assertEqual(reloaded.shape, (3, 2))
+        self.assertTrue(os.path.exists(working_copy_path(self.output_path, self.work_dir)))
+    def test_remove_working_copy(self):
+        path = save_working_copy(self.df, self.output_path, self.work_dir)
+        remove_working_copy(self.output_path, self.work_dir)
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(os.path.exists(f"{path}.json"))
+        remove_working_copy(self.output_path, self.work_dir)  # Copie déjà absente : sans erreur
+
+    def test_disk_budget_evicts_least_recently_used(self):
+        outputs = [os.path.join(self.tmp_dir, f"sortie_{i}.csv") for i in range(3)]
+        paths = []
+        for i, output in enumerate(outputs):
+            self.df.to_csv(output, index=False)
+            path = save_working_copy(self.df, output, self.work_dir)
+            os.utime(path, (i, i))
+            paths.append(path)
+        size = os.path.getsize(paths[0])
+        # La première copie est relue : c'est la deuxième, la moins récemment utilisée, qui est évincée
+        load_working_copy(outputs[0], working_dir=self.work_dir)
+        new_output = os.path.join(self.tmp_dir, "sortie_3.csv")
+        self.df.to_csv(new_output, index=False)
+        new_path = save_working_copy(self.df, new_output, self.work_dir, max_disk_bytes=3 * size)
+        self.assertTrue(os.path.exists(new_path))
+        self.assertTrue(os.path.exists(paths[0]))
+        self.assertFalse(os.path.exists(paths[1]))
+        self.assertFalse(os.path.exists(f"{paths[1]}.json"))
+        self.assertTrue(os.path.exists(paths[2]))
+
+if __name__ == '__main__':
+    unittest.main()